@@ -0,0 +1,280 @@
+import json
+import math
+import threading
+import time
+
+
+class Rule:
+    # A condition on one metric, or on every metric matching a trailing "*"
+    # (e.g. "disk_used:*"). test() sees one sample at a time and returns True
+    # (condition holds), False (clear) or None (inside the hysteresis band:
+    # keep the current state). Streaming state lives in a per-metric dict so
+    # one rule can watch many metrics.
+    def __init__(self, name, metric, severity="warning", for_seconds=0, cooldown=60, message=None):
+        self.name = name
+        self.metric = metric
+        self.severity = severity
+        self.for_seconds = for_seconds
+        self.cooldown = cooldown
+        self.message = message
+
+    def matches(self, metric):
+        if self.metric.endswith("*"):
+            return metric.startswith(self.metric[:-1])
+        return metric == self.metric
+
+    def new_state(self):
+        return {}
+
+    def test(self, state, value, timestamp):
+        raise NotImplementedError
+
+    def describe(self, metric, value):
+        return self.message or f"{self.name}: {metric} = {value:.2f}"
+
+    def near(self, value, margin):
+        # Whether `value` is within `margin` (a fraction) of this rule's level
+        return False
+
+
+class Threshold(Rule):
+    # Fires above `above` (or below `below`) and clears only once the value
+    # is back past `clear`, so a value sitting on the line doesn't flap
+    def __init__(self, name, metric, above=None, below=None, clear=None, **kwargs):
+        super().__init__(name, metric, **kwargs)
+        self.above = above
+        self.below = below
+        self.clear = clear if clear is not None else (above if above is not None else below)
+
+    def test(self, state, value, timestamp):
+        if self.above is not None:
+            if value > self.above:
+                return True
+            return False if value <= self.clear else None
+        if value < self.below:
+            return True
+        return False if value >= self.clear else None
+
+    def near(self, value, margin):
+        if self.above is not None:
+            return value >= self.above - abs(self.above) * margin
+        return value <= self.below + abs(self.below) * margin
+
+
+class RateOfChange(Rule):
+    # Fires when the value moves faster than `per_second` (negative: falls
+    # faster than), measured between consecutive samples
+    def __init__(self, name, metric, per_second, **kwargs):
+        super().__init__(name, metric, **kwargs)
+        self.per_second = per_second
+
+    def test(self, state, value, timestamp):
+        prev = state.get("prev")
+        state["prev"] = (value, timestamp)
+        if prev is None or timestamp <= prev[1]:
+            return None
+        rate = (value - prev[0]) / (timestamp - prev[1])
+        if self.per_second >= 0:
+            return rate > self.per_second
+        return rate < self.per_second
+
+
+class Anomaly(Rule):
+    # Z-score of each sample against an exponentially weighted mean and
+    # variance of the samples before it. Fires past `z`, clears under
+    # `clear_z`; the first `warmup` samples only train the estimate.
+    def __init__(self, name, metric, z=3.0, clear_z=None, alpha=0.05, warmup=30, **kwargs):
+        super().__init__(name, metric, **kwargs)
+        self.z = z
+        self.clear_z = clear_z if clear_z is not None else z / 2
+        self.alpha = alpha
+        self.warmup = warmup
+
+    def new_state(self):
+        return {"mean": 0.0, "var": 0.0, "count": 0}
+
+    def test(self, state, value, timestamp):
+        count = state["count"]
+        mean, var = state["mean"], state["var"]
+        diff = value - mean
+        if count == 0:
+            state["mean"] = value
+        else:
+            incr = self.alpha * diff
+            state["mean"] = mean + incr
+            state["var"] = (1 - self.alpha) * (var + diff * incr)
+        state["count"] = count + 1
+
+        if count < self.warmup:
+            return None
+        std = math.sqrt(var)
+        score = abs(diff) / std if std > 0 else 0.0
+        state["score"] = score
+        if score > self.z:
+            return True
+        return False if score < self.clear_z else None
+
+    def describe(self, metric, value):
+        return self.message or f"{self.name}: {metric} = {value:.2f} is unusual"
+
+
+RULE_TYPES = {
+    "threshold": Threshold,
+    "rate": RateOfChange,
+    "anomaly": Anomaly,
+}
+
+DEFAULT_RULES = (
+    Threshold("High CPU", "cpu", above=90, clear=80, for_seconds=30, severity="critical"),
+    Threshold("Pegged core", "cpu_core_max", above=98, clear=90, for_seconds=60),
+    Threshold("High memory", "ram", above=90, clear=85, for_seconds=15, severity="critical"),
+    Threshold("Low disk space", "disk_used:*", above=90, clear=88, severity="critical"),
+    Anomaly("CPU anomaly", "cpu", z=4.0),
+    Anomaly("Network anomaly", "net_down", z=5.0),
+)
+
+
+def load_rules(path):
+    # JSON list of {"type": "threshold" | "rate" | "anomaly", "name": ...,
+    # "metric": ..., plus that rule's keyword arguments}
+    with open(path) as f:
+        specs = json.load(f)
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        rules.append(RULE_TYPES[spec.pop("type")](**spec))
+    return rules
+
+
+class Alert:
+    __slots__ = ("rule", "metric", "value", "since", "message", "notified")
+
+    def __init__(self, rule, metric, value, since, message):
+        self.rule = rule
+        self.metric = metric
+        self.value = value
+        self.since = since
+        self.message = message
+        self.notified = False
+
+
+class LogSink:
+    # Appends one line per notification to `path`, or prints when unset
+    def __init__(self, path=None):
+        self.path = path
+        self.file = open(path, "a", buffering=1) if path else None
+
+    def __call__(self, event, alert):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(alert.since))
+        line = f"{stamp} {alert.rule.severity.upper()} {event}: {alert.message}"
+        if self.file is None:
+            print(line)
+        else:
+            self.file.write(line + "\n")
+
+
+class AlertEngine:
+    # Evaluates rules against each batch of metrics as a collector produces
+    # it. Rules are resolved per metric name once and cached, so a sample
+    # only touches the rules watching that metric, and each rule does O(1)
+    # work on its streaming state. Sinks hear only transitions: a rule fires
+    # once, is silent while it stays active, and isn't re-announced within
+    # its cooldown after resolving.
+    def __init__(self, rules=DEFAULT_RULES, sinks=()):
+        self.rules = list(rules)
+        self.sinks = list(sinks)
+        self.lock = threading.Lock()
+        self.by_metric = {}
+        self.states = {}
+        self.active = {}
+        self.generation = 0 # bumped whenever `active` changes
+
+    def _rules_for(self, metric):
+        rules = self.by_metric.get(metric)
+        if rules is None:
+            rules = self.by_metric[metric] = [rule for rule in self.rules if rule.matches(metric)]
+        return rules
+
+    def evaluate(self, metrics, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        events = []
+        with self.lock:
+            for metric, value in metrics.items():
+                if value is None or value != value:
+                    continue
+                for rule in self._rules_for(metric):
+                    key = (rule, metric)
+                    state = self.states.get(key)
+                    if state is None:
+                        state = self.states[key] = {"rule": rule.new_state(), "pending": None, "resolved": None}
+                    condition = rule.test(state["rule"], value, timestamp)
+                    if condition is None:
+                        continue
+                    event = self._transition(key, state, condition, value, timestamp)
+                    if event is not None:
+                        events.append(event)
+        for event in events:
+            self._notify(*event)
+
+    def near(self, metric, value, margin=0.1):
+        # Whether `metric` is close to (or past) a rule's level, or has an
+        # alert active, i.e. worth sampling more often
+        with self.lock:
+            return any(rule.near(value, margin) or (rule, metric) in self.active for rule in self._rules_for(metric))
+
+    def _transition(self, key, state, condition, value, timestamp):
+        rule, metric = key
+        alert = self.active.get(key)
+        if condition:
+            if alert is not None:
+                alert.value = value
+                return None
+            if state["pending"] is None:
+                state["pending"] = timestamp
+            if timestamp - state["pending"] < rule.for_seconds:
+                return None
+            alert = self.active[key] = Alert(rule, metric, value, timestamp, rule.describe(metric, value))
+            self.generation += 1
+            resolved = state["resolved"]
+            if resolved is not None and timestamp - resolved < rule.cooldown:
+                # Flapping: show it, but don't notify again yet
+                return None
+            alert.notified = True
+            return ("FIRING", alert)
+
+        state["pending"] = None
+        if alert is None:
+            return None
+        del self.active[key]
+        self.generation += 1
+        state["resolved"] = timestamp
+        if not alert.notified:
+            return None
+        alert.message = rule.describe(metric, value)
+        return ("RESOLVED", alert)
+
+    def _notify(self, event, alert):
+        for sink in self.sinks:
+            try:
+                sink(event, alert)
+            except Exception as e:
+                print(f"Error in alert sink: {e}")
+
+    def firing(self):
+        # Active alerts, most severe first
+        with self.lock:
+            alerts = list(self.active.values())
+        return sorted(alerts, key=lambda a: (a.rule.severity != "critical", a.since))
+
+
+def attach_alerts(collector, rules_path=None, log_path=None, stdout=True):
+    # Evaluate the default rules (or those in `rules_path`) on every result.
+    # Without `log_path`, notifications are printed unless `stdout` is off.
+    rules = load_rules(rules_path) if rules_path else DEFAULT_RULES
+    engine = AlertEngine(rules, [LogSink(log_path)] if log_path or stdout else [])
+    collector.subscribe_metrics(engine.evaluate)
+    if collector.adaptive is not None:
+        # Sample faster while a metric is near one of these rules
+        collector.adaptive.alerts = engine
+    return engine
@@ -0,0 +1,257 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker
+
+import numpy as np
+import psutil
+
+import collectors
+import processes
+from alerts import AlertEngine
+from collectors import DataCollector
+from exporter import render
+from gpu import FakeNvml, NvmlBackend
+from iostats import UsageProbe
+from shared_snapshot import SharedSnapshotClient, SharedSnapshotWriter
+from timing import StageTimers
+
+# Runs the collector and render paths against synthetic sources and prints
+# p50/p99 per stage, so a performance change can be measured on any Linux
+# box, e.g.: python benchmark.py --processes 5000 --cores 128 --gpus 8
+
+VirtualMemory = namedtuple("VirtualMemory", "total available percent used free")
+Partition = namedtuple("Partition", "device mountpoint fstype opts")
+DiskUsage = namedtuple("DiskUsage", "total used free percent")
+DiskCounters = namedtuple("DiskCounters", "read_count write_count read_bytes write_bytes read_time write_time busy_time")
+NetCounters = namedtuple("NetCounters", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+MemoryInfo = namedtuple("MemoryInfo", "rss vms")
+IoCounters = namedtuple("IoCounters", "read_count write_count read_bytes write_bytes")
+
+
+class FakeProcess:
+    def __init__(self, pid, rng):
+        self.pid = pid
+        self.rng = rng
+        self.rss = rng.randrange(1 << 20, 1 << 30)
+        self.io = 0
+
+    def create_time(self):
+        return 1000.0 + self.pid
+
+    def name(self):
+        return f"worker-{self.pid % 997}"
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def cpu_percent(self, interval=None):
+        return self.rng.random() * 10
+
+    def memory_info(self):
+        return MemoryInfo(self.rss, self.rss * 2)
+
+    def io_counters(self):
+        self.io += self.rng.randrange(1 << 16)
+        return IoCounters(0, 0, self.io, self.io // 2)
+
+
+class FakePsutil:
+    # Stands in for the psutil calls the collectors make, sized by the
+    # arguments. Counters advance on every read; `churn` of the processes
+    # exit and are replaced by new PIDs on every pids() call.
+    NoSuchProcess = psutil.NoSuchProcess
+    ZombieProcess = psutil.ZombieProcess
+    AccessDenied = psutil.AccessDenied
+    Error = psutil.Error
+
+    def __init__(self, cores, processes, disks, nics, churn=0.01, seed=0):
+        self.rng = random.Random(seed)
+        self.cores = cores
+        self.disks = [f"sd{chr(97 + i % 26)}{i // 26 or ''}" for i in range(disks)]
+        self.nics = [f"eth{i}" for i in range(nics)]
+        self.disk_counters = np.zeros((disks, len(DiskCounters._fields)), dtype=np.int64)
+        self.net_counters = np.zeros((nics, len(NetCounters._fields)), dtype=np.int64)
+        self.processes = {pid: FakeProcess(pid, self.rng) for pid in range(1, processes + 1)}
+        self.next_pid = processes + 1
+        self.churn = churn
+
+    def cpu_count(self, logical=True):
+        return self.cores
+
+    def cpu_percent(self, interval=None, percpu=False):
+        values = [self.rng.random() * 100 for _ in range(self.cores)]
+        return values if percpu else sum(values) / self.cores
+
+    def virtual_memory(self):
+        total = 64 << 30
+        used = self.rng.randrange(total)
+        return VirtualMemory(total, total - used, used / total * 100, used, total - used)
+
+    def disk_partitions(self, all=False):
+        return [Partition(f"/dev/{name}", f"/mnt/{name}", "ext4", "rw") for name in self.disks]
+
+    def disk_io_counters(self, perdisk=False):
+        self.disk_counters += np.random.randint(0, 1 << 20, self.disk_counters.shape)
+        return {name: DiskCounters(*row) for name, row in zip(self.disks, self.disk_counters.tolist())}
+
+    def net_io_counters(self, pernic=False):
+        self.net_counters += np.random.randint(0, 1 << 20, self.net_counters.shape)
+        return {name: NetCounters(*row) for name, row in zip(self.nics, self.net_counters.tolist())}
+
+    def pids(self):
+        for pid in self.rng.sample(list(self.processes), int(len(self.processes) * self.churn)):
+            del self.processes[pid]
+            self.processes[self.next_pid] = FakeProcess(self.next_pid, self.rng)
+            self.next_pid += 1
+        return list(self.processes)
+
+    def Process(self, pid):
+        process = self.processes.get(pid)
+        if process is None:
+            raise psutil.NoSuchProcess(pid)
+        return process
+
+
+class FakeUsageProbe(UsageProbe):
+    # Keeps the probe's threads and deadline, but answers statvfs itself
+    def _stat(self, mountpoint, done):
+        done[mountpoint] = DiskUsage(1 << 40, 1 << 39, 1 << 39, 50.0)
+
+
+def fake_gpus(count):
+    readings = {}
+    for i in range(count):
+        readings[f"Fake GPU {i}"] = [(load, 4096, 16384, 60, 200.0, {1000 + i: 2048, 2000 + i: 1024}) for load in (10, 50, 90)]
+    return readings
+
+
+def use_fake_sources(fake, gpus):
+    # Point the collector modules at the synthetic sources
+    collectors.psutil = fake
+    collectors.select_backend = lambda: NvmlBackend(FakeNvml(fake_gpus(gpus)))
+    processes.psutil = fake
+    processes.LINUX = False
+
+
+def bench_collectors(timers, runs, sort, synthetic=True):
+    # Each collector's collect(), then DataCollector.on_result() with the
+    # shared memory writer, OpenMetrics render and alert engine subscribed
+    collector = DataCollector()
+    collector.process_sort = sort
+    for c in collector.scheduler.collectors:
+        if synthetic and c.name == "disk_space":
+            c.probe = FakeUsageProbe(c.probe.timeout)
+
+    writer = SharedSnapshotWriter(f"sysmon-bench-{os.getpid()}")
+    engine = AlertEngine()
+    try:
+        def publish(snapshot):
+            with timers.stage("shm.publish"):
+                writer.publish(snapshot, collector.collector_status())
+            with timers.stage("openmetrics"):
+                render(snapshot, collector.collector_status())
+
+        def alerts(metrics, timestamp):
+            with timers.stage("alerts"):
+                engine.evaluate(metrics, timestamp)
+
+        collector.subscribe(publish)
+        collector.subscribe_metrics(alerts)
+        client = SharedSnapshotClient(writer.shm.name)
+        # The client unregistered the segment from this process's tracker;
+        # the writer still owns it and unlinks it on close
+        resource_tracker.register(writer.shm._name, "shared_memory")
+
+        for c in collector.scheduler.collectors:
+            timers.histogram(c.name)
+
+        for _ in range(runs):
+            for c in collector.scheduler.collectors:
+                start = time.perf_counter()
+                result = c.collect()
+                middle = time.perf_counter()
+                collector.on_result(c, result)
+                end = time.perf_counter()
+                timers.add(c.name, (middle - start) * 1000)
+                timers.add("on_result", (end - middle) * 1000)
+            with timers.stage("shm.read"):
+                client.snapshot
+        return collector
+    finally:
+        writer.close()
+
+
+def bench_process_view(timers, runs, table):
+    # What both frontends do with the process table each update
+    for _ in range(runs):
+        with timers.stage("process.sort"):
+            np.lexsort((table["pid"], -table["cpu"]))
+        with timers.stage("process.filter"):
+            np.flatnonzero(np.char.find(np.char.lower(table["name"]), "worker-1") >= 0)
+
+
+def bench_render(timers, runs, history):
+    # A LiveGraph-sized Agg figure: a full canvas.draw() against restoring
+    # the cached background and drawing only the line
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:
+        print("matplotlib not installed, skipping render stages")
+        return
+    fig = Figure(figsize=(5, 2), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    points = history.points("1m")
+    ax.set_xlim(0, points - 1)
+    ax.set_ylim(0, 100)
+    line, = ax.plot(np.arange(points), history.view("cpu")[1], animated=True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    for _ in range(runs):
+        line.set_ydata(history.view("cpu")[1])
+        with timers.stage("canvas.draw"):
+            canvas.draw()
+        with timers.stage("blit"):
+            canvas.restore_region(background)
+            ax.draw_artist(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the collector and render paths against synthetic sources")
+    parser.add_argument("--runs", type=int, default=100, help="iterations per stage")
+    parser.add_argument("--processes", type=int, default=5000)
+    parser.add_argument("--cores", type=int, default=64)
+    parser.add_argument("--gpus", type=int, default=4)
+    parser.add_argument("--disks", type=int, default=16)
+    parser.add_argument("--nics", type=int, default=8)
+    parser.add_argument("--churn", type=float, default=0.01, help="share of processes replaced per tick")
+    parser.add_argument("--sort", choices=("cpu", "memory", "io"), default="cpu", help="process sort (io reads I/O for every process)")
+    parser.add_argument("--real", action="store_true", help="use this machine's psutil, /proc and GPUs instead of synthetic sources")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.real:
+        use_fake_sources(FakePsutil(args.cores, args.processes, args.disks, args.nics, args.churn), args.gpus)
+
+    timers = StageTimers()
+    collector = bench_collectors(timers, args.runs, args.sort, synthetic=not args.real)
+    bench_process_view(timers, args.runs, collector.snapshot.process_table)
+    bench_render(timers, args.runs, collector.history)
+
+    summary = timers.summary()
+    print(f"{'Stage':<16}{'Runs':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, count, p50, p99, worst in summary:
+        print(f"{name:<16}{count:>8}{p50:>10.3f}{p99:>10.3f}{worst:>10.3f}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "stages": {name: {"runs": count, "p50_ms": p50, "p99_ms": p99, "max_ms": worst} for name, count, p50, p99, worst in summary}}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import signal
+
+from alerts import attach_alerts
+from collectors import DataCollector
+from exporter import MetricsExporter
+from fleet import FleetAgent
+from recording import Recorder
+from shared_snapshot import DEFAULT_NAME, SharedSnapshotWriter
+
+# Name of the shared memory segment the daemon publishes to and viewers attach to
+SEGMENT_NAME = os.environ.get("SYSMON_SHM", DEFAULT_NAME)
+
+# Recording file to append samples to, if set
+RECORD_PATH = os.environ.get("SYSMON_RECORD")
+
+# Alert rules (JSON) to use instead of the defaults, and the file alerts are
+# logged to (printed when unset)
+ALERT_RULES = os.environ.get("SYSMON_ALERTS")
+ALERT_LOG = os.environ.get("SYSMON_ALERT_LOG")
+
+# Port to serve OpenMetrics on at /metrics, if set
+METRICS_PORT = os.environ.get("SYSMON_METRICS_PORT")
+
+# Address ("host:port" or "unix:/path") to stream samples to fleet viewers
+# on, and the name this host is shown under (the hostname when unset)
+AGENT_ADDRESS = os.environ.get("SYSMON_AGENT")
+AGENT_NAME = os.environ.get("SYSMON_AGENT_NAME")
+
+
+def main():
+    # Headless: samples once and publishes into shared memory for any number
+    # of viewers. Nothing GUI-related is imported here.
+    writer = SharedSnapshotWriter(SEGMENT_NAME)
+    collector = DataCollector(history=writer.history)
+    alerts = attach_alerts(collector, ALERT_RULES, ALERT_LOG)
+    # Active alerts go into the segment too, for the viewers' banners
+    collector.subscribe(lambda snapshot: writer.publish(snapshot, collector.collector_status(), alerts))
+    recorder = Recorder(collector, RECORD_PATH) if RECORD_PATH else None
+    exporter = MetricsExporter(collector, int(METRICS_PORT)) if METRICS_PORT else None
+    if exporter is not None:
+        exporter.start()
+    agent = FleetAgent(collector, AGENT_ADDRESS, AGENT_NAME) if AGENT_ADDRESS else None
+
+    def stop(signum, frame):
+        collector.running = False
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Publishing system stats to shared memory segment '{SEGMENT_NAME}'")
+    try:
+        collector.run()
+    finally:
+        if agent is not None:
+            agent.close()
+        if exporter is not None:
+            exporter.close()
+        if recorder is not None:
+            recorder.close()
+        writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,630 @@
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import psutil
+
+from gpu import select_backend
+from history import HistoryStore
+from iostats import CounterDeltas, MountWatcher, UsageProbe, is_partition
+from processes import TABLE_DTYPE, ProcessTable
+from timing import LatencyHistogram
+
+# Default sampling interval per collector, in seconds
+DEFAULT_INTERVALS = {
+    "cpu": 0.25,
+    "ram": 1,
+    "gpu": 2,
+    "disk_space": 30,
+    "disk_io": 1,
+    "net_io": 1,
+    "processes": 1,
+}
+
+
+def parse_intervals(text):
+    # "cpu=0.5,gpu=5" -> {"cpu": 0.5, "gpu": 5.0}
+    intervals = {}
+    for item in text.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip():
+            intervals[name.strip()] = float(seconds)
+    return intervals
+
+
+# Per-collector overrides of DEFAULT_INTERVALS, e.g. SYSMON_INTERVALS=cpu=0.5,gpu=5
+ENV_INTERVALS = parse_intervals(os.environ.get("SYSMON_INTERVALS", ""))
+
+# Set SYSMON_ADAPTIVE=0 to always sample at the configured intervals
+ADAPTIVE = os.environ.get("SYSMON_ADAPTIVE", "1") != "0"
+
+# Process table of a snapshot that has none (e.g. a replay)
+EMPTY_TABLE = np.zeros(0, dtype=TABLE_DTYPE)
+
+
+def get_size(bytes, suffix="B"):
+    factor = 1024
+    for unit in ["", "K", "M", "G", "T", "P"]:
+        if bytes < factor:
+            return f"{bytes:.2f}{unit}{suffix}"
+        bytes /= factor
+
+
+class Snapshot:
+    # Immutable stats published by reference swap: readers take
+    # `collector.snapshot` without locking or copying, and compare
+    # `generation` to tell whether anything changed since their last read.
+    # Nested values are shared between generations and must not be mutated.
+    __slots__ = ("generation", "cpu", "per_cpu", "ram", "gpu", "gpus", "disks", "disk_text", "disk_io", "disk_devices", "net_io", "net_interfaces", "processes", "process_table", "process_count", "process_cost_ms")
+
+    def __init__(self, generation=0, cpu=0, per_cpu=(), ram=None, gpu=None, gpus=(), disks=(), disk_text="", disk_io=None, disk_devices=(), net_io=None, net_interfaces=(), processes=(), process_table=None, process_count=0, process_cost_ms=0):
+        init = object.__setattr__
+        init(self, "generation", generation)
+        init(self, "cpu", cpu)
+        init(self, "per_cpu", per_cpu)
+        init(self, "ram", ram or {"percent": 0, "used": 0, "total": 0})
+        init(self, "gpu", gpu or {"load": 0, "memoryUsed": 0, "memoryTotal": 0, "temperature": 0, "found": False})
+        init(self, "gpus", gpus)
+        init(self, "disks", disks)
+        init(self, "disk_text", disk_text)
+        init(self, "disk_io", disk_io or {"read": 0, "write": 0})
+        init(self, "disk_devices", disk_devices)
+        init(self, "net_io", net_io or {"sent": 0, "recv": 0, "up_mb": 0, "down_mb": 0})
+        init(self, "net_interfaces", net_interfaces)
+        init(self, "processes", processes)
+        init(self, "process_table", process_table if process_table is not None else EMPTY_TABLE)
+        init(self, "process_count", process_count)
+        init(self, "process_cost_ms", process_cost_ms)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def replace(self, **changes):
+        # Next generation with `changes` applied; untouched values are shared
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        fields["generation"] = self.generation + 1
+        return Snapshot(**fields)
+
+
+class Collector:
+    # One metric source. collect() runs on a worker thread and returns the
+    # Snapshot fields it owns; samples() maps that result to history series.
+    name = None
+    boost = True # whether AdaptiveSampling may sample it faster than its base interval
+
+    def __init__(self, interval, timeout=None):
+        self.base_interval = interval
+        self.interval = interval # current interval, moved by AdaptiveSampling
+        self.timeout = timeout or max(interval * 2, 1.0)
+        self.in_flight = False
+        self.dispatched = 0.0
+        self.started = 0.0
+        self.last_ok = None
+        self.last_ms = 0.0
+        self.runs = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.timed_out = False
+        self.latency = LatencyHistogram() # collect() durations, in ms
+
+    def collect(self):
+        raise NotImplementedError
+
+    def samples(self, result):
+        return {}
+
+    def metrics(self, result):
+        # Scalars for alert rules: the history samples, plus anything worth
+        # alerting on that isn't graphed
+        return {name: value for name, value in self.samples(result).items() if not isinstance(value, tuple)}
+
+    def is_stale(self, now):
+        if self.timed_out or self.last_ok is None:
+            return True
+        return now - self.last_ok > max(self.interval * 3, self.timeout)
+
+    def status(self, now):
+        return {
+            "interval": self.interval,
+            "base_interval": self.base_interval,
+            "last_ms": self.last_ms,
+            "runs": self.runs,
+            "misses": self.misses,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "stale": self.is_stale(now),
+            "p50_ms": self.latency.quantile(0.5),
+            "p99_ms": self.latency.quantile(0.99)
+        }
+
+
+class CpuCollector(Collector):
+    name = "cpu"
+
+    def collect(self):
+        # One per-core read; the total is their mean, as psutil computes it
+        per_cpu = tuple(psutil.cpu_percent(interval=None, percpu=True))
+        return {"cpu": round(sum(per_cpu) / len(per_cpu), 1), "per_cpu": per_cpu}
+
+    def samples(self, result):
+        return {"cpu": result["cpu"], "per_cpu": result["per_cpu"]}
+
+    def metrics(self, result):
+        return {"cpu": result["cpu"], "cpu_core_max": max(result["per_cpu"])}
+
+
+class RamCollector(Collector):
+    name = "ram"
+
+    def collect(self):
+        svmem = psutil.virtual_memory()
+        return {"ram": {"percent": svmem.percent, "used": svmem.used, "total": svmem.total}}
+
+    def samples(self, result):
+        return {"ram": result["ram"]["percent"]}
+
+
+class GpuCollector(Collector):
+    name = "gpu"
+
+    def __init__(self, interval, timeout=None, backend=None):
+        super().__init__(interval, timeout)
+        self.backend = backend or select_backend()
+
+    def collect(self):
+        # `gpus` has every device; `gpu` summarises them (mean load, summed
+        # memory, hottest temperature)
+        gpus = tuple(self.backend.devices())
+        gpu_stats = {"found": False, "load": 0, "memoryUsed": 0, "memoryTotal": 0, "temperature": 0}
+        if gpus:
+            gpu_stats = {
+                "found": True,
+                "load": sum(g["load"] for g in gpus) / len(gpus),
+                "memoryUsed": sum(g["memoryUsed"] for g in gpus),
+                "memoryTotal": sum(g["memoryTotal"] for g in gpus),
+                "temperature": max(g["temperature"] for g in gpus)
+            }
+        return {"gpu": gpu_stats, "gpus": gpus}
+
+    def samples(self, result):
+        return {"gpu": result["gpu"]["load"] if result["gpu"]["found"] else None}
+
+
+class DiskSpaceCollector(Collector):
+    name = "disk_space"
+    boost = False # usage moves slowly, and a probe can hang on a dead mount
+
+    def __init__(self, interval, timeout=None, probe_timeout=2.0):
+        super().__init__(interval, timeout)
+        self.mounts = MountWatcher()
+        self.probe = UsageProbe(probe_timeout)
+        self.partitions = []
+
+    def collect(self):
+        # The partition list is only re-read when the mount table changes
+        if self.mounts.changed():
+            self.partitions = psutil.disk_partitions()
+        usages = self.probe.probe([p.mountpoint for p in self.partitions])
+        lines = []
+        disks = []
+        for partition in self.partitions:
+            usage, stale = usages.get(partition.mountpoint, (None, True))
+            if usage is None or not usage.total:
+                continue
+            percent = (usage.used / usage.total) * 100
+            lines.append(f"{partition.device} ({partition.mountpoint}): {percent:.1f}% Used of {get_size(usage.total)}" + (" (not responding)" if stale else ""))
+            disks.append({"device": partition.device, "mountpoint": partition.mountpoint, "used": usage.used, "total": usage.total, "stale": stale})
+        return {"disk_text": "\n".join(lines), "disks": tuple(disks)}
+
+    def metrics(self, result):
+        return {f"disk_used:{d['mountpoint']}": d["used"] / d["total"] * 100 for d in result["disks"] if not d["stale"]}
+
+
+class DiskIOCollector(Collector):
+    name = "disk_io"
+
+    # busy_time is Linux/FreeBSD only and reads as 0 elsewhere
+    FIELDS = ("read_bytes", "write_bytes", "read_count", "write_count", "read_time", "write_time", "busy_time")
+
+    def __init__(self, interval, timeout=None):
+        super().__init__(interval, timeout)
+        self.counters = CounterDeltas(self.FIELDS)
+        self.counters.update(psutil.disk_io_counters(perdisk=True) or {}, time.monotonic())
+
+    def collect(self):
+        names, delta, seconds = self.counters.update(psutil.disk_io_counters(perdisk=True) or {}, time.monotonic())
+        read_bytes, write_bytes, reads, writes, read_time, write_time, busy_time = delta.T
+        ios = reads + writes
+        rates = np.stack([
+            read_bytes / seconds / (1024 * 1024), # MB/s
+            write_bytes / seconds / (1024 * 1024), # MB/s
+            reads / seconds,
+            writes / seconds,
+            (read_time + write_time) / np.maximum(ios, 1), # ms per request
+            np.minimum(busy_time / (seconds * 1000) * 100, 100), # % of the interval busy
+        ], axis=1).tolist()
+
+        whole = [not is_partition(name) for name in names]
+        total = np.sum(delta[whole], axis=0) if any(whole) else np.zeros(len(self.FIELDS))
+        return {
+            "disk_io": {
+                "read": float(total[0]) / seconds / (1024 * 1024), # MB/s
+                "write": float(total[1]) / seconds / (1024 * 1024) # MB/s
+            },
+            "disk_devices": tuple({
+                "name": name,
+                "read": r[0],
+                "write": r[1],
+                "read_iops": r[2],
+                "write_iops": r[3],
+                "await_ms": r[4],
+                "util": r[5],
+                "partition": is_partition(name)
+            } for name, r in zip(names, rates))
+        }
+
+    def samples(self, result):
+        return {"disk_read": result["disk_io"]["read"], "disk_write": result["disk_io"]["write"]}
+
+
+class NetIOCollector(Collector):
+    name = "net_io"
+
+    FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errin", "errout", "dropin", "dropout")
+
+    def __init__(self, interval, timeout=None):
+        super().__init__(interval, timeout)
+        self.counters = CounterDeltas(self.FIELDS)
+        self.counters.update(psutil.net_io_counters(pernic=True) or {}, time.monotonic())
+
+    def collect(self):
+        names, delta, seconds = self.counters.update(psutil.net_io_counters(pernic=True) or {}, time.monotonic())
+        rates = delta / seconds
+        total = rates.sum(axis=0) if len(names) else np.zeros(len(self.FIELDS))
+        bytes_sent_sec, bytes_recv_sec = float(total[0]), float(total[1])
+        return {
+            "net_io": {
+                "sent": bytes_sent_sec,
+                "recv": bytes_recv_sec,
+                "up_mb": bytes_sent_sec / (1024 * 1024),
+                "down_mb": bytes_recv_sec / (1024 * 1024)
+            },
+            "net_interfaces": tuple({
+                "name": name,
+                "sent": r[0],
+                "recv": r[1],
+                "packets_sent": r[2],
+                "packets_recv": r[3],
+                "errors": r[4] + r[5],
+                "drops": r[6] + r[7]
+            } for name, r in zip(names, rates.tolist()))
+        }
+
+    def samples(self, result):
+        return {"net_up": result["net_io"]["up_mb"], "net_down": result["net_io"]["down_mb"]}
+
+
+class ProcessCollector(Collector):
+    name = "processes"
+    boost = False # a full process scan is the most expensive collector
+
+    def __init__(self, interval, timeout=None, cpu_count=None):
+        super().__init__(interval, timeout)
+        self.table = ProcessTable(cpu_count)
+        self.sort = "cpu"
+
+    def collect(self):
+        sort = self.sort
+        self.table.update(with_io=(sort == "io"))
+        return {
+            "processes": tuple(self.table.top(10, sort)),
+            "process_table": self.table.table(),
+            "process_count": len(self.table),
+            "process_cost_ms": self.table.cost_ms
+        }
+
+    def samples(self, result):
+        return {"process_cost_ms": result["process_cost_ms"]}
+
+
+class Scheduler:
+    # Hashed timer wheel: each collector sits in the slot of its next due
+    # tick; collectors due further out than one revolution stay in the slot
+    # until their due tick comes round. The loop sleeps straight to the
+    # earliest due tick (or an in-flight run's timeout), so a slow cadence
+    # costs one wakeup per run. Work runs on a bounded pool of daemon
+    # threads (so a hung source can't block exit), and a collector never has
+    # more than one run in flight, so it can hold at most one worker and only
+    # its own metric goes stale.
+    def __init__(self, on_result, tick=0.05, slots=256, workers=4):
+        self.on_result = on_result
+        self.tick = tick
+        self.wheel = [[] for _ in range(slots)]
+        self.tick_count = 0
+        self.start = time.monotonic()
+        self.collectors = []
+        self.workers = workers
+        self.queue = queue.Queue()
+        self._running = True
+        self.wakeup = threading.Event()
+        self.expedite_pending = False
+
+    @property
+    def running(self):
+        return self._running
+
+    @running.setter
+    def running(self, value):
+        self._running = value
+        self.wakeup.set()
+
+    def add(self, collector):
+        self.collectors.append(collector)
+        self._schedule(collector, self.tick_count + 1)
+
+    def _schedule(self, collector, due_tick):
+        collector.due_tick = due_tick
+        self.wheel[due_tick % len(self.wheel)].append(collector)
+
+    def ticks(self, seconds):
+        return max(1, round(seconds / self.tick))
+
+    def expedite(self):
+        # Intervals are read when a collector is rescheduled; after shortening
+        # one, ask the run loop to pull it in rather than wait out the old one
+        self.expedite_pending = True
+        self.wakeup.set()
+
+    def _expedite(self):
+        # The loop may have slept past tick_count; count from the clock
+        now = max(self.tick_count, int((time.monotonic() - self.start) / self.tick))
+        for collector in self.collectors:
+            due = now + self.ticks(collector.interval)
+            if due < collector.due_tick:
+                self.wheel[collector.due_tick % len(self.wheel)].remove(collector)
+                self._schedule(collector, due)
+
+    def _next_timeout(self):
+        return min((c.dispatched + c.timeout for c in self.collectors if c.in_flight and not c.timed_out), default=None)
+
+    def run(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f"collector-{i}", daemon=True).start()
+
+        self.start = time.monotonic() - self.tick_count * self.tick
+        while self.running:
+            if self.expedite_pending:
+                self.expedite_pending = False
+                self._expedite()
+
+            # Nothing can be due before the earliest due tick, so jump to it
+            due_tick = min((c.due_tick for c in self.collectors), default=self.tick_count + len(self.wheel))
+            due_time = self.start + due_tick * self.tick
+            wake = due_time
+            timeout = self._next_timeout()
+            if timeout is not None:
+                wake = min(wake, timeout)
+            delay = wake - time.monotonic()
+            if delay > 0:
+                self.wakeup.wait(delay)
+                self.wakeup.clear()
+            if time.monotonic() < due_time:
+                # Woken early: a timeout to check, expedite() or stopping
+                self._check_timeouts()
+                continue
+            self.tick_count = due_tick
+
+            slot = self.wheel[self.tick_count % len(self.wheel)]
+            due = [c for c in slot if c.due_tick <= self.tick_count]
+            if due:
+                slot[:] = [c for c in slot if c.due_tick > self.tick_count]
+                for collector in due:
+                    self._dispatch(collector)
+                    self._schedule(collector, self.tick_count + self.ticks(collector.interval))
+
+            self._check_timeouts()
+
+    def _work(self):
+        while True:
+            self._run(self.queue.get())
+
+    def _dispatch(self, collector):
+        if collector.in_flight:
+            # Previous run hasn't returned: skip this deadline
+            collector.misses += 1
+            return
+        collector.in_flight = True
+        collector.dispatched = time.monotonic()
+        self.queue.put(collector)
+
+    def _run(self, collector):
+        collector.started = time.monotonic()
+        if collector.started - collector.dispatched > collector.interval:
+            # Sat in the pool queue past its next deadline
+            collector.misses += 1
+        try:
+            result = collector.collect()
+            collector.last_ok = time.monotonic()
+            collector.latency.add((collector.last_ok - collector.started) * 1000)
+            collector.timed_out = False
+            self.on_result(collector, result)
+        except Exception as e:
+            collector.errors += 1
+            print(f"Error in {collector.name} collector: {e}")
+        finally:
+            collector.runs += 1
+            collector.last_ms = (time.monotonic() - collector.started) * 1000
+            collector.in_flight = False
+
+    def _check_timeouts(self):
+        now = time.monotonic()
+        for collector in self.collectors:
+            if collector.in_flight and not collector.timed_out and now - collector.dispatched > collector.timeout:
+                collector.timed_out = True
+                collector.timeouts += 1
+
+
+class AdaptiveSampling:
+    # Picks each collector's interval from its latest metrics. A metric that
+    # moved by more than `change` of its magnitude (at least `floor`) since
+    # the previous sample, or that comes within `margin` of an alert rule's
+    # level, samples its collector every `fast` seconds (a quarter of the
+    # base interval at most) for the next `hold` seconds. A value that stays
+    # close only boosts again after leaving that band. In background mode,
+    # when nobody is watching, every collector runs `slowdown` times slower
+    # (at least every `background_min` seconds), boosted or not, and still
+    # feeds the history and the alert rules.
+    def __init__(self, fast=0.25, hold=10.0, change=0.25, floor=40.0, margin=0.1, slowdown=4, background_min=5.0):
+        self.fast = fast
+        self.hold = hold
+        self.change = change
+        self.floor = floor
+        self.margin = margin
+        self.slowdown = slowdown
+        self.background_min = background_min
+        self.background = False
+        self.alerts = None # AlertEngine whose rule levels count as "near"
+        self.previous = {}
+        self.near = {} # metric -> whether its last sample was near a rule
+        self.boosted = {} # collector name -> monotonic time its boost ends
+
+    def hot(self, metrics):
+        hot = False
+        for metric, value in metrics.items():
+            if value is None or value != value:
+                continue
+            prev = self.previous.get(metric)
+            self.previous[metric] = value
+            near = self.alerts is not None and self.alerts.near(metric, value, self.margin)
+            was_near = self.near.get(metric, False)
+            self.near[metric] = near
+            if prev is not None and abs(value - prev) > self.change * max(abs(value), abs(prev), self.floor):
+                hot = True
+            elif near and not was_near:
+                hot = True
+        return hot
+
+    def observe(self, collector, metrics, now):
+        if collector.boost and self.hot(metrics):
+            self.boosted[collector.name] = now + self.hold
+
+    def interval(self, collector, now):
+        base = collector.base_interval
+        if self.background:
+            return max(base * self.slowdown, self.background_min)
+        if self.boosted.get(collector.name, 0) > now:
+            return min(base, max(self.fast, base / 4))
+        return base
+
+
+class DataCollector(threading.Thread):
+    def __init__(self, intervals=None, history=None, adaptive=ADAPTIVE):
+        super().__init__()
+        self.daemon = True
+        self.lock = threading.Lock() # serialises results, so callbacks see generations in order
+        self.snapshot = Snapshot()
+        self.cpu_count = psutil.cpu_count(logical=True)
+        self.history = history or HistoryStore()
+        self.subscribers = []
+        self.metric_subscribers = []
+        self.intervals = {**DEFAULT_INTERVALS, **ENV_INTERVALS, **(intervals or {})}
+        self.adaptive = AdaptiveSampling() if adaptive else None
+
+        self.scheduler = Scheduler(self.on_result)
+        self.process_collector = ProcessCollector(self.intervals["processes"], cpu_count=self.cpu_count)
+        for collector in (
+            CpuCollector(self.intervals["cpu"]),
+            RamCollector(self.intervals["ram"]),
+            GpuCollector(self.intervals["gpu"]),
+            DiskSpaceCollector(self.intervals["disk_space"]),
+            DiskIOCollector(self.intervals["disk_io"]),
+            NetIOCollector(self.intervals["net_io"]),
+            self.process_collector,
+        ):
+            self.register(collector)
+
+    def register(self, collector):
+        self.scheduler.add(collector)
+
+    def subscribe(self, callback):
+        # callback(snapshot) runs on the collector worker after each result
+        self.subscribers.append(callback)
+
+    def subscribe_metrics(self, callback):
+        # callback(metrics, timestamp) with each result's Collector.metrics()
+        self.metric_subscribers.append(callback)
+
+    @property
+    def running(self):
+        return self.scheduler.running
+
+    @running.setter
+    def running(self, value):
+        self.scheduler.running = value
+
+    @property
+    def process_sort(self):
+        return self.process_collector.sort
+
+    @process_sort.setter
+    def process_sort(self, value):
+        self.process_collector.sort = value
+
+    @property
+    def background(self):
+        return self.adaptive is not None and self.adaptive.background
+
+    @background.setter
+    def background(self, value):
+        # Set while no view is shown: sample slowly, but keep recording.
+        # Takes effect on every collector at once, in both directions.
+        if self.adaptive is None or self.adaptive.background == value:
+            return
+        self.adaptive.background = value
+        now = time.monotonic()
+        for collector in self.scheduler.collectors:
+            self.retime(collector, self.adaptive.interval(collector, now))
+
+    def retime(self, collector, interval):
+        shorter = interval < collector.interval
+        collector.interval = interval
+        if shorter:
+            self.scheduler.expedite()
+
+    def on_result(self, collector, result):
+        # Workers merge and notify under the lock, so a subscriber never
+        # sees an older generation after a newer one; readers just take
+        # the reference
+        with self.lock:
+            snapshot = self.snapshot.replace(**result)
+            self.snapshot = snapshot
+            self.history.record(collector.samples(result))
+            if self.metric_subscribers or self.adaptive is not None:
+                metrics = collector.metrics(result)
+            if self.adaptive is not None:
+                now = time.monotonic()
+                self.adaptive.observe(collector, metrics, now)
+                self.retime(collector, self.adaptive.interval(collector, now))
+            if self.metric_subscribers:
+                timestamp = time.time()
+                for callback in self.metric_subscribers:
+                    try:
+                        callback(metrics, timestamp)
+                    except Exception as e:
+                        print(f"Error in DataCollector metric subscriber: {e}")
+            for callback in self.subscribers:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"Error in DataCollector subscriber: {e}")
+
+    def collector_status(self):
+        now = time.monotonic()
+        return {c.name: c.status(now) for c in self.scheduler.collectors}
+
+    def run(self):
+        self.scheduler.run()
@@ -0,0 +1,308 @@
+import contextlib
+import curses
+import locale
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from collectors import get_size
+from sources import attach_collector, attach_local_alerts
+
+# Screen updates per second; "+" and "-" change it while running
+REFRESH_HZ = float(os.environ.get("SYSMON_TUI_HZ", "1"))
+MAX_HZ = 20
+
+SPARKS = "▁▂▃▄▅▆▇█"
+ASCII_SPARKS = "_.-:=+*#"
+
+# Process table column -> (header, collector sort)
+SORTS = {
+    "cpu": ("CPU%", "cpu"),
+    "rss": ("MEM", "memory"),
+    "io": ("I/O", "io"),
+}
+
+LABEL_WIDTH = 7
+VALUE_WIDTH = 30
+
+
+def sparkline(values, width, limit=None, chars=SPARKS):
+    # One character per sample, newest on the right; NaN (no data) is blank.
+    # Without a limit the series is scaled to its own maximum.
+    values = np.asarray(values[max(len(values) - width, 0):] if width > 0 else values[:0], dtype=np.float64)
+    if limit is None:
+        finite = values[np.isfinite(values)]
+        limit = finite.max() if len(finite) and finite.max() > 0 else 1
+    levels = np.clip(values / limit * len(chars), 0, len(chars) - 1)
+    index = np.where(np.isfinite(levels), levels, len(chars)).astype(np.intp)
+    return "".join(np.array(list(chars) + [" "])[index]).rjust(width)
+
+
+class Screen:
+    # Diff-based drawing: a frame is {row: [(col, text, attr), ...]} and only
+    # segments that differ from the previous frame are written, so values
+    # that didn't change cost nothing. curses then sends the terminal just
+    # the cells that differ from what it shows.
+    def __init__(self, window):
+        self.window = window
+        self.prev = {}
+
+    def invalidate(self):
+        self.prev = {}
+        self.window.erase()
+
+    def draw(self, frame):
+        height, width = self.window.getmaxyx()
+        for row in set(self.prev) | set(frame):
+            if row >= height:
+                continue
+            segments = frame.get(row, [])
+            old = self.prev.get(row, [])
+            if segments == old:
+                continue
+            kept = set(segments)
+            for col, text, attr in old:
+                if (col, text, attr) not in kept:
+                    self._put(row, col, " " * len(text), curses.A_NORMAL, width)
+            drawn = set(old)
+            for col, text, attr in segments:
+                if (col, text, attr) not in drawn:
+                    self._put(row, col, text, attr, width)
+        self.prev = frame
+        self.window.noutrefresh()
+        curses.doupdate()
+
+    def _put(self, row, col, text, attr, width):
+        if col >= width:
+            return
+        try:
+            self.window.addstr(row, col, text[:width - col], attr)
+        except curses.error:
+            # Writing the bottom-right cell moves the cursor off screen
+            pass
+
+
+class Dashboard:
+    # Terminal frontend over the same collector sources as the desktop app.
+    # A frame is only composed when the snapshot generation changes (or on a
+    # key press or resize), so an idle screen costs one getch() timeout.
+    def __init__(self, window, collector, alerts=None):
+        self.window = window
+        self.collector = collector
+        self.alerts = alerts
+        self.screen = Screen(window)
+        self.hz = min(max(REFRESH_HZ, 0.1), MAX_HZ)
+        self.sort = "cpu"
+        self.generation = None
+        self.table = None
+        self.rows = ()
+        self.count = 0
+        utf8 = "UTF" in locale.getpreferredencoding(False).upper()
+        self.sparks = SPARKS if utf8 else ASCII_SPARKS
+
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.colors = {"ok": curses.A_NORMAL, "warn": curses.A_BOLD, "bad": curses.A_BOLD | curses.A_REVERSE, "title": curses.A_BOLD}
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            for pair, color in enumerate((curses.COLOR_GREEN, curses.COLOR_YELLOW, curses.COLOR_RED, curses.COLOR_CYAN), 1):
+                curses.init_pair(pair, color, -1)
+            self.colors = {
+                "ok": curses.color_pair(1),
+                "warn": curses.color_pair(2),
+                "bad": curses.color_pair(3) | curses.A_BOLD,
+                "title": curses.color_pair(4) | curses.A_BOLD,
+            }
+
+    def level(self, percent):
+        if percent >= 90:
+            return self.colors["bad"]
+        if percent >= 70:
+            return self.colors["warn"]
+        return self.colors["ok"]
+
+    def run(self):
+        next_frame = 0
+        while True:
+            now = time.monotonic()
+            if now >= next_frame:
+                self.refresh()
+                next_frame = now + 1 / self.hz
+            self.window.timeout(max(int((next_frame - time.monotonic()) * 1000), 0))
+            key = self.window.getch()
+            if key == -1:
+                continue
+            if key in (ord("q"), ord("Q"), 27):
+                return
+            if key == curses.KEY_RESIZE:
+                self.screen.invalidate()
+            elif key in (ord("+"), ord("=")):
+                self.hz = min(self.hz * 2, MAX_HZ)
+            elif key in (ord("-"), ord("_")):
+                self.hz = max(self.hz / 2, 0.1)
+            elif key in (ord("s"), ord("\t")):
+                sorts = list(SORTS)
+                self.set_sort(sorts[(sorts.index(self.sort) + 1) % len(sorts)])
+            elif key in (ord("c"), ord("m"), ord("i")):
+                self.set_sort({ord("c"): "cpu", ord("m"): "rss", ord("i"): "io"}[key])
+            # Redraw now rather than at the next tick
+            self.generation = None
+            next_frame = 0
+
+    def set_sort(self, sort):
+        self.sort = sort
+        self.table = None
+        self.collector.process_sort = SORTS[sort][1]
+
+    def refresh(self):
+        snapshot = self.collector.snapshot
+        if snapshot.generation == self.generation:
+            return
+        self.generation = snapshot.generation
+        height, width = self.window.getmaxyx()
+        self.screen.draw(self.compose(snapshot, height, width))
+
+    def compose(self, snapshot, height, width):
+        frame = {}
+        history = self.collector.history
+        spark_col = LABEL_WIDTH + VALUE_WIDTH
+        spark_width = max(width - spark_col - 1, 0)
+
+        def metric(row, label, value, attr=curses.A_NORMAL, series=None, limit=None):
+            segments = [(0, label.ljust(LABEL_WIDTH), self.colors["title"]), (LABEL_WIDTH, value.ljust(VALUE_WIDTH), attr)]
+            if series is not None and spark_width:
+                segments.append((spark_col, sparkline(history.view(series)[1], spark_width, limit, self.sparks), attr))
+            frame[row] = segments
+
+        stale = [name for name, status in self.collector.collector_status().items() if status["stale"]]
+        help = f"{self.hz:g} Hz | sort {SORTS[self.sort][0]} | q quit  s sort  +/- rate"
+        frame[0] = [(0, "System Monitor", self.colors["title"]), (16, help, curses.A_DIM)]
+        if stale:
+            frame[0].append((18 + len(help), "Stale: " + ", ".join(stale), self.colors["warn"]))
+        if self.alerts is not None:
+            firing = self.alerts.firing()
+            if firing:
+                text = f"{len(firing)} alert{'s' if len(firing) > 1 else ''}: " + " | ".join(a.message for a in firing)
+                frame[1] = [(0, text, self.colors["bad"] if firing[0].rule.severity == "critical" else self.colors["warn"])]
+
+        row = 2
+        metric(row, "CPU", f"{snapshot.cpu:5.1f}%", self.level(snapshot.cpu), "cpu", 100)
+        row += 1
+        if snapshot.per_cpu:
+            cores = np.asarray(snapshot.per_cpu, dtype=np.float64)
+            bars = sparkline(cores, min(len(cores), max(width - LABEL_WIDTH - 1, 0)), 100, self.sparks)
+            frame[row] = [(0, "Cores".ljust(LABEL_WIDTH), self.colors["title"]), (LABEL_WIDTH, bars, self.level(float(cores.max())))]
+            row += 1
+
+        ram = snapshot.ram
+        metric(row, "RAM", f"{ram['percent']:5.1f}% {get_size(ram['used'])} / {get_size(ram['total'])}", self.level(ram["percent"]), "ram", 100)
+        row += 1
+
+        for i, g in enumerate(snapshot.gpus):
+            memory = g["memoryUsed"] / g["memoryTotal"] * 100 if g["memoryTotal"] else 0
+            metric(row, f"GPU{g['index']}", f"{g['load']:5.1f}% {g['temperature']:.0f}C {g['memoryUsed']:.0f}/{g['memoryTotal']:.0f}MB", self.level(max(g["load"], memory)), "gpu" if i == 0 else None, 100)
+            row += 1
+
+        metric(row, "Read", f"{snapshot.disk_io['read']:8.2f} MB/s", series="disk_read")
+        metric(row + 1, "Write", f"{snapshot.disk_io['write']:8.2f} MB/s", series="disk_write")
+        metric(row + 2, "Up", f"{get_size(snapshot.net_io['sent'])}/s", series="net_up")
+        metric(row + 3, "Down", f"{get_size(snapshot.net_io['recv'])}/s", series="net_down")
+        row += 4
+
+        if snapshot.disks:
+            col = LABEL_WIDTH
+            segments = [(0, "Disks".ljust(LABEL_WIDTH), self.colors["title"])]
+            for d in snapshot.disks:
+                percent = d["used"] / d["total"] * 100 if d["total"] else 0
+                text = f"{d['mountpoint']} {percent:.0f}%" + ("?" if d["stale"] else "")
+                if col + len(text) > width:
+                    break
+                segments.append((col, text, self.level(percent)))
+                col += len(text) + 2
+            frame[row] = segments
+            row += 1
+
+        row += 1
+        if row < height - 1:
+            self.compose_processes(frame, snapshot, row, height - row)
+        return frame
+
+    def compose_processes(self, frame, snapshot, row, height):
+        # Columns are separate segments, so a changed CPU% only rewrites
+        # that cell
+        titles = [f"{'PID':>7}", f"{'CPU%':>6}", f"{'MEM':>10}", f"{'I/O':>11}", "NAME"]
+        cols = (0, 8, 15, 26, 39)
+        marker = {"cpu": 1, "rss": 2, "io": 3}[self.sort]
+        frame[row] = [(col, title, curses.A_REVERSE | (curses.A_BOLD if i == marker else 0)) for i, (col, title) in enumerate(zip(cols, titles))]
+        count = height - 2
+        if count <= 0:
+            return
+
+        table = snapshot.process_table
+        if table is not self.table or count != self.count:
+            # Re-sort only when the process collector published a new table
+            self.table = table
+            self.count = count
+            # Highest first, ties by PID
+            order = np.lexsort((table["pid"], -table[self.sort].astype(np.float64)))[:count]
+            top = table[order]
+            self.rows = list(zip(top["pid"].tolist(), top["cpu"].tolist(), top["rss"].tolist(), top["io"].tolist(), top["name"].tolist()))
+            if not self.rows:
+                self.rows = [(p["pid"], p["cpu"], p["rss"], p["io"], p["name"]) for p in snapshot.processes]
+
+        for i, (pid, cpu, rss, io, name) in enumerate(self.rows[:count]):
+            frame[row + 1 + i] = [
+                (0, f"{pid:>7}", curses.A_NORMAL),
+                (8, f"{cpu:>6.1f}", self.level(cpu)),
+                (15, f"{get_size(rss):>10}", curses.A_NORMAL),
+                (26, f"{get_size(io) + '/s':>11}", curses.A_NORMAL),
+                (39, name, curses.A_NORMAL),
+            ]
+
+
+class Captured:
+    # Stands in for stdout/stderr while curses owns the terminal, so prints
+    # from collector threads don't land on the screen; the last lines are
+    # shown once it is restored
+    def __init__(self, lines=100):
+        self.lines = deque(maxlen=lines)
+        self.partial = ""
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        with self.lock:
+            *done, self.partial = (self.partial + text).split("\n")
+            self.lines.extend(done)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def main():
+    locale.setlocale(locale.LC_ALL, "")
+    collector = attach_collector()
+    # Notifications show in the banner (and SYSMON_ALERT_LOG), not on stdout
+    alerts = attach_local_alerts(collector, stdout=False)
+    captured = Captured()
+    collector.start()
+    try:
+        with contextlib.redirect_stdout(captured), contextlib.redirect_stderr(captured):
+            curses.wrapper(lambda window: Dashboard(window, collector, alerts).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.running = False
+        for line in [*captured.lines, captured.partial] if captured.partial else captured.lines:
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,47 @@
 import customtkinter as ctk
-import psutil
 import time
-import shutil
-import threading
-from collections import deque
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import GPUtil
+import os
+import numpy as np
+import psutil
+from collectors import EMPTY_TABLE, get_size
+from fleet import FIELD_INDEX
+from history import MATRIX_CAPACITY, VIEWS
+from replay import MAX_SPEED, ReplaySource
+from sources import attach_collector, attach_fleet, attach_local_alerts, set_background
+from timing import StageTimers
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
-class LiveGraph(ctk.CTkFrame):
-    def __init__(self, parent, title, y_label, max_points=60, y_limit=100):
+# "blit" redraws only the lines over a cached background, "full" redraws the whole figure
+RENDER_MODE = os.environ.get("SYSMON_RENDER", "blit")
+
+# UI refresh period while a collector samples faster than its base interval
+FAST_REFRESH_MS = 250
+
+# UI stage durations (update_stats, canvas.draw, blit) for the diagnostics panel
+TIMINGS = StageTimers()
+
+
+def format_interval(seconds):
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:g}s"
+
+
+class BlitFigure(ctk.CTkFrame):
+    # A single-axes figure whose animated artists are blitted over a cached
+    # background; subclasses create the artists and list them.
+    def __init__(self, parent, title, y_label, render_mode=None):
+        # matplotlib is imported when the first graph is built, not at startup
+        from matplotlib.figure import Figure
+
         super().__init__(parent, fg_color="transparent")
-        self.max_points = max_points
-        self.y_limit = y_limit
-        
-        self.x_data = list(range(max_points))
-        self.y_data = deque([0]*max_points, maxlen=max_points)
-        self.y_data2 = deque([0]*max_points, maxlen=max_points) # For second line
-        self.has_second_line = False
+        self.render_mode = render_mode or RENDER_MODE
+
+        # Blit state: static background is cached per (size, ylim)
+        self.background = None
+        self.background_key = None
+        self.frame_stats = {"blit": [0, 0.0], "full": [0, 0.0]}
+        self.last_frame_ms = 0.0
 
         # Create Figure
         self.fig = Figure(figsize=(5, 2), dpi=100)
@@ -33,173 +53,417 @@ class LiveGraph(ctk.CTkFrame):
         self.ax.set_ylabel(y_label, color='white', fontsize=7)
         self.ax.tick_params(axis='x', colors='white', labelsize=6)
         self.ax.tick_params(axis='y', colors='white', labelsize=6)
+
+    def show_canvas(self):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    @property
+    def blitting(self):
+        return self.render_mode == "blit"
+
+    def close(self):
+        # Drop the figure and its Tk canvas so their memory can be reclaimed
+        self.fig.clear()
+        self.canvas.get_tk_widget().destroy()
+        self.background = None
+        self.destroy()
+
+    def animated_artists(self):
+        return []
+
+    def current_background_key(self):
+        return (tuple(self.fig.bbox.bounds), self.ax.get_xlim(), self.ax.get_ylim())
+
+    def on_draw(self, event):
+        # Runs at the end of every full draw (ours, resize, expose); animated
+        # artists are skipped by canvas.draw(), so paint them on top here.
+        if not self.blitting:
+            return
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.background_key = self.current_background_key()
+        for artist in self.animated_artists():
+            self.ax.draw_artist(artist)
+
+    def render(self):
+        start = time.perf_counter()
+        if self.blitting and self.background is not None and self.background_key == self.current_background_key():
+            path = "blit"
+            self.canvas.restore_region(self.background)
+            for artist in self.animated_artists():
+                self.ax.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+        else:
+            path = "full"
+            self.canvas.draw()
+        elapsed = time.perf_counter() - start
+        self.last_frame_ms = elapsed * 1000
+        TIMINGS.add("canvas.draw" if path == "full" else "blit", self.last_frame_ms)
+        self.frame_stats[path][0] += 1
+        self.frame_stats[path][1] += elapsed
+
+class LiveGraph(BlitFigure):
+    def __init__(self, parent, title, y_label, history, series, y_limit=100, view="1m", render_mode=None):
+        super().__init__(parent, title, y_label, render_mode)
+        self.history = history
+        self.series = series
+        self.series2 = None # For second line
+        self.view = view
+        self.y_limit = y_limit
+
+        max_points = history.points(view)
+        self.x_data = np.arange(max_points)
+        self.has_second_line = False
+        self.legend = None
+
         self.ax.set_ylim(0, y_limit)
         self.ax.set_xlim(0, max_points - 1)
         self.ax.grid(True, color='#444444', linestyle='--', linewidth=0.5)
         
         # Lines
-        self.line1, = self.ax.plot(self.x_data, self.y_data, color='#1f538d', linewidth=1.5)
+        self.line1, = self.ax.plot(self.x_data, self.history.view(series, view)[1], color='#1f538d', linewidth=1.5, animated=self.blitting)
         self.line2 = None
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.show_canvas()
 
-    def add_second_line(self, label, color='#e0e0e0'):
+    def add_second_line(self, series, label, color='#e0e0e0'):
         self.has_second_line = True
-        self.line2, = self.ax.plot(self.x_data, self.y_data2, color=color, linewidth=1.5, label=label)
-        self.ax.legend(loc='upper left', facecolor='#2b2b2b', edgecolor='white', labelcolor='white', fontsize=6)
+        self.series2 = series
+        self.line2, = self.ax.plot(self.x_data, self.history.view(series, self.view)[1], color=color, linewidth=1.5, label=label, animated=self.blitting)
+        self.legend = self.ax.legend(loc='upper left', facecolor='#2b2b2b', edgecolor='white', labelcolor='white', fontsize=6)
+        self.legend.set_animated(self.blitting)
+        self.background = None
+
+    def animated_artists(self):
+        artists = [self.line1]
+        if self.line2 is not None:
+            artists.append(self.line2)
+        if self.legend is not None:
+            artists.append(self.legend)
+        return artists
+
+    def autoscale(self):
+        # Running maxima are kept by the history store, so this is O(1)
+        peaks = [self.history.extrema(self.series, self.view)[1], self.history.extrema(self.series2, self.view)[1]]
+        peaks = [p for p in peaks if p == p]
+        if not peaks or max(peaks) <= 0:
+            return
+        max_val = max(peaks)
+        top = self.ax.get_ylim()[1]
+        # Only move the limit when the data leaves the band, so blitting
+        # isn't defeated by a new y-limit on every tick.
+        if max_val > top or max_val * 1.2 < top * 0.5:
+            self.ax.set_ylim(0, max_val * 1.2)
+
+    def set_view(self, view):
+        self.view = view
+        max_points = self.history.points(view)
+        self.x_data = np.arange(max_points)
+        self.ax.set_xlim(0, max_points - 1)
+        self.line1.set_data(self.x_data, self.history.view(self.series, view)[1])
+        if self.has_second_line:
+            self.line2.set_data(self.x_data, self.history.view(self.series2, view)[1])
+        self.background = None
+        self.canvas.draw()
 
-    def update_graph(self, new_value, new_value2=None):
-        self.y_data.append(new_value)
-        self.line1.set_ydata(self.y_data)
+    def update_graph(self):
+        self.line1.set_ydata(self.history.view(self.series, self.view)[1])
         
-        if self.has_second_line and new_value2 is not None:
-            self.y_data2.append(new_value2)
-            self.line2.set_ydata(self.y_data2)
+        if self.has_second_line:
+            self.line2.set_ydata(self.history.view(self.series2, self.view)[1])
             
             if self.y_limit is None:
-                max_val = max(max(self.y_data), max(self.y_data2))
-                if max_val > 0:
-                    self.ax.set_ylim(0, max_val * 1.2)
+                self.autoscale()
         
-        self.canvas.draw()
+        self.render()
+
+class CoreHeatmap(BlitFigure):
+    # Per-core CPU as one image (cores x samples). Each update points the
+    # image at the history's newest columns; no per-core artists.
+    def __init__(self, parent, history, series="per_cpu", cores=1, render_mode=None):
+        super().__init__(parent, "Per-core CPU", "Core", render_mode)
+        self.history = history
+        self.series = series
+        self.cores = cores
+
+        from matplotlib import colormaps
+
+        cmap = colormaps["inferno"].with_extremes(bad='#2b2b2b')
+        self.image = self.ax.imshow(np.full((cores, MATRIX_CAPACITY), np.nan), aspect="auto", interpolation="nearest",
+                                    origin="lower", cmap=cmap, vmin=0, vmax=100, animated=self.blitting)
+        self.ax.set_xticks([])
+
+        self.show_canvas()
+
+    def animated_artists(self):
+        return [self.image]
+
+    def set_view(self, view):
+        # Always shows the newest samples at collection rate
+        pass
+
+    def update_graph(self):
+        matrix = self.history.matrix(self.series)
+        if matrix is None:
+            return
+        if matrix.shape[0] != self.cores:
+            self.cores = matrix.shape[0]
+            self.image.set_extent((-0.5, matrix.shape[1] - 0.5, -0.5, self.cores - 0.5))
+            self.ax.set_ylim(-0.5, self.cores - 0.5)
+        self.image.set_data(matrix)
+        self.render()
+
+
+class FleetGrid(BlitFigure):
+    # CPU and RAM sparklines for every host in one axes. Hosts sit in unit
+    # cells of a grid and all their lines are two LineCollections, so a
+    # fleet of any size is two animated artists on a single canvas.
+    COLUMNS = 6
+
+    def __init__(self, parent, fleet):
+        super().__init__(parent, "Fleet: CPU (blue) / RAM (orange)", "")
+        from matplotlib.collections import LineCollection
+
+        self.fleet = fleet
+        hosts = len(fleet.hosts)
+        self.columns = min(hosts, self.COLUMNS)
+        rows = -(-hosts // self.columns)
+        self.fig.set_size_inches(5, max(2, 0.6 * rows + 0.4))
+        self.ax.set_xlim(0, self.columns)
+        self.ax.set_ylim(rows, 0)
+        self.ax.set_xticks([])
+        self.ax.set_yticks([])
+        self.ax.hlines(np.arange(1, rows), 0, self.columns, color='#444444', linewidth=0.5)
+        self.ax.vlines(np.arange(1, self.columns), 0, rows, color='#444444', linewidth=0.5)
+
+        cells = np.arange(hosts)
+        self.rows = cells // self.columns
+        columns = cells % self.columns
+        self.x = columns[:, None] + np.linspace(0.05, 0.95, fleet.hosts[0].history.capacity)
+        self.labels = [self.ax.text(column + 0.05, row + 0.05, host.name, fontsize=6, va="top", color="gray")
+                       for host, row, column in zip(fleet.hosts, self.rows, columns)]
+        self.states = None
+
+        self.cpu_lines = LineCollection([], colors='#1f538d', linewidths=1, animated=self.blitting)
+        self.ram_lines = LineCollection([], colors='#ff7f0e', linewidths=1, animated=self.blitting)
+        self.ax.add_collection(self.cpu_lines)
+        self.ax.add_collection(self.ram_lines)
+
+        self.show_canvas()
+
+    def animated_artists(self):
+        return [self.cpu_lines, self.ram_lines]
+
+    def set_view(self, view):
+        # Always shows the samples the aggregator keeps
+        pass
+
+    def update_graph(self):
+        hosts = self.fleet.hosts
+        series = np.stack([host.series() for host in hosts])
+        bottom = self.rows[:, None] + 0.95
+        for lines, field in ((self.cpu_lines, "cpu"), (self.ram_lines, "ram")):
+            y = bottom - series[:, FIELD_INDEX[field]] / 100 * 0.65
+            lines.set_segments(np.stack([self.x, y], axis=-1))
+
+        # Host labels are static artists: a name or connection change needs
+        # a full draw to refresh the cached background
+        states = tuple((host.name, host.connected) for host in hosts)
+        if states != self.states:
+            self.states = states
+            for label, host in zip(self.labels, hosts):
+                label.set_text(host.name)
+                label.set_color("white" if host.connected else "#ff5555")
+            self.background = None
+        self.render()
+
+
+class GraphSlot(ctk.CTkFrame):
+    # Stands in for a graph in the layout. The figure is built by `build`
+    # the first time the slot is expanded and on screen, and released again
+    # when it is collapsed. Frame stats outlive the figure.
+    def __init__(self, parent, build, height=200):
+        super().__init__(parent, fg_color="transparent", height=height)
+        self.build = build
+        self.graph = None
+        self.view = "1m"
+        self.frame_stats = {"blit": [0, 0.0], "full": [0, 0.0]}
+
+    def ensure(self):
+        if self.graph is None:
+            self.graph = self.build(self, self.view)
+            self.graph.frame_stats = self.frame_stats
+            self.graph.pack(fill="both", expand=True)
+
+    def release(self):
+        if self.graph is not None:
+            self.graph.close()
+            self.graph = None
+
+    def set_view(self, view):
+        self.view = view
+        if self.graph is not None:
+            self.graph.set_view(view)
+
+    def update_graph(self):
+        if self.graph is not None:
+            self.graph.update_graph()
+
+
+class ProcessList(ctk.CTkFrame):
+    # Virtualized view of the full process table. Labels exist only for the
+    # `rows` visible rows and are reused as the list scrolls; sorting and
+    # filtering produce an index array over the table, and a label is only
+    # reconfigured when its text changes.
+    COLUMNS = (
+        ("pid", "PID", 60, "w"),
+        ("name", "Name", 0, "w"),
+        ("cpu", "CPU %", 60, "e"),
+        ("rss", "Memory", 90, "e"),
+        ("io", "I/O", 90, "e"),
+    )
+
+    def __init__(self, parent, on_sort=None, rows=15):
+        super().__init__(parent, fg_color="transparent")
+        self.on_sort = on_sort
+        self.rows = rows
+        self.table = EMPTY_TABLE
+        self.order = np.arange(0)
+        self.top = 0
+        self.sort = "cpu"
+        self.descending = True
+        self.filter = ""
+        self.grid_columnconfigure(1, weight=1)
+
+        bold = ctk.CTkFont(weight="bold")
+        self.headers = {}
+        for column, (key, title, width, anchor) in enumerate(self.COLUMNS):
+            header = ctk.CTkLabel(self, text=title, width=width, anchor=anchor, font=bold, cursor="hand2")
+            header.grid(row=0, column=column, sticky="ew")
+            header.bind("<Button-1>", lambda event, key=key: self.set_sort(key))
+            self.headers[key] = header
+
+        self.cells = []
+        self.texts = []
+        for row in range(rows):
+            cells = []
+            for column, (key, title, width, anchor) in enumerate(self.COLUMNS):
+                cell = ctk.CTkLabel(self, text="", width=width, height=22, anchor=anchor)
+                cell.grid(row=row + 1, column=column, sticky="ew")
+                self.bind_wheel(cell)
+                cells.append(cell)
+            self.cells.append(cells)
+            self.texts.append([""] * len(self.COLUMNS))
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.scroll)
+        self.scrollbar.grid(row=1, column=len(self.COLUMNS), rowspan=rows, sticky="ns", padx=(5, 0))
+        self.bind_wheel(self)
+        self.show_sort()
+
+    def bind_wheel(self, widget):
+        # Handled here and stopped, so the page around the table stays put
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self.wheel, add="+")
+
+    def wheel(self, event):
+        up = event.num == 4 or event.delta > 0
+        self.scroll_to(self.top + (-3 if up else 3))
+        return "break"
+
+    def scroll(self, action, amount, unit="units"):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, unit)
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.order)))
+        else:
+            step = int(float(amount))
+            self.scroll_to(self.top + step * (self.rows if unit == "pages" else 1))
+
+    def scroll_to(self, top):
+        top = max(min(top, len(self.order) - self.rows), 0)
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def set_sort(self, key):
+        if key == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort = key
+            self.descending = key not in ("pid", "name")
+        self.show_sort()
+        if self.on_sort is not None:
+            self.on_sort(key)
+        self.reorder()
+        self.render()
+
+    def show_sort(self):
+        for key, title, width, anchor in self.COLUMNS:
+            arrow = (" ▼" if self.descending else " ▲") if key == self.sort else ""
+            self.headers[key].configure(text=title + arrow)
+
+    def set_filter(self, text):
+        text = text.strip().lower()
+        if text != self.filter:
+            self.filter = text
+            self.top = 0
+            self.reorder()
+            self.render()
+
+    def update_table(self, table):
+        # Snapshots share the table until the process collector runs again
+        if table is not self.table:
+            self.table = table
+            self.reorder()
+            self.render()
+
+    def reorder(self):
+        table = self.table
+        if self.filter:
+            mask = np.char.find(np.char.lower(table["name"]), self.filter) >= 0
+            if self.filter.isdigit():
+                mask |= np.char.startswith(table["pid"].astype("U10"), self.filter)
+            index = np.flatnonzero(mask)
+        else:
+            index = np.arange(len(table))
+        keys = table[self.sort][index]
+        if self.sort == "name":
+            keys = np.char.lower(keys)
+        # Ties keep a stable order by PID, so rows don't swap on every update
+        order = index[np.lexsort((table["pid"][index], keys))]
+        self.order = order[::-1] if self.descending else order
+        self.top = max(min(self.top, len(self.order) - self.rows), 0)
+
+    def render(self):
+        rows = self.table[self.order[self.top:self.top + self.rows]]
+        pids = rows["pid"].tolist()
+        names = rows["name"].tolist()
+        cpus = rows["cpu"].tolist()
+        rss = rows["rss"].tolist()
+        io = rows["io"].tolist()
+        for i, (cells, texts) in enumerate(zip(self.cells, self.texts)):
+            if i < len(pids):
+                values = (str(pids[i]), names[i], f"{cpus[i]:.1f}%", get_size(rss[i]), f"{get_size(io[i])}/s")
+            else:
+                values = ("",) * len(self.COLUMNS)
+            for column, text in enumerate(values):
+                if texts[column] != text:
+                    texts[column] = text
+                    cells[column].configure(text=text)
+
+        total = len(self.order)
+        if total > self.rows:
+            self.scrollbar.set(self.top / total, (self.top + self.rows) / total)
+        else:
+            self.scrollbar.set(0, 1)
 
-class DataCollector(threading.Thread):
-    def __init__(self):
-        super().__init__()
-        self.daemon = True
-        self.running = True
-        self.lock = threading.Lock()
-        self.stats = {
-            "cpu": 0,
-            "ram": {"percent": 0, "used": 0, "total": 0},
-            "gpu": {"load": 0, "memoryUsed": 0, "memoryTotal": 0, "temperature": 0, "found": False},
-            "disk_text": "",
-            "disk_io": {"read": 0, "write": 0},
-            "net_io": {"sent": 0, "recv": 0, "up_mb": 0, "down_mb": 0},
-            "processes": []
-        }
-        self.prev_net_io = psutil.net_io_counters()
-        self.prev_disk_io = psutil.disk_io_counters()
-        self.prev_time = time.time()
-        self.cpu_count = psutil.cpu_count(logical=True)
-
-    def get_size(self, bytes, suffix="B"):
-        factor = 1024
-        for unit in ["", "K", "M", "G", "T", "P"]:
-            if bytes < factor:
-                return f"{bytes:.2f}{unit}{suffix}"
-            bytes /= factor
-
-    def run(self):
-        while self.running:
-            try:
-                # --- CPU ---
-                cpu_percent = psutil.cpu_percent(interval=None)
-
-                # --- RAM ---
-                svmem = psutil.virtual_memory()
-                ram_stats = {
-                    "percent": svmem.percent,
-                    "used": svmem.used,
-                    "total": svmem.total
-                }
-
-                # --- GPU ---
-                gpu_stats = {"found": False, "load": 0, "memoryUsed": 0, "memoryTotal": 0, "temperature": 0}
-                try:
-                    gpus = GPUtil.getGPUs()
-                    if gpus:
-                        gpu = gpus[0]
-                        gpu_stats = {
-                            "found": True,
-                            "load": gpu.load * 100,
-                            "memoryUsed": gpu.memoryUsed,
-                            "memoryTotal": gpu.memoryTotal,
-                            "temperature": gpu.temperature
-                        }
-                except Exception:
-                    pass
-
-                # --- Disk Space ---
-                partitions = psutil.disk_partitions()
-                disk_text = ""
-                for partition in partitions:
-                    try:
-                        usage = shutil.disk_usage(partition.mountpoint)
-                        percent = (usage.used / usage.total) * 100
-                        disk_text += f"{partition.device} ({partition.mountpoint}): {percent:.1f}% Used of {self.get_size(usage.total)}\n"
-                    except Exception:
-                        continue
-
-                # --- Time Delta ---
-                curr_time = time.time()
-                time_delta = curr_time - self.prev_time
-                if time_delta == 0: time_delta = 1
-
-                # --- Disk I/O ---
-                curr_disk_io = psutil.disk_io_counters()
-                read_bytes_sec = (curr_disk_io.read_bytes - self.prev_disk_io.read_bytes) / time_delta
-                write_bytes_sec = (curr_disk_io.write_bytes - self.prev_disk_io.write_bytes) / time_delta
-                disk_io_stats = {
-                    "read": read_bytes_sec / (1024 * 1024), # MB/s
-                    "write": write_bytes_sec / (1024 * 1024) # MB/s
-                }
-                self.prev_disk_io = curr_disk_io
-
-                # --- Network I/O ---
-                curr_net_io = psutil.net_io_counters()
-                bytes_sent_sec = (curr_net_io.bytes_sent - self.prev_net_io.bytes_sent) / time_delta
-                bytes_recv_sec = (curr_net_io.bytes_recv - self.prev_net_io.bytes_recv) / time_delta
-                net_io_stats = {
-                    "sent": bytes_sent_sec,
-                    "recv": bytes_recv_sec,
-                    "up_mb": bytes_sent_sec / (1024 * 1024),
-                    "down_mb": bytes_recv_sec / (1024 * 1024)
-                }
-                self.prev_net_io = curr_net_io
-                self.prev_time = curr_time
-
-                # --- Processes ---
-                processes = []
-                for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-                    try:
-                        processes.append(proc.info)
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        pass
-                
-                processes = sorted(processes, key=lambda p: p['cpu_percent'], reverse=True)[:10]
-                
-                # Normalize CPU
-                proc_list = []
-                for p in processes:
-                    norm_cpu = p['cpu_percent'] / self.cpu_count
-                    proc_list.append({
-                        "pid": p['pid'],
-                        "name": p['name'],
-                        "cpu": norm_cpu
-                    })
-
-                # --- Update Shared Stats ---
-                with self.lock:
-                    self.stats = {
-                        "cpu": cpu_percent,
-                        "ram": ram_stats,
-                        "gpu": gpu_stats,
-                        "disk_text": disk_text,
-                        "disk_io": disk_io_stats,
-                        "net_io": net_io_stats,
-                        "processes": proc_list
-                    }
-
-                time.sleep(1)
-            except Exception as e:
-                print(f"Error in DataCollector: {e}")
-                time.sleep(1)
 
 class SystemDashboard(ctk.CTk):
     def __init__(self):
+        build_start = time.perf_counter()
         super().__init__()
 
         self.title("System Monitor")
@@ -220,6 +484,12 @@ class SystemDashboard(ctk.CTk):
 
         self.sidebar_button_1 = ctk.CTkButton(self.sidebar_frame, text="Overview", command=self.show_overview)
         self.sidebar_button_1.grid(row=1, column=0, padx=20, pady=10)
+
+        # Current sampling interval per collector; ▲ faster than configured
+        # (a metric is moving or near an alert), ▼ slower (window hidden)
+        self.sampling_label = ctk.CTkLabel(self.sidebar_frame, text="", font=ctk.CTkFont(family="Courier", size=11), justify="left", anchor="nw")
+        self.sampling_label.grid(row=2, column=0, padx=10, pady=10, sticky="nw")
+        self.sampling_text = None
         
         # Main Content Area
         self.main_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
@@ -234,11 +504,48 @@ class SystemDashboard(ctk.CTk):
         self.menu_button = ctk.CTkButton(self.header_frame, text="<", width=30, command=self.toggle_sidebar)
         self.menu_button.pack(side="left")
 
+        self.history_view = ctk.CTkSegmentedButton(self.header_frame, values=list(VIEWS), command=self.set_history_view)
+        self.history_view.set("1m")
+        self.history_view.pack(side="left", padx=10)
+
+        self.frame_time_label = ctk.CTkLabel(self.header_frame, text="", text_color="gray")
+        self.frame_time_label.pack(side="right")
+
+        self.stale_label = ctk.CTkLabel(self.header_frame, text="", text_color="#ff7f0e")
+        self.stale_label.pack(side="right", padx=10)
+
         # Scrollable Content
         self.content_scroll = ctk.CTkScrollableFrame(self.main_frame, fg_color="transparent")
         self.content_scroll.grid(row=1, column=0, sticky="nsew")
         self.content_scroll.grid_columnconfigure(0, weight=1)
 
+        # Data Collector owns the history the graphs read from
+        self.collector = attach_collector()
+        history = self.collector.history
+
+        self.alerts = attach_local_alerts(self.collector)
+        self.alert_generation = 0
+        self.alert_banner = ctk.CTkLabel(self.main_frame, text="", fg_color="#8b1a1a", text_color="white", corner_radius=6, justify="left", anchor="w")
+
+        # Replay controls; the UI polls faster so scrubbing looks live
+        self.replay = isinstance(self.collector, ReplaySource)
+        self.refresh_ms = 1000
+        if self.replay:
+            self.refresh_ms = 200
+            self.replay_button = ctk.CTkButton(self.header_frame, text="Pause", width=60, command=self.toggle_replay)
+            self.replay_button.pack(side="left")
+            self.replay_speed = ctk.CTkSegmentedButton(self.header_frame, values=["1x", "10x", f"{MAX_SPEED}x"], command=self.set_replay_speed)
+            self.replay_speed.set("1x")
+            self.replay_speed.pack(side="left", padx=10)
+            self.replay_slider = ctk.CTkSlider(self.header_frame, from_=self.collector.start_time, to=max(self.collector.end_time, self.collector.start_time + 1), width=200)
+            # While the thumb is held the playhead must not move it
+            self.replay_dragging = False
+            self.replay_slider.bind("<ButtonPress-1>", self.start_replay_drag)
+            self.replay_slider.bind("<ButtonRelease-1>", self.seek_replay)
+            self.replay_slider.pack(side="left")
+            self.replay_time_label = ctk.CTkLabel(self.header_frame, text="")
+            self.replay_time_label.pack(side="left", padx=10)
+
         # --- CPU Section ---
         self.cpu_frame = ctk.CTkFrame(self.content_scroll)
         self.cpu_frame.grid(row=0, column=0, padx=20, pady=10, sticky="ew")
@@ -255,9 +562,13 @@ class SystemDashboard(ctk.CTk):
         self.cpu_percent_label = ctk.CTkLabel(self.cpu_frame, text="0%")
         self.cpu_percent_label.pack(anchor="e", padx=10, pady=5)
         
-        self.cpu_graph = LiveGraph(self.cpu_frame, "CPU History", "%", y_limit=100)
+        self.cpu_graph = self.line_graph(self.cpu_frame, "CPU History", "%", "cpu", y_limit=100)
         self.cpu_graph.pack(fill="x", padx=10, pady=10)
 
+        cores = psutil.cpu_count(logical=True) or 1
+        self.core_heatmap = GraphSlot(self.cpu_frame, lambda parent, view: CoreHeatmap(parent, history, cores=cores))
+        self.core_heatmap.pack(fill="x", padx=10, pady=10)
+
         # --- RAM Section ---
         self.ram_frame = ctk.CTkFrame(self.content_scroll)
         self.ram_frame.grid(row=1, column=0, padx=20, pady=10, sticky="ew")
@@ -274,7 +585,7 @@ class SystemDashboard(ctk.CTk):
         self.ram_stats_label = ctk.CTkLabel(self.ram_frame, text="Used: 0GB / Total: 0GB")
         self.ram_stats_label.pack(anchor="e", padx=10, pady=5)
 
-        self.ram_graph = LiveGraph(self.ram_frame, "RAM History", "%", y_limit=100)
+        self.ram_graph = self.line_graph(self.ram_frame, "RAM History", "%", "ram", y_limit=100)
         self.ram_graph.pack(fill="x", padx=10, pady=10)
 
         # --- GPU Section ---
@@ -293,7 +604,7 @@ class SystemDashboard(ctk.CTk):
         self.gpu_stats_label = ctk.CTkLabel(self.gpu_frame, text="Searching for GPU...")
         self.gpu_stats_label.pack(anchor="e", padx=10, pady=5)
         
-        self.gpu_graph = LiveGraph(self.gpu_frame, "GPU Load History", "%", y_limit=100)
+        self.gpu_graph = self.line_graph(self.gpu_frame, "GPU Load History (mean)", "%", "gpu", y_limit=100)
         self.gpu_graph.pack(fill="x", padx=10, pady=10)
 
         # --- Disk Section ---
@@ -312,8 +623,7 @@ class SystemDashboard(ctk.CTk):
         self.disk_info_label = ctk.CTkLabel(self.disk_container, text="", justify="left")
         self.disk_info_label.pack(anchor="w")
 
-        self.disk_graph = LiveGraph(self.disk_frame, "Disk Activity (MB/s)", "MB/s", y_limit=None)
-        self.disk_graph.add_second_line("Write", color="#ff7f0e")
+        self.disk_graph = self.line_graph(self.disk_frame, "Disk Activity (MB/s)", "MB/s", "disk_read", y_limit=None, second=("disk_write", "Write"))
         self.disk_graph.pack(fill="x", padx=10, pady=10)
 
         # --- Network Section ---
@@ -327,50 +637,124 @@ class SystemDashboard(ctk.CTk):
         self.net_label = ctk.CTkLabel(self.net_header, text="Network", font=ctk.CTkFont(size=16, weight="bold"))
         self.net_label.pack(side="left")
         
-        self.net_stats_label = ctk.CTkLabel(self.net_frame, text="Sent: 0B | Recv: 0B")
+        self.net_stats_label = ctk.CTkLabel(self.net_frame, text="Sent: 0B | Recv: 0B", justify="left")
         self.net_stats_label.pack(anchor="w", padx=10, pady=5)
 
-        self.net_graph = LiveGraph(self.net_frame, "Network Traffic (MB/s)", "MB/s", y_limit=None)
-        self.net_graph.add_second_line("Download", color="#ff7f0e") 
+        self.net_graph = self.line_graph(self.net_frame, "Network Traffic (MB/s)", "MB/s", "net_up", y_limit=None, second=("net_down", "Download"))
         self.net_graph.pack(fill="x", padx=10, pady=10)
 
         # --- Processes Section ---
         self.proc_frame = ctk.CTkFrame(self.content_scroll)
         self.proc_frame.grid(row=5, column=0, padx=20, pady=10, sticky="ew")
-        self.proc_label = ctk.CTkLabel(self.proc_frame, text="Top Processes (Total CPU %)", font=ctk.CTkFont(size=16, weight="bold"))
-        self.proc_label.pack(anchor="w", padx=10, pady=5)
-        
-        self.proc_header_frame = ctk.CTkFrame(self.proc_frame, fg_color="transparent")
-        self.proc_header_frame.pack(fill="x", padx=10, pady=2)
-        self.proc_header_frame.grid_columnconfigure(1, weight=1)
-        
-        ctk.CTkLabel(self.proc_header_frame, text="PID", width=60, anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=0)
-        ctk.CTkLabel(self.proc_header_frame, text="Name", anchor="w", font=ctk.CTkFont(weight="bold")).grid(row=0, column=1, sticky="ew")
-        ctk.CTkLabel(self.proc_header_frame, text="CPU %", width=60, anchor="e", font=ctk.CTkFont(weight="bold")).grid(row=0, column=2)
-
-        self.proc_rows = []
-        for i in range(10):
-            row_frame = ctk.CTkFrame(self.proc_frame, fg_color="transparent")
-            row_frame.pack(fill="x", padx=10, pady=2)
-            row_frame.grid_columnconfigure(1, weight=1)
-            
-            pid_lbl = ctk.CTkLabel(row_frame, text="-", width=60, anchor="w")
-            pid_lbl.grid(row=0, column=0)
-            
-            name_lbl = ctk.CTkLabel(row_frame, text="-", anchor="w")
-            name_lbl.grid(row=0, column=1, sticky="ew")
-            
-            cpu_lbl = ctk.CTkLabel(row_frame, text="-", width=60, anchor="e")
-            cpu_lbl.grid(row=0, column=2)
-            
-            self.proc_rows.append((pid_lbl, name_lbl, cpu_lbl))
+        self.proc_title_frame = ctk.CTkFrame(self.proc_frame, fg_color="transparent")
+        self.proc_title_frame.pack(fill="x", padx=10, pady=5)
+        self.proc_label = ctk.CTkLabel(self.proc_title_frame, text="Processes", font=ctk.CTkFont(size=16, weight="bold"))
+        self.proc_label.pack(side="left")
+        self.proc_filter = ctk.CTkEntry(self.proc_title_frame, placeholder_text="Filter by name or PID", width=200)
+        self.proc_filter.pack(side="right")
+        self.proc_filter.bind("<KeyRelease>", lambda event: self.proc_table.set_filter(self.proc_filter.get()))
+        self.proc_cost_label = ctk.CTkLabel(self.proc_title_frame, text="", text_color="gray")
+        self.proc_cost_label.pack(side="right", padx=10)
+
+        self.proc_table = ProcessList(self.proc_frame, on_sort=self.set_process_sort)
+        self.proc_table.pack(fill="x", padx=10, pady=(2, 10))
+
+        # --- Fleet Section (only with SYSMON_FLEET) ---
+        self.fleet = attach_fleet()
+        self.fleet_generation = 0
+        if self.fleet is not None:
+            self.fleet_frame = ctk.CTkFrame(self.content_scroll)
+            self.fleet_frame.grid(row=6, column=0, padx=20, pady=10, sticky="ew")
+
+            self.fleet_header = ctk.CTkFrame(self.fleet_frame, fg_color="transparent")
+            self.fleet_header.pack(fill="x", padx=10, pady=5)
+            self.fleet_toggle_btn = ctk.CTkButton(self.fleet_header, text="▼", width=20, height=20, command=lambda: self.toggle_graph(self.fleet_graph, self.fleet_toggle_btn))
+            self.fleet_toggle_btn.pack(side="left", padx=(0, 10))
+            self.fleet_label = ctk.CTkLabel(self.fleet_header, text="Fleet", font=ctk.CTkFont(size=16, weight="bold"))
+            self.fleet_label.pack(side="left")
+            self.fleet_status_label = ctk.CTkLabel(self.fleet_header, text="", text_color="gray")
+            self.fleet_status_label.pack(side="right")
+
+            self.fleet_graph = GraphSlot(self.fleet_frame, lambda parent, view: FleetGrid(parent, self.fleet))
+            self.fleet_graph.pack(fill="x", padx=10, pady=10)
+            self.fleet.start()
+
+        # --- Diagnostics Section (hidden; F12 toggles) ---
+        self.diag_frame = ctk.CTkFrame(self.content_scroll)
+        self.diag_title_frame = ctk.CTkFrame(self.diag_frame, fg_color="transparent")
+        self.diag_title_frame.pack(fill="x", padx=10, pady=5)
+        ctk.CTkLabel(self.diag_title_frame, text="Diagnostics", font=ctk.CTkFont(size=16, weight="bold")).pack(side="left")
+        ctk.CTkButton(self.diag_title_frame, text="Reset UI timers", width=120, command=TIMINGS.reset).pack(side="right")
+        self.diag_label = ctk.CTkLabel(self.diag_frame, text="", font=ctk.CTkFont(family="Courier", size=12), justify="left", anchor="w")
+        self.diag_label.pack(fill="x", padx=10, pady=(0, 10))
+        self.bind("<F12>", lambda event: self.toggle_diagnostics())
 
         # Start Data Collector
-        self.collector = DataCollector()
+        self.generation = None # last snapshot generation shown
         self.collector.start()
-        
+
+        # While the window is iconified or withdrawn the update loop stops
+        # and an in-process collector samples at its background cadence
+        self.hidden = False
+        self.bind("<Unmap>", lambda event: self.set_hidden(event, True))
+        self.bind("<Map>", lambda event: self.set_hidden(event, False))
+
+        # Set before the first update, whose frame-time label reads them
+        self.startup_ms = None
+        self.build_ms = (time.perf_counter() - build_start) * 1000
+
         # Start update loop
+        self.update_job = None
         self.update_stats()
+        self.after_idle(self.report_startup)
+
+    def update_fleet(self):
+        hosts = self.fleet.hosts
+        connected = sum(host.connected for host in hosts)
+        self.fleet_status_label.configure(text=f"{connected}/{len(hosts)} hosts connected")
+        if self.fleet_graph.winfo_viewable():
+            self.fleet_graph.update_graph()
+
+    def set_hidden(self, event, hidden):
+        # Children map and unmap too (toggled sections); only the window counts
+        if event.widget is not self or hidden == self.hidden:
+            return
+        self.hidden = hidden
+        set_background(self.collector, hidden)
+        if hidden:
+            if self.update_job is not None:
+                self.after_cancel(self.update_job)
+                self.update_job = None
+        elif self.update_job is None:
+            self.update_job = self.after_idle(self.update_stats)
+
+    def update_sampling(self, statuses):
+        lines = ["Sampling"]
+        for name, status in statuses.items():
+            interval, base = status["interval"], status["base_interval"]
+            marker = "▲" if interval < base else "▼" if interval > base else " "
+            lines.append(f"{name:<11}{format_interval(interval):>6}{marker}")
+        text = "\n".join(lines)
+        if text != self.sampling_text:
+            self.sampling_text = text
+            self.sampling_label.configure(text=text)
+
+    def toggle_diagnostics(self):
+        if self.diag_frame.winfo_ismapped():
+            self.diag_frame.grid_remove()
+        else:
+            self.diag_frame.grid(row=7, column=0, padx=20, pady=10, sticky="ew")
+            self.update_diagnostics()
+
+    def update_diagnostics(self):
+        # p50/p99 of each collector's collect() (measured where it runs, so
+        # also for a daemon) and of each UI stage in this process
+        lines = [f"{'Stage':<16}{'Runs':>8}{'p50 ms':>10}{'p99 ms':>10}{'Interval':>10}{'Base':>8}"]
+        for name, status in self.collector.collector_status().items():
+            lines.append(f"{name:<16}{status['runs']:>8}{status['p50_ms']:>10.2f}{status['p99_ms']:>10.2f}{format_interval(status['interval']):>10}{format_interval(status['base_interval']):>8}")
+        for name, count, p50, p99, worst in TIMINGS.summary():
+            lines.append(f"{name:<16}{count:>8}{p50:>10.2f}{p99:>10.2f}")
+        self.diag_label.configure(text="\n".join(lines))
 
     def toggle_sidebar(self):
         if self.sidebar_visible:
@@ -385,75 +769,205 @@ class SystemDashboard(ctk.CTk):
     def toggle_graph(self, graph_widget, button):
         if graph_widget.winfo_viewable():
             graph_widget.pack_forget()
+            graph_widget.release()
             button.configure(text="▶")
         else:
             graph_widget.pack(fill="x", padx=10, pady=10)
             button.configure(text="▼")
+            self.after_idle(self.build_visible_graphs)
+
+    def line_graph(self, parent, title, y_label, series, y_limit=100, second=None):
+        history = self.collector.history
+
+        def build(slot, view):
+            graph = LiveGraph(slot, title, y_label, history, series, y_limit=y_limit, view=view)
+            if second is not None:
+                graph.add_second_line(second[0], second[1], color="#ff7f0e")
+            return graph
+
+        return GraphSlot(parent, build)
+
+    def build_visible_graphs(self):
+        # Build figures for expanded graphs that are scrolled into view
+        top = self.header_frame.winfo_rooty() + self.header_frame.winfo_height()
+        bottom = self.main_frame.winfo_rooty() + self.main_frame.winfo_height()
+        for slot in self.graphs():
+            if slot.graph is None and slot.winfo_ismapped():
+                y = slot.winfo_rooty()
+                if y < bottom and y + slot.winfo_height() > top:
+                    slot.ensure()
+
+    def report_startup(self):
+        # Process start to first idle after the window is shown, so it covers
+        # interpreter start and imports as well as building the window
+        self.startup_ms = (time.time() - psutil.Process().create_time()) * 1000
+        print(f"Startup: {self.startup_ms:.0f} ms (window built in {self.build_ms:.0f} ms)")
+        self.build_visible_graphs()
+
+    def set_history_view(self, view):
+        for graph in self.graphs():
+            graph.set_view(view)
+
+    def graphs(self):
+        graphs = [self.cpu_graph, self.core_heatmap, self.ram_graph, self.gpu_graph, self.disk_graph, self.net_graph]
+        if self.fleet is not None:
+            graphs.append(self.fleet_graph)
+        return graphs
+
+    def set_process_sort(self, key):
+        # The collector reads I/O for every process only while sorting by it
+        sort = {"cpu": "cpu", "rss": "memory", "io": "io"}.get(key)
+        if sort is not None:
+            self.collector.process_sort = sort
+
+    def toggle_replay(self):
+        if self.collector.playing:
+            self.collector.pause()
+        else:
+            self.collector.play()
+
+    def set_replay_speed(self, value):
+        self.collector.speed = float(value.rstrip("x"))
+
+    def start_replay_drag(self, event=None):
+        self.replay_dragging = True
+
+    def seek_replay(self, event=None):
+        self.replay_dragging = False
+        self.collector.seek(self.replay_slider.get())
+
+    def update_replay_controls(self):
+        self.replay_button.configure(text="Pause" if self.collector.playing else "Play")
+        if not self.replay_dragging:
+            self.replay_slider.set(self.collector.position)
+        self.replay_time_label.configure(text=time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.collector.position)))
+
+    def update_alert_banner(self):
+        firing = self.alerts.firing()
+        if not firing:
+            self.alert_banner.grid_remove()
+            return
+        lines = [f"{a.rule.severity.upper()}: {a.message}" for a in firing[:3]]
+        if len(firing) > 3:
+            lines.append(f"... and {len(firing) - 3} more")
+        self.alert_banner.configure(text="\n".join(lines))
+        self.alert_banner.grid(row=2, column=0, sticky="ew", padx=10, pady=5)
 
     def show_overview(self):
         pass
 
-    def get_size(self, bytes, suffix="B"):
-        factor = 1024
-        for unit in ["", "K", "M", "G", "T", "P"]:
-            if bytes < factor:
-                return f"{bytes:.2f}{unit}{suffix}"
-            bytes /= factor
+    def gpu_text(self, g):
+        text = f"GPU {g['index']} {g['name']}: {g['load']:.0f}% | Memory: {g['memoryUsed']:.0f}MB / {g['memoryTotal']:.0f}MB | Temp: {g['temperature']}C"
+        if g["power"] is not None:
+            text += f" | {g['power']:.0f}W"
+        if g["processes"]:
+            top = g["processes"][0]
+            text += f" | {len(g['processes'])} procs, top PID {top['pid']} {top['memoryUsed']:.0f}MB"
+        return text
+
+    def update_frame_time_label(self):
+        graphs = self.graphs()
+        parts = []
+        for path in ("blit", "full"):
+            count = sum(g.frame_stats[path][0] for g in graphs)
+            total = sum(g.frame_stats[path][1] for g in graphs)
+            if count:
+                parts.append(f"{path} {total / count * 1000:.2f}ms ({count})")
+        startup = f"Startup {self.startup_ms:.0f}ms | " if self.startup_ms is not None else ""
+        self.frame_time_label.configure(text=startup + f"Render [{RENDER_MODE}]: " + " | ".join(parts))
 
     def update_stats(self):
+        refresh_ms = self.refresh_ms
         try:
-            with self.collector.lock:
-                stats = self.collector.stats.copy()
-
-            # CPU
-            self.cpu_progressbar.set(stats["cpu"] / 100)
-            self.cpu_percent_label.configure(text=f"{stats['cpu']}%")
-            if self.cpu_graph.winfo_viewable():
-                self.cpu_graph.update_graph(stats["cpu"])
-
-            # RAM
-            self.ram_progressbar.set(stats["ram"]["percent"] / 100)
-            self.ram_stats_label.configure(text=f"Used: {self.get_size(stats['ram']['used'])} / Total: {self.get_size(stats['ram']['total'])} ({stats['ram']['percent']}%)")
-            if self.ram_graph.winfo_viewable():
-                self.ram_graph.update_graph(stats["ram"]["percent"])
-
-            # GPU
-            if stats["gpu"]["found"]:
-                self.gpu_progressbar.set(stats["gpu"]["load"] / 100)
-                self.gpu_stats_label.configure(text=f"Memory: {stats['gpu']['memoryUsed']}MB / {stats['gpu']['memoryTotal']}MB | Temp: {stats['gpu']['temperature']}C")
-                if self.gpu_graph.winfo_viewable():
-                    self.gpu_graph.update_graph(stats["gpu"]["load"])
-            else:
-                self.gpu_stats_label.configure(text="No NVIDIA GPU detected")
-                self.gpu_progressbar.set(0)
-
-            # Disk
-            self.disk_info_label.configure(text=stats["disk_text"])
-            if self.disk_graph.winfo_viewable():
-                self.disk_graph.update_graph(stats["disk_io"]["read"], stats["disk_io"]["write"])
-
-            # Network
-            self.net_stats_label.configure(text=f"Upload: {self.get_size(stats['net_io']['sent'])}/s | Download: {self.get_size(stats['net_io']['recv'])}/s")
-            if self.net_graph.winfo_viewable():
-                self.net_graph.update_graph(stats["net_io"]["up_mb"], stats["net_io"]["down_mb"])
-
-            # Processes
-            for i, row_widgets in enumerate(self.proc_rows):
-                if i < len(stats["processes"]):
-                    p = stats["processes"][i]
-                    row_widgets[0].configure(text=str(p['pid']))
-                    row_widgets[1].configure(text=p['name'])
-                    row_widgets[2].configure(text=f"{p['cpu']:.1f}%")
-                else:
-                    row_widgets[0].configure(text="-")
-                    row_widgets[1].configure(text="-")
-                    row_widgets[2].configure(text="-")
+            self.build_visible_graphs()
+
+            # Lock-free: the collector swaps in a new immutable snapshot
+            snapshot = self.collector.snapshot
+            if snapshot.generation != self.generation:
+                self.generation = snapshot.generation
+                with TIMINGS.stage("update_stats"):
+                    self.show_snapshot(snapshot)
+
+            # Collectors whose source is blocked or failing (a hung source
+            # publishes nothing, so this is checked on every tick)
+            statuses = self.collector.collector_status()
+            stale = [name for name, status in statuses.items() if status["stale"]]
+            self.stale_label.configure(text=f"Stale: {', '.join(stale)}" if stale else "")
+            self.update_sampling(statuses)
+            if any(status["interval"] < status["base_interval"] for status in statuses.values()):
+                # Something is being sampled fast: show it as it arrives
+                refresh_ms = min(refresh_ms, FAST_REFRESH_MS)
+
+            if self.replay:
+                self.update_replay_controls()
+
+            if self.alerts is not None and self.alerts.generation != self.alert_generation:
+                self.alert_generation = self.alerts.generation
+                self.update_alert_banner()
+
+            if self.fleet is not None and self.fleet.generation != self.fleet_generation:
+                self.fleet_generation = self.fleet.generation
+                self.update_fleet()
+
+            if self.diag_frame.winfo_ismapped():
+                self.update_diagnostics()
 
         except Exception as e:
             print(f"Error in update_stats: {e}")
 
-        # Schedule next update
-        self.after(1000, self.update_stats)
+        # Schedule next update; only the latest snapshot is ever drawn, so a
+        # fast replay skips generations rather than queuing redraws
+        self.update_job = self.after(refresh_ms, self.update_stats)
+
+    def show_snapshot(self, snapshot):
+        # CPU
+        self.cpu_progressbar.set(snapshot.cpu / 100)
+        self.cpu_percent_label.configure(text=f"{snapshot.cpu}%")
+        if self.cpu_graph.winfo_viewable():
+            self.cpu_graph.update_graph()
+        if self.core_heatmap.winfo_viewable():
+            self.core_heatmap.update_graph()
+
+        # RAM
+        ram = snapshot.ram
+        self.ram_progressbar.set(ram["percent"] / 100)
+        self.ram_stats_label.configure(text=f"Used: {get_size(ram['used'])} / Total: {get_size(ram['total'])} ({ram['percent']}%)")
+        if self.ram_graph.winfo_viewable():
+            self.ram_graph.update_graph()
+
+        # GPU
+        gpu = snapshot.gpu
+        if gpu["found"]:
+            self.gpu_progressbar.set(gpu["load"] / 100)
+            self.gpu_stats_label.configure(text="\n".join(self.gpu_text(g) for g in snapshot.gpus) or f"Memory: {gpu['memoryUsed']}MB / {gpu['memoryTotal']}MB | Temp: {gpu['temperature']}C")
+            if self.gpu_graph.winfo_viewable():
+                self.gpu_graph.update_graph()
+        else:
+            self.gpu_stats_label.configure(text="No NVIDIA GPU detected")
+            self.gpu_progressbar.set(0)
+
+        # Disk
+        devices = [d for d in snapshot.disk_devices if not d["partition"]]
+        self.disk_info_label.configure(text="\n".join([snapshot.disk_text] + [
+            f"{d['name']}: read {d['read']:.2f}MB/s ({d['read_iops']:.0f} IOPS) | write {d['write']:.2f}MB/s ({d['write_iops']:.0f} IOPS) | await {d['await_ms']:.1f}ms | util {d['util']:.0f}%"
+            for d in devices if d["read_iops"] or d["write_iops"]
+        ]))
+        if self.disk_graph.winfo_viewable():
+            self.disk_graph.update_graph()
+
+        # Network
+        self.net_stats_label.configure(text="\n".join([f"Upload: {get_size(snapshot.net_io['sent'])}/s | Download: {get_size(snapshot.net_io['recv'])}/s"] + [
+            f"{n['name']}: up {get_size(n['sent'])}/s | down {get_size(n['recv'])}/s" + (f" | {n['errors']:.0f} err/s" if n["errors"] else "") + (f" | {n['drops']:.0f} drop/s" if n["drops"] else "")
+            for n in snapshot.net_interfaces if n["sent"] or n["recv"]
+        ]))
+        if self.net_graph.winfo_viewable():
+            self.net_graph.update_graph()
+
+        # Processes
+        self.proc_table.update_table(snapshot.process_table)
+        self.proc_cost_label.configure(text=f"{snapshot.process_count} processes | {snapshot.process_cost_ms:.1f} ms/tick")
+
+        self.update_frame_time_label()
 
 if __name__ == "__main__":
     app = SystemDashboard()
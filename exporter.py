@@ -0,0 +1,146 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+MB = 1024 * 1024
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MetricFamilies:
+    # Collects samples per metric family, then writes each family's
+    # TYPE/UNIT/HELP lines once, followed by its samples
+    def __init__(self):
+        self.families = {}
+
+    def add(self, name, kind, unit, help, value, labels=None):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = (kind, unit, help, [])
+        if value is None:
+            return
+        if labels:
+            label_text = ",".join(f'{key}="{escape(label)}"' for key, label in labels.items())
+            family[3].append(f"{name}{{{label_text}}} {float(value)!r}")
+        else:
+            family[3].append(f"{name} {float(value)!r}")
+
+    def encode(self):
+        lines = []
+        for name, (kind, unit, help, samples) in self.families.items():
+            lines.append(f"# TYPE {name} {kind}")
+            if unit:
+                lines.append(f"# UNIT {name} {unit}")
+            lines.append(f"# HELP {name} {help}")
+            lines.extend(samples)
+        lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode()
+
+
+def render(snapshot, status=None):
+    m = MetricFamilies()
+    m.add("sysmon_cpu_usage_percent", "gauge", "percent", "CPU utilisation across all cores.", snapshot.cpu)
+    for core, percent in enumerate(snapshot.per_cpu):
+        m.add("sysmon_cpu_core_usage_percent", "gauge", "percent", "CPU utilisation of one logical core.", percent, {"core": core})
+
+    ram = snapshot.ram
+    m.add("sysmon_memory_used_bytes", "gauge", "bytes", "Memory in use.", ram["used"])
+    m.add("sysmon_memory_total_bytes", "gauge", "bytes", "Total physical memory.", ram["total"])
+    m.add("sysmon_memory_usage_percent", "gauge", "percent", "Memory in use as a share of total.", ram["percent"])
+
+    for g in snapshot.gpus:
+        labels = {"gpu": g["index"], "name": g["name"]}
+        m.add("sysmon_gpu_usage_percent", "gauge", "percent", "GPU utilisation.", g["load"], labels)
+        m.add("sysmon_gpu_memory_used_bytes", "gauge", "bytes", "GPU memory in use.", g["memoryUsed"] * MB, labels)
+        m.add("sysmon_gpu_memory_total_bytes", "gauge", "bytes", "Total GPU memory.", g["memoryTotal"] * MB, labels)
+        m.add("sysmon_gpu_temperature_celsius", "gauge", "celsius", "GPU temperature.", g["temperature"], labels)
+        m.add("sysmon_gpu_power_watts", "gauge", "watts", "GPU power draw.", g["power"], labels)
+        for p in g["processes"]:
+            m.add("sysmon_gpu_process_memory_used_bytes", "gauge", "bytes", "GPU memory used by a process.", p["memoryUsed"] * MB, {"gpu": g["index"], "pid": p["pid"]})
+
+    for d in snapshot.disks:
+        labels = {"device": d["device"], "mountpoint": d["mountpoint"]}
+        m.add("sysmon_filesystem_used_bytes", "gauge", "bytes", "Space used on a mounted partition.", d["used"], labels)
+        m.add("sysmon_filesystem_size_bytes", "gauge", "bytes", "Size of a mounted partition.", d["total"], labels)
+        m.add("sysmon_filesystem_stale", "gauge", None, "1 if the partition did not answer statvfs in time.", d["stale"], labels)
+
+    m.add("sysmon_disk_read_bytes_per_second", "gauge", "bytes_per_second", "Disk read throughput.", snapshot.disk_io["read"] * MB)
+    m.add("sysmon_disk_write_bytes_per_second", "gauge", "bytes_per_second", "Disk write throughput.", snapshot.disk_io["write"] * MB)
+    for d in snapshot.disk_devices:
+        labels = {"device": d["name"]}
+        m.add("sysmon_disk_device_read_bytes_per_second", "gauge", "bytes_per_second", "Read throughput of a block device.", d["read"] * MB, labels)
+        m.add("sysmon_disk_device_write_bytes_per_second", "gauge", "bytes_per_second", "Write throughput of a block device.", d["write"] * MB, labels)
+        m.add("sysmon_disk_device_reads_per_second", "gauge", None, "Completed reads per second.", d["read_iops"], labels)
+        m.add("sysmon_disk_device_writes_per_second", "gauge", None, "Completed writes per second.", d["write_iops"], labels)
+        m.add("sysmon_disk_device_await_milliseconds", "gauge", "milliseconds", "Average time per request.", d["await_ms"], labels)
+        m.add("sysmon_disk_device_busy_percent", "gauge", "percent", "Share of time the device was busy.", d["util"], labels)
+
+    m.add("sysmon_network_transmit_bytes_per_second", "gauge", "bytes_per_second", "Network send throughput.", snapshot.net_io["sent"])
+    m.add("sysmon_network_receive_bytes_per_second", "gauge", "bytes_per_second", "Network receive throughput.", snapshot.net_io["recv"])
+    for n in snapshot.net_interfaces:
+        labels = {"interface": n["name"]}
+        m.add("sysmon_network_interface_transmit_bytes_per_second", "gauge", "bytes_per_second", "Send throughput of an interface.", n["sent"], labels)
+        m.add("sysmon_network_interface_receive_bytes_per_second", "gauge", "bytes_per_second", "Receive throughput of an interface.", n["recv"], labels)
+        m.add("sysmon_network_interface_errors_per_second", "gauge", None, "Send and receive errors per second.", n["errors"], labels)
+        m.add("sysmon_network_interface_drops_per_second", "gauge", None, "Dropped packets per second.", n["drops"], labels)
+
+    m.add("sysmon_processes", "gauge", None, "Number of running processes.", snapshot.process_count)
+    for p in snapshot.processes:
+        labels = {"pid": p["pid"], "name": p["name"]}
+        m.add("sysmon_process_cpu_usage_percent", "gauge", "percent", "CPU utilisation of a top process.", p["cpu"], labels)
+        m.add("sysmon_process_resident_memory_bytes", "gauge", "bytes", "Resident memory of a top process.", p["rss"], labels)
+        m.add("sysmon_process_io_bytes_per_second", "gauge", "bytes_per_second", "Disk I/O rate of a top process.", p["io"], labels)
+
+    for name, c in (status or {}).items():
+        m.add("sysmon_collector_stale", "gauge", None, "1 if the collector's data is stale.", c["stale"], {"collector": name})
+        m.add("sysmon_collector_interval_seconds", "gauge", "seconds", "Current sampling interval of the collector.", c["interval"], {"collector": name})
+        m.add("sysmon_collector_duration_milliseconds", "gauge", "milliseconds", "Duration of the collector's last run.", c["last_ms"], {"collector": name})
+        m.add("sysmon_collector_duration_p50_milliseconds", "gauge", "milliseconds", "Median duration of the collector's runs.", c["p50_ms"], {"collector": name})
+        m.add("sysmon_collector_duration_p99_milliseconds", "gauge", "milliseconds", "99th percentile duration of the collector's runs.", c["p99_ms"], {"collector": name})
+
+    return m.encode()
+
+
+class MetricsExporter:
+    # DataCollector subscriber that encodes each new snapshot once; scrapes
+    # only write the cached bytes and never sample anything themselves.
+    def __init__(self, collector, port, host=""):
+        self.collector = collector
+        self.generation = collector.snapshot.generation
+        self.body = render(collector.snapshot)
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.body
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        collector.subscribe(self)
+
+    def __call__(self, snapshot):
+        # Runs on a collector worker; a reference swap publishes the new body
+        body = render(snapshot, self.collector.collector_status())
+        if snapshot.generation > self.generation:
+            self.generation = snapshot.generation
+            self.body = body
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="metrics-exporter", daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
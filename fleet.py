@@ -0,0 +1,301 @@
+import asyncio
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from history import RingMatrix
+
+# Wire format: every frame is a 4-byte big-endian payload length, then the
+# payload, whose first byte is the frame type.
+#   HELLO     magic, version, agent name, field names
+#   KEYFRAME  timestamp, field mask, one float32 per field in the mask
+#   DELTA     same layout; only fields whose float32 value changed since
+#             the previous frame on this connection are in the mask
+# A connection starts with HELLO and a KEYFRAME; after that an idle host
+# costs 17 bytes a second.
+MAGIC = b"SYFL"
+VERSION = 1
+HELLO, KEYFRAME, DELTA = 0, 1, 2
+LENGTH = struct.Struct("!I")
+HELLO_HEADER = struct.Struct("!B4sBH") # type, magic, version, name length
+SAMPLE_HEADER = struct.Struct("!BdI") # type, timestamp, field mask
+MAX_FRAME = 1 << 16
+
+# Values streamed per host, in wire order
+FIELDS = ("cpu", "ram", "gpu", "disk_read", "disk_write", "net_up", "net_down", "process_count")
+FIELD_INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+# Samples kept per host by the aggregator (at 1 Hz, two minutes)
+FLEET_CAPACITY = 120
+
+
+def parse_address(text):
+    # "unix:/path", "host:port" or "[v6 host]:port"
+    if text.startswith("unix:"):
+        return socket.AF_UNIX, text[5:]
+    host, _, port = text.rpartition(":")
+    host = host.strip("[]")
+    return (socket.AF_INET6 if ":" in host else socket.AF_INET), (host, int(port))
+
+
+def snapshot_values(snapshot):
+    gpu = snapshot.gpu
+    return np.array([
+        snapshot.cpu,
+        snapshot.ram["percent"],
+        gpu["load"] if gpu["found"] else np.nan,
+        snapshot.disk_io["read"],
+        snapshot.disk_io["write"],
+        snapshot.net_io["up_mb"],
+        snapshot.net_io["down_mb"],
+        snapshot.process_count,
+    ], dtype=np.float32)
+
+
+def frame(payload):
+    return LENGTH.pack(len(payload)) + payload
+
+
+class FrameEncoder:
+    # Per-connection encoder; the first sample is a keyframe, later ones
+    # carry only the fields that changed
+    def __init__(self):
+        self.last = None
+
+    def hello(self, name):
+        name = name.encode()[:255]
+        return frame(HELLO_HEADER.pack(HELLO, MAGIC, VERSION, len(name)) + name + "\n".join(FIELDS).encode())
+
+    def sample(self, timestamp, values):
+        if self.last is None:
+            kind = KEYFRAME
+            changed = np.ones(len(values), dtype=bool)
+        else:
+            kind = DELTA
+            same = (values == self.last) | (np.isnan(values) & np.isnan(self.last))
+            changed = ~same
+        self.last = values.copy()
+        mask = sum(1 << int(i) for i in np.flatnonzero(changed))
+        return frame(SAMPLE_HEADER.pack(kind, timestamp, mask) + values[changed].astype(">f4").tobytes())
+
+
+class FrameDecoder:
+    # Applies one connection's frames to the latest values. Fields are mapped
+    # by name, so agents and viewers may disagree on FIELDS.
+    def __init__(self):
+        self.name = None
+        self.index = None
+        self.values = np.full(len(FIELDS), np.nan, dtype=np.float32)
+        self.keyed = False
+
+    def decode(self, payload):
+        # Returns the sample's timestamp, or None for a HELLO
+        kind = payload[0]
+        if kind == HELLO:
+            _, magic, version, length = HELLO_HEADER.unpack_from(payload)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a compatible agent")
+            start = HELLO_HEADER.size
+            self.name = payload[start:start + length].decode(errors="replace")
+            names = payload[start + length:].decode().split("\n")
+            self.index = np.array([FIELD_INDEX.get(name, -1) for name in names], dtype=np.intp)
+            return None
+        if kind not in (KEYFRAME, DELTA) or self.index is None:
+            raise ValueError(f"unexpected frame type {kind}")
+        if kind == DELTA and not self.keyed:
+            raise ValueError("delta before keyframe")
+        self.keyed = True
+        _, timestamp, mask = SAMPLE_HEADER.unpack_from(payload)
+        fields = [i for i in range(len(self.index)) if mask >> i & 1]
+        values = np.frombuffer(payload, dtype=">f4", count=len(fields), offset=SAMPLE_HEADER.size)
+        for i, value in zip(fields, values):
+            local = self.index[i]
+            if local >= 0:
+                self.values[local] = value
+        return timestamp
+
+
+class FleetAgent:
+    # DataCollector subscriber that streams the latest values to every
+    # connected aggregator, at most once per `interval`. A client that can't
+    # take a frame within `send_timeout` is dropped.
+    def __init__(self, collector, address, name=None, interval=1.0, send_timeout=1.0):
+        self.name = name or socket.gethostname()
+        self.interval = interval
+        self.send_timeout = send_timeout
+        self.lock = threading.Lock()
+        self.clients = []
+        self.last = 0.0
+        self.snapshot = collector.snapshot
+
+        family, self.address = parse_address(address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.server.bind(self.address)
+            self.server.listen()
+        else:
+            self.server = socket.create_server(self.address, family=family)
+        self.family = family
+        threading.Thread(target=self._accept, name="fleet-agent", daemon=True).start()
+        collector.subscribe(self)
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except OSError:
+                return
+            client.settimeout(self.send_timeout)
+            if self.family != socket.AF_UNIX:
+                client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            encoder = FrameEncoder()
+            with self.lock:
+                try:
+                    client.sendall(encoder.hello(self.name) + encoder.sample(time.time(), snapshot_values(self.snapshot)))
+                except OSError:
+                    client.close()
+                    continue
+                self.clients.append((client, encoder))
+
+    def __call__(self, snapshot):
+        self.snapshot = snapshot
+        now = time.time()
+        with self.lock:
+            if now - self.last < self.interval or not self.clients:
+                return
+            self.last = now
+            values = snapshot_values(snapshot)
+            alive = []
+            for client, encoder in self.clients:
+                try:
+                    client.sendall(encoder.sample(now, values))
+                    alive.append((client, encoder))
+                except OSError:
+                    client.close()
+            self.clients = alive
+
+    def close(self):
+        self.server.close()
+        with self.lock:
+            for client, encoder in self.clients:
+                client.close()
+            self.clients = []
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+class HostState:
+    # One agent as seen by the aggregator: connection state, latest values
+    # and a (FIELDS, capacity) ring of samples
+    def __init__(self, target, capacity=FLEET_CAPACITY):
+        self.target = target
+        self.name = target
+        self.connected = False
+        self.last_seen = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.values = np.full(len(FIELDS), np.nan, dtype=np.float32)
+        self.history = RingMatrix(len(FIELDS), capacity)
+
+    def series(self):
+        # Copy of the ring, oldest sample first
+        with self.lock:
+            return self.history.latest(self.history.capacity).copy()
+
+
+class FleetAggregator(threading.Thread):
+    # Follows every agent from one asyncio event loop on a daemon thread.
+    # Lost or refused connections are retried every `retry` seconds, and an
+    # agent silent for `stall` seconds is treated as lost. `generation` is
+    # bumped on every sample or state change so a UI can skip idle ticks.
+    def __init__(self, targets, capacity=FLEET_CAPACITY, retry=5.0, stall=10.0):
+        super().__init__(name="fleet-aggregator", daemon=True)
+        self.hosts = [HostState(target, capacity) for target in targets]
+        self.retry = retry
+        self.stall = stall
+        self.generation = 0
+        self.loop = None
+        self.main = None
+
+    def run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self.main = asyncio.current_task()
+        try:
+            await asyncio.gather(*(self._follow(host) for host in self.hosts))
+        except asyncio.CancelledError:
+            pass
+
+    async def _connect(self, target):
+        family, address = parse_address(target)
+        if family == socket.AF_UNIX:
+            return await asyncio.open_unix_connection(address)
+        return await asyncio.open_connection(*address)
+
+    async def _follow(self, host):
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(self._connect(host.target), self.stall)
+                decoder = FrameDecoder()
+                while True:
+                    header = await asyncio.wait_for(reader.readexactly(LENGTH.size), self.stall)
+                    (length,) = LENGTH.unpack(header)
+                    if length == 0 or length > MAX_FRAME:
+                        raise ValueError(f"bad frame length {length}")
+                    self._apply(host, decoder, await reader.readexactly(length))
+            except (OSError, EOFError, ValueError, struct.error, asyncio.TimeoutError) as e:
+                host.error = str(e) or type(e).__name__
+            finally:
+                if writer is not None:
+                    writer.close()
+            if host.connected:
+                host.connected = False
+                self.generation += 1
+            await asyncio.sleep(self.retry)
+
+    def _apply(self, host, decoder, payload):
+        timestamp = decoder.decode(payload)
+        if timestamp is None:
+            host.name = decoder.name
+            host.connected = True
+            host.error = None
+        else:
+            with host.lock:
+                host.values = decoder.values.copy()
+                host.history.append(host.values)
+                host.last_seen = timestamp
+        self.generation += 1
+
+    def close(self):
+        if self.loop is not None and self.main is not None:
+            self.loop.call_soon_threadsafe(self.main.cancel)
+
+
+def main():
+    # Headless check of a fleet: python fleet.py 127.0.0.1:7101 unix:/tmp/a.sock
+    aggregator = FleetAggregator(sys.argv[1:])
+    aggregator.start()
+    try:
+        while True:
+            time.sleep(1)
+            for host in aggregator.hosts:
+                values = host.values
+                state = "up" if host.connected else f"down ({host.error})" if host.error else "connecting"
+                print(f"{host.name:<24} {state:<12} cpu {values[0]:5.1f}% ram {values[1]:5.1f}% procs {values[7]:.0f}")
+            print()
+    except KeyboardInterrupt:
+        aggregator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import shutil
+
+# "nvml", "gputil", "fake" or "none"; unset tries NVML, then GPUtil
+GPU_BACKEND = os.environ.get("SYSMON_GPU")
+
+
+def device_stats(index, name, load, memory_used, memory_total, temperature, power=None, processes=()):
+    # One GPU as reported by every backend. Memory is in MB, power in W.
+    return {
+        "index": index,
+        "name": name,
+        "load": load,
+        "memoryUsed": memory_used,
+        "memoryTotal": memory_total,
+        "temperature": temperature,
+        "power": power,
+        "processes": processes
+    }
+
+
+class GpuBackend:
+    name = None
+
+    def devices(self):
+        # One device_stats() dict per GPU
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NoGpuBackend(GpuBackend):
+    name = "none"
+
+    def devices(self):
+        return []
+
+
+class NvmlBackend(GpuBackend):
+    # In-process NVML: initialised once with device handles kept open, so a
+    # reading is a few library calls instead of an nvidia-smi fork.
+    name = "nvml"
+
+    def __init__(self, nvml=None):
+        if nvml is None:
+            import pynvml as nvml
+        self.nvml = nvml
+        nvml.nvmlInit()
+        self.handles = [nvml.nvmlDeviceGetHandleByIndex(i) for i in range(nvml.nvmlDeviceGetCount())]
+        self.names = [self._decode(nvml.nvmlDeviceGetName(handle)) for handle in self.handles]
+
+    @staticmethod
+    def _decode(value):
+        return value.decode(errors="replace") if isinstance(value, bytes) else value
+
+    def _read(self, getter, *args):
+        # Fields a device doesn't support come back as None
+        try:
+            return getter(*args)
+        except self.nvml.NVMLError:
+            return None
+
+    def devices(self):
+        nvml = self.nvml
+        devices = []
+        for index, (handle, name) in enumerate(zip(self.handles, self.names)):
+            utilization = self._read(nvml.nvmlDeviceGetUtilizationRates, handle)
+            memory = self._read(nvml.nvmlDeviceGetMemoryInfo, handle)
+            temperature = self._read(nvml.nvmlDeviceGetTemperature, handle, nvml.NVML_TEMPERATURE_GPU)
+            power = self._read(nvml.nvmlDeviceGetPowerUsage, handle)
+            processes = {}
+            for getter in (nvml.nvmlDeviceGetComputeRunningProcesses, nvml.nvmlDeviceGetGraphicsRunningProcesses):
+                for p in self._read(getter, handle) or ():
+                    # usedGpuMemory is None where the driver can't attribute it
+                    processes[p.pid] = processes.get(p.pid, 0) + (p.usedGpuMemory or 0) / (1024 * 1024)
+            devices.append(device_stats(
+                index, name,
+                utilization.gpu if utilization is not None else 0,
+                memory.used / (1024 * 1024) if memory is not None else 0,
+                memory.total / (1024 * 1024) if memory is not None else 0,
+                temperature if temperature is not None else 0,
+                power / 1000 if power is not None else None, # mW
+                tuple({"pid": pid, "memoryUsed": used} for pid, used in sorted(processes.items(), key=lambda item: -item[1]))
+            ))
+        return devices
+
+    def close(self):
+        self.nvml.nvmlShutdown()
+
+
+class GPUtilBackend(GpuBackend):
+    # Fallback: forks nvidia-smi on every reading, no power or process data
+    name = "gputil"
+
+    def __init__(self):
+        import GPUtil
+        self.gputil = GPUtil
+
+    def devices(self):
+        return [device_stats(i, gpu.name, gpu.load * 100, gpu.memoryUsed, gpu.memoryTotal, gpu.temperature)
+                for i, gpu in enumerate(self.gputil.getGPUs())]
+
+
+class FakeNvml:
+    # Stands in for the pynvml module with canned readings, so NvmlBackend
+    # can run without a GPU. Each device steps to its next reading whenever
+    # its utilisation is read, and loops at the end.
+    NVML_TEMPERATURE_GPU = 0
+
+    class NVMLError(Exception):
+        pass
+
+    class Device:
+        def __init__(self, name, readings):
+            self.name = name
+            self.readings = readings
+            self.position = -1
+
+        @property
+        def reading(self):
+            return self.readings[max(self.position, 0)]
+
+    class Struct:
+        def __init__(self, **fields):
+            self.__dict__.update(fields)
+
+    # (load %, memory used MB, memory total MB, temperature C, power W or
+    # None if unsupported, {pid: memory MB})
+    READINGS = {
+        "Fake GPU 0": [
+            (12, 2048, 8192, 45, 60.5, {1234: 1536, 4321: 512}),
+            (55, 4096, 8192, 58, 140.0, {1234: 3584, 4321: 512}),
+            (97, 7900, 8192, 74, 230.0, {1234: 7388, 4321: 512}),
+            (30, 3072, 8192, 61, 95.2, {1234: 2560, 4321: 512}),
+        ],
+        "Fake GPU 1": [
+            (0, 256, 16384, 35, None, {}),
+            (40, 6144, 16384, 52, None, {999: 5888}),
+        ],
+    }
+
+    def __init__(self, readings=None):
+        self.devices = [self.Device(name, list(r)) for name, r in (readings or self.READINGS).items()]
+        self.initialised = False
+
+    def nvmlInit(self):
+        self.initialised = True
+
+    def nvmlShutdown(self):
+        self.initialised = False
+
+    def nvmlDeviceGetCount(self):
+        return len(self.devices)
+
+    def nvmlDeviceGetHandleByIndex(self, index):
+        return self.devices[index]
+
+    def nvmlDeviceGetName(self, device):
+        return device.name
+
+    def nvmlDeviceGetUtilizationRates(self, device):
+        device.position = (device.position + 1) % len(device.readings)
+        return self.Struct(gpu=device.reading[0], memory=0)
+
+    def nvmlDeviceGetMemoryInfo(self, device):
+        mb = 1024 * 1024
+        used, total = device.reading[1], device.reading[2]
+        return self.Struct(used=used * mb, total=total * mb, free=(total - used) * mb)
+
+    def nvmlDeviceGetTemperature(self, device, sensor):
+        return device.reading[3]
+
+    def nvmlDeviceGetPowerUsage(self, device):
+        if device.reading[4] is None:
+            raise self.NVMLError("Not Supported")
+        return int(device.reading[4] * 1000)
+
+    def nvmlDeviceGetComputeRunningProcesses(self, device):
+        return [self.Struct(pid=pid, usedGpuMemory=used * 1024 * 1024) for pid, used in device.reading[5].items()]
+
+    def nvmlDeviceGetGraphicsRunningProcesses(self, device):
+        return []
+
+
+def select_backend(name=GPU_BACKEND):
+    if name == "none":
+        return NoGpuBackend()
+    if name == "fake":
+        return NvmlBackend(FakeNvml())
+    if name in (None, "nvml"):
+        try:
+            return NvmlBackend()
+        except Exception as e:
+            # No pynvml, no driver or no devices
+            if name == "nvml":
+                raise
+            print(f"NVML unavailable: {e}")
+    if name is None and shutil.which("nvidia-smi") is None:
+        # No driver tools either: GPUtil would fork a missing nvidia-smi on
+        # every reading to find nothing
+        return NoGpuBackend()
+    try:
+        return GPUtilBackend()
+    except ImportError:
+        if name == "gputil":
+            raise
+        return NoGpuBackend()
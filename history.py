@@ -0,0 +1,263 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# (seconds per bucket, buckets retained, buckets shown in a graph view)
+LEVELS = (
+    (1, 3600, 60),
+    (10, 8640, 360),
+    (60, 10080, 1440),
+)
+
+# Newest samples kept for multi-row series such as per-core CPU
+MATRIX_CAPACITY = 240
+
+# Graph view name -> resolution of the level that backs it
+VIEWS = {
+    "1m": 1,
+    "1h": 10,
+    "24h": 60,
+}
+
+
+def allocate(shape, dtype, fill):
+    return np.full(shape, fill, dtype=dtype)
+
+
+class RingBuffer:
+    # Every value is written twice (at i and i + capacity) so the newest n
+    # values are always one contiguous slice and can be handed out as a view.
+    # All state lives in arrays from `allocate`, so a ring can be placed in
+    # shared memory and read from another process.
+    def __init__(self, capacity, dtype=np.float32, allocate=allocate):
+        self.capacity = capacity
+        self.data = allocate(capacity * 2, dtype, np.nan)
+        self.state = allocate(2, np.int64, 0) # head, count
+
+    @property
+    def head(self):
+        return int(self.state[0])
+
+    @property
+    def count(self):
+        return int(self.state[1])
+
+    def append(self, value):
+        head = int(self.state[0])
+        self.data[head] = value
+        self.data[head + self.capacity] = value
+        self.state[0] = (head + 1) % self.capacity
+        if self.state[1] < self.capacity:
+            self.state[1] += 1
+
+    def replace_last(self, value):
+        i = (int(self.state[0]) - 1) % self.capacity
+        self.data[i] = value
+        self.data[i + self.capacity] = value
+
+    def latest(self, n):
+        n = min(n, self.capacity)
+        end = int(self.state[0]) + self.capacity
+        return self.data[end - n:end]
+
+
+class RingMatrix:
+    # RingBuffer over columns of a (rows, time) array: the newest n columns
+    # are always one (rows, n) view, so an image can be updated without
+    # shifting or copying.
+    def __init__(self, rows, capacity, dtype=np.float32, allocate=allocate):
+        self.rows = rows
+        self.capacity = capacity
+        self.data = allocate((rows, capacity * 2), dtype, np.nan)
+        self.state = allocate(1, np.int64, 0) # head
+
+    def append(self, column):
+        head = int(self.state[0])
+        self.data[:, head] = column
+        self.data[:, head + self.capacity] = column
+        self.state[0] = (head + 1) % self.capacity
+
+    def latest(self, n):
+        n = min(n, self.capacity)
+        end = int(self.state[0]) + self.capacity
+        return self.data[:, end - n:end]
+
+
+class RunningExtrema:
+    # Monotonic deques over the last `window` buckets: amortised O(1) push and
+    # O(1) min/max. The newest bucket may be revised in place as long as its
+    # low only falls and its high only rises, which holds for bucket min/max.
+    def __init__(self, window):
+        self.window = window
+        self.index = -1
+        self.max_queue = deque()
+        self.min_queue = deque()
+
+    def push(self, low, high):
+        self.index += 1
+        cutoff = self.index - self.window
+        while self.max_queue and self.max_queue[0][0] <= cutoff:
+            self.max_queue.popleft()
+        while self.min_queue and self.min_queue[0][0] <= cutoff:
+            self.min_queue.popleft()
+        self._insert(low, high)
+
+    def revise(self, low, high):
+        if self.max_queue and self.max_queue[-1][0] == self.index:
+            self.max_queue.pop()
+        if self.min_queue and self.min_queue[-1][0] == self.index:
+            self.min_queue.pop()
+        self._insert(low, high)
+
+    def _insert(self, low, high):
+        # NaN marks an empty bucket and never becomes an extreme
+        if high == high:
+            while self.max_queue and self.max_queue[-1][1] <= high:
+                self.max_queue.pop()
+            self.max_queue.append((self.index, high))
+        if low == low:
+            while self.min_queue and self.min_queue[-1][1] >= low:
+                self.min_queue.pop()
+            self.min_queue.append((self.index, low))
+
+    @property
+    def max(self):
+        return self.max_queue[0][1] if self.max_queue else float("nan")
+
+    @property
+    def min(self):
+        return self.min_queue[0][1] if self.min_queue else float("nan")
+
+
+class Level:
+    def __init__(self, resolution, capacity, window, allocate=allocate):
+        self.resolution = resolution
+        self.window = window
+        self.min = RingBuffer(capacity, allocate=allocate)
+        self.avg = RingBuffer(capacity, allocate=allocate)
+        self.max = RingBuffer(capacity, allocate=allocate)
+        self.extrema = RunningExtrema(window)
+        self.bounds = allocate(2, np.float64, np.nan) # extrema over the window, for readers
+        self.bucket = None
+        self.total = 0.0
+        self.count = 0
+        self.low = 0.0
+        self.high = 0.0
+
+    def add(self, value, timestamp):
+        bucket = int(timestamp // self.resolution)
+        if self.bucket is not None and bucket <= self.bucket:
+            # Same bucket (or the clock stepped back): fold into the open bucket
+            self.total += value
+            self.count += 1
+            self.low = min(self.low, value)
+            self.high = max(self.high, value)
+            self.min.replace_last(self.low)
+            self.avg.replace_last(self.total / self.count)
+            self.max.replace_last(self.high)
+            self.extrema.revise(self.low, self.high)
+            self.bounds[0] = self.extrema.min
+            self.bounds[1] = self.extrema.max
+            return
+
+        if self.bucket is not None:
+            # Pad skipped buckets so positions stay aligned with wall time
+            for _ in range(min(bucket - self.bucket - 1, self.avg.capacity)):
+                self._append(float("nan"), float("nan"), float("nan"))
+
+        self.bucket = bucket
+        self.total = value
+        self.count = 1
+        self.low = value
+        self.high = value
+        self._append(value, value, value)
+        self.bounds[0] = self.extrema.min
+        self.bounds[1] = self.extrema.max
+
+    def _append(self, low, avg, high):
+        self.min.append(low)
+        self.avg.append(avg)
+        self.max.append(high)
+        self.extrema.push(low, high)
+
+
+class MetricSeries:
+    def __init__(self, name, levels=LEVELS, allocate=allocate):
+        self.name = name
+        self.last = float("nan")
+        self.levels = {resolution: Level(resolution, capacity, window, allocate) for resolution, capacity, window in levels}
+
+    def add(self, value, timestamp):
+        self.last = value
+        for level in self.levels.values():
+            level.add(value, timestamp)
+
+
+class HistoryStore:
+    # `series` and `matrices` ((name, rows) pairs) are laid out up front
+    # with `allocate` (e.g. in a shared memory arena); anything recorded
+    # later, or a matrix whose row count changes, gets private arrays.
+    def __init__(self, levels=LEVELS, series=(), allocate=allocate, matrices=()):
+        self.levels = levels
+        self.lock = threading.Lock()
+        self.series = {}
+        self.matrices = {}
+        for name in series:
+            self.series[name] = MetricSeries(name, levels, allocate)
+        for name, rows in matrices:
+            self.matrices[name] = RingMatrix(rows, MATRIX_CAPACITY, allocate=allocate)
+
+    def _series(self, name):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = MetricSeries(name, self.levels)
+        return series
+
+    def clear(self):
+        # Drop all recorded data; series are recreated with private arrays
+        with self.lock:
+            self.series = {}
+            self.matrices = {}
+
+    def record(self, values, timestamp=None):
+        # Scalars feed the rollup levels; tuples (one value per row, e.g. per
+        # core) are appended as a column to a RingMatrix, unaggregated
+        if timestamp is None:
+            timestamp = time.time()
+        with self.lock:
+            for name, value in values.items():
+                if isinstance(value, tuple):
+                    self._matrix(name, len(value)).append(value)
+                elif value is not None:
+                    self._series(name).add(value, timestamp)
+
+    def _matrix(self, name, rows):
+        matrix = self.matrices.get(name)
+        if matrix is None or matrix.rows != rows:
+            matrix = self.matrices[name] = RingMatrix(rows, MATRIX_CAPACITY)
+        return matrix
+
+    def matrix(self, name):
+        # (rows, MATRIX_CAPACITY) view of a tuple-valued series, or None
+        with self.lock:
+            matrix = self.matrices.get(name)
+            return None if matrix is None else matrix.latest(matrix.capacity)
+
+    def view(self, name, view="1m"):
+        # Returns (min, avg, max) views over the buckets shown in `view`
+        with self.lock:
+            level = self._series(name).levels[VIEWS[view]]
+            return level.min.latest(level.window), level.avg.latest(level.window), level.max.latest(level.window)
+
+    def extrema(self, name, view="1m"):
+        with self.lock:
+            bounds = self._series(name).levels[VIEWS[view]].bounds
+            return float(bounds[0]), float(bounds[1])
+
+    def points(self, view="1m"):
+        for resolution, capacity, window in self.levels:
+            if resolution == VIEWS[view]:
+                return window
+        raise KeyError(view)
@@ -0,0 +1,143 @@
+import os
+import select
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+
+LINUX = sys.platform.startswith("linux")
+MOUNTINFO = "/proc/self/mountinfo"
+
+# Counters from older kernels and some platforms are 32-bit
+WRAP = 2 ** 32
+
+
+class CounterDeltas:
+    # Per-device counter deltas between calls, computed on (devices, fields)
+    # arrays. Devices are matched by name, so hotplug only zeroes the new
+    # device's first interval.
+    def __init__(self, fields):
+        self.fields = fields
+        self.names = ()
+        self.prev = np.zeros((0, len(fields)))
+        self.prev_time = None
+
+    def update(self, counters, now):
+        # counters: {name: psutil namedtuple}. Returns (names, deltas, seconds).
+        names = tuple(counters)
+        curr = np.array([[getattr(c, f, 0) for f in self.fields] for c in counters.values()], dtype=np.float64).reshape(len(names), len(self.fields))
+        if names == self.names:
+            prev = self.prev
+        else:
+            index = {name: i for i, name in enumerate(self.names)}
+            prev = curr.copy()
+            for i, name in enumerate(names):
+                j = index.get(name)
+                if j is not None:
+                    prev[i] = self.prev[j]
+
+        delta = curr - prev
+        wrapped = delta < 0
+        if wrapped.any():
+            # A 32-bit counter near its limit wrapped; anything else going
+            # backwards was a reset, which counts as no activity this interval
+            delta = np.where(wrapped & (prev >= WRAP // 2) & (prev < WRAP), delta + WRAP, delta)
+            np.maximum(delta, 0, out=delta)
+
+        seconds = (now - self.prev_time) if self.prev_time is not None else 0
+        self.names = names
+        self.prev = curr
+        self.prev_time = now
+        return names, delta, seconds or 1
+
+
+# Block device name -> whether it is a partition
+PARTITIONS = {}
+
+
+def is_partition(name):
+    # Whole disks only go into the system total, or partitions count twice
+    partition = PARTITIONS.get(name)
+    if partition is None:
+        partition = PARTITIONS[name] = LINUX and os.path.exists(f"/sys/class/block/{name}/partition")
+    return partition
+
+
+class MountWatcher:
+    # Reports whether the mount table changed since the last call. On Linux
+    # the kernel flags /proc/self/mountinfo with POLLPRI on every mount or
+    # unmount, so checking is one poll() call; elsewhere the table is simply
+    # refreshed every `fallback` seconds.
+    def __init__(self, fallback=300):
+        self.fallback = fallback
+        self.refreshed = None
+        self.file = None
+        if LINUX and hasattr(select, "poll"):
+            try:
+                self.file = open(MOUNTINFO, "rb")
+                self.poller = select.poll()
+                self.poller.register(self.file, select.POLLPRI | select.POLLERR)
+            except OSError:
+                self.file = None
+
+    def changed(self):
+        now = time.monotonic()
+        if self.refreshed is None:
+            changed = True
+        elif self.file is not None:
+            changed = bool(self.poller.poll(0))
+        else:
+            changed = now - self.refreshed > self.fallback
+        if changed:
+            self.refreshed = now
+            if self.file is not None:
+                # Reading to the end re-arms the notification
+                self.file.seek(0)
+                self.file.read()
+        return changed
+
+
+class UsageProbe:
+    # statvfs (shutil.disk_usage) per mount on its own daemon thread with a
+    # deadline. A mount that doesn't answer in time is reported as stale with
+    # its last usage, and isn't probed again until its stuck call returns.
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self.pending = {}
+        self.last = {}
+
+    def probe(self, mountpoints):
+        results = {}
+        done = {}
+        threads = []
+        for mountpoint in mountpoints:
+            thread = self.pending.get(mountpoint)
+            if thread is not None and thread.is_alive():
+                continue
+            thread = threading.Thread(target=self._stat, args=(mountpoint, done), name=f"statvfs {mountpoint}", daemon=True)
+            self.pending[mountpoint] = thread
+            threads.append(thread)
+            thread.start()
+
+        deadline = time.monotonic() + self.timeout
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+
+        for mountpoint in mountpoints:
+            usage = done.get(mountpoint)
+            if usage is not None:
+                self.pending.pop(mountpoint, None)
+                self.last[mountpoint] = usage
+                results[mountpoint] = (usage, False)
+            elif mountpoint in self.pending:
+                results[mountpoint] = (self.last.get(mountpoint), True)
+        return results
+
+    def _stat(self, mountpoint, done):
+        try:
+            done[mountpoint] = shutil.disk_usage(mountpoint)
+        except OSError:
+            pass
+
@@ -0,0 +1,204 @@
+import heapq
+import os
+import sys
+import time
+
+import numpy as np
+import psutil
+
+LINUX = sys.platform.startswith("linux")
+PROC = "/proc"
+if LINUX:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Sort name -> ProcessEntry attribute
+SORT_KEYS = {
+    "cpu": "cpu",
+    "memory": "rss",
+    "io": "io_rate",
+}
+
+# One row of the full process table. Fixed-width names keep it a plain
+# array, so it can be copied into shared memory and sorted with NumPy.
+TABLE_DTYPE = np.dtype([
+    ("pid", "<u4"),
+    ("name", "U32"),
+    ("cpu", "<f8"),
+    ("rss", "<u8"),
+    ("io", "<f8"),
+])
+
+
+class ProcessEntry:
+    __slots__ = ("pid", "create_time", "name", "proc", "cpu_time", "cpu", "rss", "io_bytes", "io_time", "io_rate", "seen")
+
+    def __init__(self, pid, create_time, name, proc=None):
+        self.pid = pid
+        self.create_time = create_time
+        self.name = name
+        self.proc = proc
+        self.cpu_time = None
+        self.cpu = 0.0
+        self.rss = 0
+        self.io_bytes = None
+        self.io_time = None
+        self.io_rate = 0.0
+        self.seen = 0
+
+
+class ProcessTable:
+    # Persistent index keyed by (pid, create_time). Only births and deaths
+    # change the index between ticks; surviving entries are updated in place.
+    def __init__(self, cpu_count=None):
+        self.cpu_count = cpu_count or psutil.cpu_count(logical=True) or 1
+        self.entries = {}
+        self.by_pid = {}
+        self.tick = 0
+        self.prev_time = None
+        self.cost_ms = 0.0
+        self.births = 0
+        self.deaths = 0
+
+    def update(self, with_io=False):
+        start = time.perf_counter()
+        now = time.monotonic()
+        elapsed = (now - self.prev_time) if self.prev_time else 0
+        self.prev_time = now
+        self.tick += 1
+        self.births = 0
+
+        if LINUX:
+            self._scan_proc(now, elapsed, with_io)
+        else:
+            self._scan_psutil(now, with_io)
+
+        dead = [key for key, entry in self.entries.items() if entry.seen != self.tick]
+        for key in dead:
+            entry = self.entries.pop(key)
+            if self.by_pid.get(entry.pid) is entry:
+                del self.by_pid[entry.pid]
+        self.deaths = len(dead)
+        self.cost_ms = (time.perf_counter() - start) * 1000
+
+    def _add(self, pid, create_time, name, proc=None):
+        entry = ProcessEntry(pid, create_time, name, proc)
+        self.entries[(pid, create_time)] = entry
+        self.by_pid[pid] = entry
+        self.births += 1
+        return entry
+
+    def _scan_proc(self, now, elapsed, with_io):
+        # Bulk read of /proc/<pid>/stat with raw fds; much cheaper than a
+        # psutil.Process per pid. Fields after the ")" start at field 3.
+        for name in os.listdir(PROC):
+            if not name.isdigit():
+                continue
+            pid = int(name)
+            try:
+                fd = os.open(f"{PROC}/{pid}/stat", os.O_RDONLY)
+                try:
+                    data = os.read(fd, 4096)
+                finally:
+                    os.close(fd)
+            except OSError:
+                continue
+
+            rparen = data.rfind(b")")
+            fields = data[rparen + 2:].split()
+            cpu_time = int(fields[11]) + int(fields[12])
+            start_time = int(fields[19])
+
+            entry = self.entries.get((pid, start_time))
+            if entry is None:
+                comm = data[data.find(b"(") + 1:rparen].decode(errors="replace")
+                entry = self._add(pid, start_time, comm)
+            elif elapsed > 0:
+                entry.cpu = (cpu_time - entry.cpu_time) / CLOCK_TICKS / elapsed * 100 / self.cpu_count
+            entry.cpu_time = cpu_time
+            entry.rss = int(fields[21]) * PAGE_SIZE
+            entry.seen = self.tick
+
+            if with_io:
+                self._read_io(entry, now)
+
+    def _scan_psutil(self, now, with_io):
+        for pid in psutil.pids():
+            entry = self.by_pid.get(pid)
+            if entry is None:
+                try:
+                    proc = psutil.Process(pid)
+                    entry = self._add(pid, proc.create_time(), proc.name(), proc)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                # First call only primes psutil's cpu_percent baseline
+                try:
+                    proc.cpu_percent(None)
+                except psutil.Error:
+                    pass
+            try:
+                with entry.proc.oneshot():
+                    entry.cpu = entry.proc.cpu_percent(None) / self.cpu_count
+                    entry.rss = entry.proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                continue
+            except psutil.AccessDenied:
+                pass
+            entry.seen = self.tick
+
+            if with_io:
+                self._read_io(entry, now)
+
+    def _read_io(self, entry, now):
+        io_bytes = None
+        if LINUX:
+            try:
+                with open(f"{PROC}/{entry.pid}/io", "rb") as f:
+                    for line in f:
+                        if line.startswith(b"read_bytes:") or line.startswith(b"write_bytes:"):
+                            io_bytes = (io_bytes or 0) + int(line.split()[1])
+            except (OSError, ValueError):
+                return
+        else:
+            try:
+                if entry.proc is None:
+                    entry.proc = psutil.Process(entry.pid)
+                counters = entry.proc.io_counters()
+                io_bytes = counters.read_bytes + counters.write_bytes
+            except (psutil.Error, AttributeError):
+                return
+        if io_bytes is None:
+            return
+
+        if entry.io_bytes is not None and now > entry.io_time:
+            entry.io_rate = max(io_bytes - entry.io_bytes, 0) / (now - entry.io_time)
+        entry.io_bytes = io_bytes
+        entry.io_time = now
+
+    def top(self, n=10, sort="cpu"):
+        # Partial selection: O(N log n) instead of sorting the whole table
+        key = SORT_KEYS[sort]
+        entries = heapq.nlargest(n, self.entries.values(), key=lambda e: getattr(e, key))
+
+        # I/O is only sampled for every process when sorting by it; otherwise
+        # just for the rows that are shown (rates settle after one more tick).
+        if sort != "io":
+            now = time.monotonic()
+            for entry in entries:
+                self._read_io(entry, now)
+
+        return [{
+            "pid": e.pid,
+            "name": e.name,
+            "cpu": e.cpu,
+            "rss": e.rss,
+            "io": e.io_rate
+        } for e in entries]
+
+    def table(self):
+        # Every process, unsorted. I/O rates are only current for the rows
+        # top() reads them for, or for all rows while sorting by I/O.
+        return np.array([(e.pid, e.name, e.cpu, e.rss, e.io_rate) for e in self.entries.values()], dtype=TABLE_DTYPE)
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,176 @@
+import mmap
+import os
+import threading
+import time
+
+import numpy as np
+
+from shared_snapshot import SERIES
+
+MAGIC = b"SYSREC\x00\x01"
+FORMAT_VERSION = 1
+
+# Rows allocated up front: a week at 1Hz
+DEFAULT_CAPACITY = 7 * 24 * 3600
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("columns", "<u4"),
+    ("capacity", "<u8"),
+    ("count", "<u8"), # rows committed; bumped after a row is fully written
+])
+NAME_DTYPE = np.dtype("S32")
+TIMESTAMP_DTYPE = np.dtype("<f8")
+VALUE_DTYPE = np.dtype("<f4")
+
+
+def align(offset):
+    return (offset + 63) // 64 * 64
+
+
+def layout(columns, capacity):
+    # Header, column names, then one fixed-width column per metric after the
+    # timestamp index, each `capacity` rows long. Returns (offsets, size).
+    offset = align(HEADER_DTYPE.itemsize + NAME_DTYPE.itemsize * columns)
+    offsets = [offset]
+    offset = align(offset + TIMESTAMP_DTYPE.itemsize * capacity)
+    for _ in range(columns):
+        offsets.append(offset)
+        offset = align(offset + VALUE_DTYPE.itemsize * capacity)
+    return offsets, offset
+
+
+class RecordingFile:
+    # Columnar time series in one memory-mapped file. Rows are appended in
+    # place; the row count in the header is the commit point, so a reader
+    # (or a crash) never sees a half-written row.
+    def __init__(self, path, columns=None, capacity=DEFAULT_CAPACITY, writable=False):
+        self.path = path
+        self.writable = writable
+        if writable and not os.path.exists(path):
+            self._create(path, tuple(columns or SERIES), capacity)
+        self._map()
+
+    def _create(self, path, columns, capacity):
+        offsets, size = layout(len(columns), capacity)
+        with open(path, "wb") as f:
+            f.truncate(size) # sparse on most filesystems; pages fill as rows land
+            header = np.zeros((), dtype=HEADER_DTYPE)
+            header["magic"] = MAGIC
+            header["version"] = FORMAT_VERSION
+            header["columns"] = len(columns)
+            header["capacity"] = capacity
+            f.write(header.tobytes())
+            f.write(np.array([name.encode() for name in columns], dtype=NAME_DTYPE).tobytes())
+
+    def _map(self):
+        with open(self.path, "r+b" if self.writable else "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.mm, offset=0)
+        if bytes(self.header["magic"]) != MAGIC or int(self.header["version"]) != FORMAT_VERSION:
+            raise ValueError(f"'{self.path}' is not a recording")
+        columns = int(self.header["columns"])
+        self.capacity = int(self.header["capacity"])
+        names = np.ndarray(columns, dtype=NAME_DTYPE, buffer=self.mm, offset=HEADER_DTYPE.itemsize)
+        self.columns = tuple(name.decode() for name in names)
+        offsets, size = layout(columns, self.capacity)
+        if len(self.mm) < size:
+            raise ValueError(f"Recording '{self.path}' is truncated")
+        self.timestamps = np.ndarray(self.capacity, dtype=TIMESTAMP_DTYPE, buffer=self.mm, offset=offsets[0])
+        self.values = {name: np.ndarray(self.capacity, dtype=VALUE_DTYPE, buffer=self.mm, offset=offset)
+                       for name, offset in zip(self.columns, offsets[1:])}
+
+    def __len__(self):
+        return int(self.header["count"])
+
+    def append(self, values, timestamp):
+        count = len(self)
+        if count == self.capacity:
+            self._grow()
+        # The index must stay sorted for bisecting, even if the clock steps back
+        if count and timestamp < self.timestamps[count - 1]:
+            timestamp = float(self.timestamps[count - 1])
+        self.timestamps[count] = timestamp
+        for name, column in self.values.items():
+            value = values.get(name)
+            column[count] = np.nan if value is None else value
+        self.header["count"] = count + 1
+
+    def _grow(self):
+        # Rewrite into a file twice the size and swap it in. Rare (once per
+        # `capacity` rows), and the old file stays intact until the rename.
+        count = len(self)
+        tmp = self.path + ".grow"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        grown = RecordingFile(tmp, self.columns, self.capacity * 2, writable=True)
+        grown.timestamps[:count] = self.timestamps[:count]
+        for name in self.columns:
+            grown.values[name][:count] = self.values[name][:count]
+        grown.header["count"] = count
+        grown.mm.flush()
+        grown.close()
+        self.close()
+        os.replace(tmp, self.path)
+        self._map()
+
+    def bisect(self, timestamp, side="left"):
+        # O(log n) over the committed part of the timestamp index
+        return int(np.searchsorted(self.timestamps[:len(self)], timestamp, side))
+
+    def refresh(self):
+        # A reader keeps mapping the old file after the writer grows it
+        if not self.writable and os.stat(self.path).st_ino != self.inode:
+            self.close()
+            self._map()
+
+    def range(self, start=None, end=None):
+        # Rows with start <= timestamp < end as (timestamps, {column: values});
+        # all arrays are views into the mapped file, nothing is copied.
+        self.refresh()
+        count = len(self)
+        lo = 0 if start is None else self.bisect(start)
+        hi = count if end is None else self.bisect(end)
+        return self.timestamps[lo:hi], {name: column[lo:hi] for name, column in self.values.items()}
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        # Drop our views first so the map can be closed
+        self.header = self.timestamps = self.values = None
+        try:
+            self.mm.close()
+        except BufferError:
+            # Views handed out by range() are still alive; the OS unmaps on exit
+            pass
+
+
+class Recorder:
+    # DataCollector subscriber that appends one row per `interval` with the
+    # latest value of every recorded series.
+    def __init__(self, collector, path, interval=1.0, columns=None):
+        self.history = collector.history
+        self.file = RecordingFile(path, columns, writable=True)
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.last = 0.0
+        self.closed = False
+        collector.subscribe(self)
+
+    def __call__(self, snapshot):
+        now = time.time()
+        with self.lock:
+            if self.closed or now - self.last < self.interval:
+                return
+            self.last = now
+            series = self.history.series
+            self.file.append({name: series[name].last for name in self.file.columns if name in series}, now)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.file.flush()
+            self.file.close()
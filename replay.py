@@ -0,0 +1,122 @@
+import threading
+import time
+
+from collectors import Snapshot
+from history import HistoryStore
+from recording import RecordingFile
+
+MAX_SPEED = 100
+
+# Seconds of recording replayed into history on a seek, so the graphs have
+# something behind the new position
+WARMUP = 3600
+
+
+class ReplaySource(threading.Thread):
+    # Stand-in for DataCollector that plays back a recording. Rows are read
+    # through the file's mapping as the playhead reaches them, and each tick
+    # applies every row that became due as one batch and publishes a single
+    # Snapshot, so at high speed the UI only ever sees the latest state.
+    def __init__(self, path, speed=1.0, tick=0.1):
+        super().__init__()
+        self.daemon = True
+        self.file = RecordingFile(path)
+        self.history = HistoryStore()
+        self.snapshot = Snapshot()
+        self.lock = threading.Lock()
+        self.tick = tick
+        self.running = True
+        self.playing = True
+        self.process_sort = "cpu" # no process rows are recorded
+        self._speed = 1.0
+        self.speed = speed
+        self.cursor = 0
+        self.position = self.start_time
+
+    @property
+    def start_time(self):
+        return float(self.file.timestamps[0]) if len(self.file) else 0.0
+
+    @property
+    def end_time(self):
+        count = len(self.file)
+        return float(self.file.timestamps[count - 1]) if count else 0.0
+
+    @property
+    def speed(self):
+        return self._speed
+
+    @speed.setter
+    def speed(self, value):
+        self._speed = min(max(float(value), 0.0), MAX_SPEED)
+
+    def play(self):
+        with self.lock:
+            if self.cursor >= len(self.file):
+                # Finished: start over
+                self._seek(self.start_time)
+            self.playing = True
+
+    def pause(self):
+        self.playing = False
+
+    def seek(self, timestamp):
+        with self.lock:
+            self._seek(min(max(timestamp, self.start_time), self.end_time))
+
+    def _seek(self, timestamp):
+        self.history.clear()
+        self.cursor = self.file.bisect(timestamp - WARMUP)
+        self.position = timestamp
+        self._advance(timestamp)
+
+    def _advance(self, target):
+        hi = self.file.bisect(target, "right")
+        if hi <= self.cursor:
+            return
+        timestamps = self.file.timestamps
+        columns = self.file.values.items()
+        for i in range(self.cursor, hi):
+            self.history.record(self._row(columns, i), float(timestamps[i]))
+        self.cursor = hi
+        self._publish(columns, hi - 1)
+
+    def _row(self, columns, i):
+        row = {}
+        for name, column in columns:
+            value = float(column[i])
+            row[name] = value if value == value else None # NaN: not sampled
+        return row
+
+    def _publish(self, columns, i):
+        row = self._row(columns, i)
+        get = lambda name: row.get(name) or 0
+        up_mb, down_mb = get("net_up"), get("net_down")
+        self.snapshot = self.snapshot.replace(
+            cpu=get("cpu"),
+            ram={"percent": get("ram"), "used": 0, "total": 0},
+            gpu={"found": row.get("gpu") is not None, "load": get("gpu"), "memoryUsed": 0, "memoryTotal": 0, "temperature": 0},
+            disk_io={"read": get("disk_read"), "write": get("disk_write")},
+            net_io={"sent": up_mb * 1024 * 1024, "recv": down_mb * 1024 * 1024, "up_mb": up_mb, "down_mb": down_mb},
+            process_cost_ms=get("process_cost_ms")
+        )
+
+    def collector_status(self):
+        return {}
+
+    def run(self):
+        with self.lock:
+            self._seek(self.position)
+        last = time.monotonic()
+        while self.running:
+            time.sleep(self.tick)
+            now = time.monotonic()
+            elapsed = now - last
+            last = now
+            with self.lock:
+                if not self.playing:
+                    continue
+                self.position = min(self.position + elapsed * self.speed, self.end_time)
+                self._advance(self.position)
+                if self.cursor >= len(self.file):
+                    self.playing = False
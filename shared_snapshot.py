@@ -0,0 +1,494 @@
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import psutil
+
+from alerts import Alert, Rule
+from collectors import DEFAULT_INTERVALS, Snapshot
+from history import HistoryStore, LEVELS
+from processes import TABLE_DTYPE
+
+DEFAULT_NAME = "sysmon"
+MAGIC = b"SYSMON\x00\x01"
+LAYOUT_VERSION = 8
+
+# Fixed layout: the series, collectors and process rows below are part of
+# the binary format, so changing them needs a LAYOUT_VERSION bump. The
+# per-core history is sized by the writer's core count, kept in the header.
+SERIES = ("cpu", "ram", "gpu", "disk_read", "disk_write", "net_up", "net_down", "process_cost_ms")
+MATRICES = ("per_cpu",)
+MAX_CORES = 1024
+COLLECTORS = tuple(DEFAULT_INTERVALS)
+MAX_PROCESSES = 10
+MAX_TABLE_ROWS = 8192
+MAX_GPUS = 8
+MAX_GPU_PROCESSES = 8
+MAX_PARTITIONS = 64
+MAX_DEVICES = 64
+MAX_INTERFACES = 64
+MAX_ALERTS = 32
+READ_TIMEOUT = 0.05 # give up on a write that never finishes (daemon killed mid-publish)
+GONE_INTERVALS = 3 # no publish for this many collector intervals: the daemon is gone
+GONE_MIN = 5.0
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("cores", "<u4"), # rows of the per-core history
+    ("size", "<u8"),
+    ("seq", "<u8"), # seqlock: odd while a write is in progress
+])
+
+PROCESS_DTYPE = np.dtype([
+    ("pid", "<u4"),
+    ("name", "S32"),
+    ("cpu", "<f8"),
+    ("rss", "<u8"),
+    ("io", "<f8"),
+])
+
+GPU_PROCESS_DTYPE = np.dtype([
+    ("pid", "<u4"),
+    ("memory_used", "<f8"),
+])
+
+GPU_DTYPE = np.dtype([
+    ("index", "<u4"),
+    ("name", "S64"),
+    ("load", "<f8"),
+    ("memory_used", "<f8"),
+    ("memory_total", "<f8"),
+    ("temperature", "<f8"),
+    ("power", "<f8"), # NaN when unsupported
+    ("process_rows", "<u4"),
+    ("processes", GPU_PROCESS_DTYPE, (MAX_GPU_PROCESSES,)),
+])
+
+PARTITION_DTYPE = np.dtype([
+    ("device", "S64"),
+    ("mountpoint", "S256"),
+    ("used", "<u8"),
+    ("total", "<u8"),
+    ("stale", "u1"),
+])
+
+DEVICE_DTYPE = np.dtype([
+    ("name", "S32"),
+    ("read", "<f8"),
+    ("write", "<f8"),
+    ("read_iops", "<f8"),
+    ("write_iops", "<f8"),
+    ("await_ms", "<f8"),
+    ("util", "<f8"),
+    ("partition", "u1"),
+])
+
+INTERFACE_DTYPE = np.dtype([
+    ("name", "S32"),
+    ("sent", "<f8"),
+    ("recv", "<f8"),
+    ("packets_sent", "<f8"),
+    ("packets_recv", "<f8"),
+    ("errors", "<f8"),
+    ("drops", "<f8"),
+])
+
+ALERT_DTYPE = np.dtype([
+    ("rule", "S64"),
+    ("severity", "S16"),
+    ("metric", "S64"),
+    ("value", "<f8"),
+    ("since", "<f8"),
+    ("message", "S256"),
+])
+
+STATUS_DTYPE = np.dtype([
+    ("interval", "<f8"),
+    ("base_interval", "<f8"),
+    ("last_ms", "<f8"),
+    ("runs", "<u8"),
+    ("misses", "<u8"),
+    ("timeouts", "<u8"),
+    ("errors", "<u8"),
+    ("stale", "u1"),
+    ("p50_ms", "<f8"),
+    ("p99_ms", "<f8"),
+])
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("cpu", "<f8"),
+    ("core_rows", "<u4"),
+    ("per_cpu", "<f8", (MAX_CORES,)),
+    ("ram_percent", "<f8"),
+    ("ram_used", "<u8"),
+    ("ram_total", "<u8"),
+    ("gpu_found", "u1"),
+    ("gpu_load", "<f8"),
+    ("gpu_memory_used", "<f8"),
+    ("gpu_memory_total", "<f8"),
+    ("gpu_temperature", "<f8"),
+    ("gpu_rows", "<u4"),
+    ("gpus", GPU_DTYPE, (MAX_GPUS,)),
+    ("partition_rows", "<u4"),
+    ("partitions", PARTITION_DTYPE, (MAX_PARTITIONS,)),
+    ("disk_read", "<f8"),
+    ("disk_write", "<f8"),
+    ("device_rows", "<u4"),
+    ("devices", DEVICE_DTYPE, (MAX_DEVICES,)),
+    ("net_sent", "<f8"),
+    ("net_recv", "<f8"),
+    ("interface_rows", "<u4"),
+    ("interfaces", INTERFACE_DTYPE, (MAX_INTERFACES,)),
+    ("process_count", "<u4"),
+    ("process_cost_ms", "<f8"),
+    ("process_rows", "<u4"),
+    ("processes", PROCESS_DTYPE, (MAX_PROCESSES,)),
+    ("table_rows", "<u4"),
+    ("table", TABLE_DTYPE, (MAX_TABLE_ROWS,)),
+    ("collectors", STATUS_DTYPE, (len(COLLECTORS),)),
+    ("alert_generation", "<u8"),
+    ("alert_rows", "<u4"),
+    ("alerts", ALERT_DTYPE, (MAX_ALERTS,)),
+    ("disk_text", "S4096"),
+])
+
+SNAPSHOT_OFFSET = 64
+HISTORY_OFFSET = (SNAPSHOT_OFFSET + SNAPSHOT_DTYPE.itemsize + 63) // 64 * 64
+
+
+class Arena:
+    # Bump allocator handing out NumPy arrays over a shared buffer. With no
+    # buffer it just measures, returning private arrays.
+    def __init__(self, buf=None, offset=0, initialize=True):
+        self.buf = buf
+        self.offset = offset
+        self.initialize = initialize
+
+    def __call__(self, shape, dtype, fill):
+        dtype = np.dtype(dtype)
+        self.offset = (self.offset + 7) // 8 * 8
+        if self.buf is None:
+            array = np.full(shape, fill, dtype=dtype)
+        else:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.buf, offset=self.offset)
+            if self.initialize:
+                array.fill(fill)
+        self.offset += array.nbytes
+        return array
+
+
+def history_store(cores, allocate):
+    return HistoryStore(LEVELS, SERIES, allocate, [(name, cores) for name in MATRICES])
+
+
+def segment_size(cores):
+    arena = Arena(offset=HISTORY_OFFSET)
+    history_store(cores, arena)
+    return arena.offset
+
+
+class SharedSnapshotWriter:
+    def __init__(self, name=DEFAULT_NAME, cores=None):
+        cores = cores or psutil.cpu_count(logical=True) or 1
+        size = segment_size(cores)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.lock = threading.Lock()
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        self.record = np.ndarray((), dtype=SNAPSHOT_DTYPE, buffer=self.shm.buf, offset=SNAPSHOT_OFFSET)
+        self.history = history_store(cores, Arena(self.shm.buf, HISTORY_OFFSET))
+
+        self.header["seq"] = 0
+        self.alert_generation = None
+        self.header["size"] = size
+        self.header["cores"] = cores
+        self.header["version"] = LAYOUT_VERSION
+        self.header["magic"] = MAGIC
+
+    def publish(self, snapshot, status, alerts=None):
+        # `alerts`: the AlertEngine whose active alerts viewers should show
+        with self.lock:
+            seq = int(self.header["seq"])
+            self.header["seq"] = seq + 1
+            try:
+                self._write(snapshot, status)
+                if alerts is not None and alerts.generation != self.alert_generation:
+                    self._write_alerts(alerts)
+            finally:
+                self.header["seq"] = seq + 2
+
+    def _write_alerts(self, engine):
+        # Rewritten only when the set of active alerts changes
+        s = self.record
+        self.alert_generation = engine.generation
+        firing = engine.firing()[:MAX_ALERTS]
+        s["alert_generation"] = engine.generation
+        s["alert_rows"] = len(firing)
+        rows = s["alerts"]
+        for i, a in enumerate(firing):
+            rows[i] = (a.rule.name.encode()[:64], a.rule.severity.encode()[:16], a.metric.encode()[:64], a.value, a.since, a.message.encode()[:256])
+
+    def _write(self, snapshot, status):
+        s = self.record
+        s["timestamp"] = time.time()
+        s["cpu"] = snapshot.cpu
+        per_cpu = snapshot.per_cpu[:MAX_CORES]
+        s["core_rows"] = len(per_cpu)
+        s["per_cpu"][:len(per_cpu)] = per_cpu
+        s["ram_percent"] = snapshot.ram["percent"]
+        s["ram_used"] = snapshot.ram["used"]
+        s["ram_total"] = snapshot.ram["total"]
+        gpu = snapshot.gpu
+        s["gpu_found"] = gpu["found"]
+        s["gpu_load"] = gpu["load"]
+        s["gpu_memory_used"] = gpu["memoryUsed"]
+        s["gpu_memory_total"] = gpu["memoryTotal"]
+        s["gpu_temperature"] = gpu["temperature"]
+        gpus = snapshot.gpus[:MAX_GPUS]
+        s["gpu_rows"] = len(gpus)
+        for row, g in zip(s["gpus"], gpus):
+            row["index"] = g["index"]
+            row["name"] = g["name"].encode()[:64]
+            row["load"] = g["load"]
+            row["memory_used"] = g["memoryUsed"]
+            row["memory_total"] = g["memoryTotal"]
+            row["temperature"] = g["temperature"]
+            row["power"] = np.nan if g["power"] is None else g["power"]
+            processes = g["processes"][:MAX_GPU_PROCESSES]
+            row["process_rows"] = len(processes)
+            for i, p in enumerate(processes):
+                row["processes"][i] = (p["pid"], p["memoryUsed"])
+        disks = snapshot.disks[:MAX_PARTITIONS]
+        s["partition_rows"] = len(disks)
+        partitions = s["partitions"]
+        for i, d in enumerate(disks):
+            partitions[i] = (d["device"].encode()[:64], d["mountpoint"].encode()[:256], d["used"], d["total"], d["stale"])
+        s["disk_read"] = snapshot.disk_io["read"]
+        s["disk_write"] = snapshot.disk_io["write"]
+        devices = snapshot.disk_devices[:MAX_DEVICES]
+        s["device_rows"] = len(devices)
+        rows = s["devices"]
+        for i, d in enumerate(devices):
+            rows[i] = (d["name"].encode()[:32], d["read"], d["write"], d["read_iops"], d["write_iops"], d["await_ms"], d["util"], d["partition"])
+        s["net_sent"] = snapshot.net_io["sent"]
+        s["net_recv"] = snapshot.net_io["recv"]
+        interfaces = snapshot.net_interfaces[:MAX_INTERFACES]
+        s["interface_rows"] = len(interfaces)
+        rows = s["interfaces"]
+        for i, n in enumerate(interfaces):
+            rows[i] = (n["name"].encode()[:32], n["sent"], n["recv"], n["packets_sent"], n["packets_recv"], n["errors"], n["drops"])
+        s["process_count"] = snapshot.process_count
+        s["process_cost_ms"] = snapshot.process_cost_ms
+
+        rows = snapshot.processes[:MAX_PROCESSES]
+        s["process_rows"] = len(rows)
+        processes = s["processes"]
+        for i, p in enumerate(rows):
+            processes[i] = (p["pid"], p["name"].encode()[:32], p["cpu"], p["rss"], p["io"])
+
+        table = snapshot.process_table[:MAX_TABLE_ROWS]
+        s["table_rows"] = len(table)
+        s["table"][:len(table)] = table
+
+        collectors = s["collectors"]
+        for i, name in enumerate(COLLECTORS):
+            c = status.get(name)
+            if c is not None:
+                collectors[i] = (c["interval"], c["base_interval"], c["last_ms"], c["runs"], c["misses"], c["timeouts"], c["errors"], c["stale"], c["p50_ms"], c["p99_ms"])
+
+        s["disk_text"] = snapshot.disk_text.encode()[:4096]
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            # NumPy views are still alive; the segment goes away on unlink
+            pass
+        self.shm.unlink()
+
+
+class SharedAlerts:
+    # Read-only stand-in for the daemon's AlertEngine, enough for a banner:
+    # `generation` changes whenever the active alerts do
+    def __init__(self, client):
+        self.client = client
+        self.last_generation = 0
+        self.last_firing = []
+
+    @property
+    def generation(self):
+        seq, generation = self.client.read("alert_generation")
+        if seq is not None:
+            self.last_generation = int(generation)
+        return self.last_generation
+
+    def firing(self):
+        # Active alerts, most severe first, as the daemon ordered them
+        seq, s = self.client.read()
+        if seq is None:
+            return self.last_firing
+        alerts = []
+        for row in s["alerts"][:int(s["alert_rows"])]:
+            rule = Rule(bytes(row["rule"]).decode(errors="ignore"), bytes(row["metric"]).decode(errors="ignore"), bytes(row["severity"]).decode(errors="ignore"))
+            alerts.append(Alert(rule, rule.metric, float(row["value"]), float(row["since"]), bytes(row["message"]).decode(errors="replace")))
+        self.last_firing = alerts
+        return alerts
+
+
+class LayoutError(RuntimeError):
+    # The segment was written by a daemon with a different LAYOUT_VERSION
+    pass
+
+
+class SharedSnapshotClient:
+    # Read-only stand-in for DataCollector backed by a daemon's segment:
+    # history is read in place, the snapshot record through the seqlock.
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # Attaching must not hand the segment to our resource tracker,
+            # or it would be unlinked when this reader exits.
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        version = int(self.header["version"])
+        cores = int(self.header["cores"])
+        if bytes(self.header["magic"]) != MAGIC or version != LAYOUT_VERSION or int(self.header["size"]) != segment_size(cores):
+            # Drop the view first so the mapping can be closed
+            del self.header
+            self.shm.close()
+            raise LayoutError(f"Shared memory segment '{name}' has an incompatible layout (version {version}, expected {LAYOUT_VERSION})")
+        self.record = np.ndarray((), dtype=SNAPSHOT_DTYPE, buffer=self.shm.buf, offset=SNAPSHOT_OFFSET)
+        self.history = history_store(cores, Arena(self.shm.buf, HISTORY_OFFSET, initialize=False))
+        self.running = True
+        self.process_sort = "cpu" # sorting is fixed by the daemon
+        self.alerts = SharedAlerts(self)
+        self.cached = Snapshot(generation=-1)
+        self.cached_status = np.zeros(len(COLLECTORS), dtype=STATUS_DTYPE)
+
+    def start(self):
+        pass
+
+    def read(self, field=None):
+        # (seq, copy of the record, or of one field) from a write that did
+        # not overlap the read, or (None, None) if seq stays odd
+        source = self.record if field is None else self.record[field]
+        deadline = time.monotonic() + READ_TIMEOUT
+        while True:
+            seq = int(self.header["seq"])
+            if not seq & 1:
+                record = source.copy()
+                if int(self.header["seq"]) == seq:
+                    return seq, record
+            if time.monotonic() > deadline:
+                return None, None
+            time.sleep(0)
+
+    @property
+    def snapshot(self):
+        # Each completed write advances seq by 2, so seq // 2 is the
+        # generation; an unchanged segment returns the cached Snapshot.
+        if int(self.header["seq"]) // 2 == self.cached.generation:
+            return self.cached
+        seq, s = self.read()
+        if seq is None:
+            return self.cached
+        self.cached = Snapshot(
+            generation=seq // 2,
+            cpu=float(s["cpu"]),
+            per_cpu=tuple(s["per_cpu"][:int(s["core_rows"])].tolist()),
+            ram={"percent": float(s["ram_percent"]), "used": int(s["ram_used"]), "total": int(s["ram_total"])},
+            gpu={
+                "found": bool(s["gpu_found"]),
+                "load": float(s["gpu_load"]),
+                "memoryUsed": float(s["gpu_memory_used"]),
+                "memoryTotal": float(s["gpu_memory_total"]),
+                "temperature": float(s["gpu_temperature"])
+            },
+            gpus=tuple({
+                "index": int(g["index"]),
+                "name": bytes(g["name"]).decode(errors="ignore"),
+                "load": float(g["load"]),
+                "memoryUsed": float(g["memory_used"]),
+                "memoryTotal": float(g["memory_total"]),
+                "temperature": float(g["temperature"]),
+                "power": float(g["power"]) if g["power"] == g["power"] else None,
+                "processes": tuple({"pid": int(p["pid"]), "memoryUsed": float(p["memory_used"])} for p in g["processes"][:int(g["process_rows"])])
+            } for g in s["gpus"][:int(s["gpu_rows"])]),
+            disks=tuple({
+                "device": bytes(d["device"]).decode(errors="ignore"),
+                "mountpoint": bytes(d["mountpoint"]).decode(errors="ignore"),
+                "used": int(d["used"]),
+                "total": int(d["total"]),
+                "stale": bool(d["stale"])
+            } for d in s["partitions"][:int(s["partition_rows"])]),
+            disk_text=bytes(s["disk_text"]).decode(errors="replace"),
+            disk_io={"read": float(s["disk_read"]), "write": float(s["disk_write"])},
+            disk_devices=tuple({
+                "name": bytes(d["name"]).decode(errors="ignore"),
+                "read": float(d["read"]),
+                "write": float(d["write"]),
+                "read_iops": float(d["read_iops"]),
+                "write_iops": float(d["write_iops"]),
+                "await_ms": float(d["await_ms"]),
+                "util": float(d["util"]),
+                "partition": bool(d["partition"])
+            } for d in s["devices"][:int(s["device_rows"])]),
+            net_io={
+                "sent": float(s["net_sent"]),
+                "recv": float(s["net_recv"]),
+                "up_mb": float(s["net_sent"]) / (1024 * 1024),
+                "down_mb": float(s["net_recv"]) / (1024 * 1024)
+            },
+            net_interfaces=tuple({
+                "name": bytes(n["name"]).decode(errors="ignore"),
+                "sent": float(n["sent"]),
+                "recv": float(n["recv"]),
+                "packets_sent": float(n["packets_sent"]),
+                "packets_recv": float(n["packets_recv"]),
+                "errors": float(n["errors"]),
+                "drops": float(n["drops"])
+            } for n in s["interfaces"][:int(s["interface_rows"])]),
+            processes=tuple({
+                "pid": int(p["pid"]),
+                "name": bytes(p["name"]).decode(errors="ignore"),
+                "cpu": float(p["cpu"]),
+                "rss": int(p["rss"]),
+                "io": float(p["io"])
+            } for p in s["processes"][:int(s["process_rows"])]),
+            process_table=s["table"][:int(s["table_rows"])],
+            process_count=int(s["process_count"]),
+            process_cost_ms=float(s["process_cost_ms"])
+        )
+        return self.cached
+
+    def gone(self, collectors):
+        # A write that never finished, or no publish for a few intervals
+        seq, timestamp = self.read("timestamp")
+        if seq is None:
+            return True
+        limit = max(GONE_INTERVALS * float(collectors["interval"].max()), GONE_MIN)
+        return seq > 0 and time.time() - float(timestamp) > limit
+
+    def collector_status(self):
+        # Every collector reads as stale once the daemon is gone
+        seq, collectors = self.read("collectors")
+        if seq is None:
+            collectors = self.cached_status
+        else:
+            self.cached_status = collectors
+        gone = self.gone(collectors)
+        return {name: {
+            "interval": float(c["interval"]),
+            "base_interval": float(c["base_interval"]),
+            "last_ms": float(c["last_ms"]),
+            "runs": int(c["runs"]),
+            "misses": int(c["misses"]),
+            "timeouts": int(c["timeouts"]),
+            "errors": int(c["errors"]),
+            "stale": gone or bool(c["stale"]),
+            "p50_ms": float(c["p50_ms"]),
+            "p99_ms": float(c["p99_ms"])
+        } for name, c in zip(COLLECTORS, collectors)}
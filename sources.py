@@ -0,0 +1,68 @@
+import os
+
+from alerts import attach_alerts
+from collectors import DataCollector
+from fleet import FleetAggregator
+from recording import Recorder
+from replay import ReplaySource
+from shared_snapshot import DEFAULT_NAME, LayoutError, SharedSnapshotClient
+
+# Where a frontend gets its data. Nothing here imports a GUI toolkit, so the
+# desktop app and the terminal dashboard share it.
+
+# Shared memory segment published by collector_daemon.py, if one is running
+SEGMENT_NAME = os.environ.get("SYSMON_SHM", DEFAULT_NAME)
+
+# Recording file to append samples to when collecting in-process, if set
+RECORD_PATH = os.environ.get("SYSMON_RECORD")
+
+# Alert rules (JSON) to use instead of the defaults, and the file alerts are
+# logged to (printed when unset)
+ALERT_RULES = os.environ.get("SYSMON_ALERTS")
+ALERT_LOG = os.environ.get("SYSMON_ALERT_LOG")
+
+# Recording file to play back instead of live data, if set
+REPLAY_PATH = os.environ.get("SYSMON_REPLAY")
+
+# Comma-separated agent addresses ("host:port" or "unix:/path") to watch
+# in the fleet view, if set
+FLEET_TARGETS = [target.strip() for target in os.environ.get("SYSMON_FLEET", "").split(",") if target.strip()]
+
+
+def attach_collector():
+    if REPLAY_PATH:
+        return ReplaySource(REPLAY_PATH)
+    # Read from a running daemon instead of sampling in-process
+    try:
+        return SharedSnapshotClient(SEGMENT_NAME)
+    except FileNotFoundError:
+        pass
+    except LayoutError as e:
+        # Usually a daemon from an older version is still running
+        print(f"{e}; collecting in-process instead")
+    collector = DataCollector()
+    if RECORD_PATH:
+        Recorder(collector, RECORD_PATH)
+    return collector
+
+
+def attach_local_alerts(collector, stdout=True):
+    # Alerts are evaluated where samples are taken: here for an in-process
+    # collector, while a daemon publishes its active alerts in the segment.
+    # A replay has none.
+    if isinstance(collector, DataCollector):
+        return attach_alerts(collector, ALERT_RULES, ALERT_LOG, stdout)
+    if isinstance(collector, SharedSnapshotClient):
+        return collector.alerts
+    return None
+
+
+def set_background(collector, background):
+    # Only an in-process collector slows down while its window is hidden; a
+    # daemon keeps sampling for its other viewers
+    if isinstance(collector, DataCollector):
+        collector.background = background
+
+
+def attach_fleet():
+    return FleetAggregator(FLEET_TARGETS) if FLEET_TARGETS else None
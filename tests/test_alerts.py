@@ -0,0 +1,161 @@
+import json
+
+from alerts import AlertEngine, Anomaly, RateOfChange, Threshold, attach_alerts, load_rules
+
+
+class Events:
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, alert):
+        self.events.append((event, alert.metric))
+
+
+def engine(*rules):
+    sink = Events()
+    return AlertEngine(rules, [sink]), sink.events
+
+
+def test_threshold_hysteresis():
+    alerts, events = engine(Threshold("High CPU", "cpu", above=90, clear=80))
+    alerts.evaluate({"cpu": 95}, 0)
+    assert events == [("FIRING", "cpu")]
+    # Between clear and above: still firing, nothing new
+    alerts.evaluate({"cpu": 85}, 1)
+    assert len(alerts.firing()) == 1
+    alerts.evaluate({"cpu": 79}, 2)
+    assert alerts.firing() == []
+    assert events == [("FIRING", "cpu"), ("RESOLVED", "cpu")]
+
+
+def test_below_threshold():
+    alerts, events = engine(Threshold("Low battery", "battery", below=10, clear=15))
+    alerts.evaluate({"battery": 9}, 0)
+    alerts.evaluate({"battery": 12}, 1)
+    assert len(alerts.firing()) == 1
+    alerts.evaluate({"battery": 16}, 2)
+    assert events == [("FIRING", "battery"), ("RESOLVED", "battery")]
+
+
+def test_for_seconds():
+    alerts, events = engine(Threshold("High CPU", "cpu", above=90, for_seconds=30))
+    alerts.evaluate({"cpu": 95}, 0)
+    alerts.evaluate({"cpu": 95}, 29)
+    assert events == []
+    alerts.evaluate({"cpu": 95}, 30)
+    assert events == [("FIRING", "cpu")]
+
+
+def test_for_seconds_restarts_when_condition_clears():
+    alerts, events = engine(Threshold("High CPU", "cpu", above=90, for_seconds=30))
+    alerts.evaluate({"cpu": 95}, 0)
+    alerts.evaluate({"cpu": 50}, 20)
+    alerts.evaluate({"cpu": 95}, 25)
+    alerts.evaluate({"cpu": 95}, 50)
+    assert events == []
+    alerts.evaluate({"cpu": 95}, 55)
+    assert events == [("FIRING", "cpu")]
+
+
+def test_cooldown_suppresses_flapping():
+    alerts, events = engine(Threshold("High CPU", "cpu", above=90, cooldown=60))
+    alerts.evaluate({"cpu": 95}, 0)
+    alerts.evaluate({"cpu": 50}, 10)
+    # Fires again inside the cooldown: shown, but not announced
+    alerts.evaluate({"cpu": 95}, 20)
+    assert len(alerts.firing()) == 1
+    alerts.evaluate({"cpu": 50}, 30)
+    assert events == [("FIRING", "cpu"), ("RESOLVED", "cpu")]
+    # After the cooldown it is announced again
+    alerts.evaluate({"cpu": 95}, 100)
+    assert events[-1] == ("FIRING", "cpu")
+    assert len(events) == 3
+
+
+def test_generation_changes_with_active_set():
+    alerts, _ = engine(Threshold("High CPU", "cpu", above=90))
+    start = alerts.generation
+    alerts.evaluate({"cpu": 95}, 0)
+    firing = alerts.generation
+    assert firing != start
+    alerts.evaluate({"cpu": 96}, 1)
+    assert alerts.generation == firing
+
+
+def test_wildcard_metric():
+    alerts, events = engine(Threshold("Low disk space", "disk_used:*", above=90))
+    alerts.evaluate({"disk_used:/": 95, "disk_used:/home": 50, "cpu": 99}, 0)
+    assert events == [("FIRING", "disk_used:/")]
+
+
+def test_missing_values_are_skipped():
+    alerts, events = engine(Threshold("High CPU", "cpu", above=90))
+    alerts.evaluate({"cpu": None}, 0)
+    alerts.evaluate({"cpu": float("nan")}, 1)
+    assert events == []
+
+
+def test_critical_first():
+    alerts, _ = engine(Threshold("Warm", "a", above=1), Threshold("Hot", "b", above=1, severity="critical"))
+    alerts.evaluate({"a": 2}, 0)
+    alerts.evaluate({"b": 2}, 1)
+    assert [a.rule.name for a in alerts.firing()] == ["Hot", "Warm"]
+
+
+def test_rate_of_change():
+    alerts, events = engine(RateOfChange("Filling", "disk_used:/", per_second=1))
+    alerts.evaluate({"disk_used:/": 10}, 0)
+    alerts.evaluate({"disk_used:/": 10.5}, 1)
+    assert events == []
+    alerts.evaluate({"disk_used:/": 15}, 2)
+    assert events == [("FIRING", "disk_used:/")]
+
+
+def test_anomaly_after_warmup():
+    alerts, events = engine(Anomaly("CPU anomaly", "cpu", z=4, warmup=20))
+    for i in range(40):
+        alerts.evaluate({"cpu": 10 + (i % 2)}, i)
+    assert events == []
+    alerts.evaluate({"cpu": 90}, 40)
+    assert events == [("FIRING", "cpu")]
+
+
+def test_near_threshold():
+    alerts, _ = engine(Threshold("High CPU", "cpu", above=90, clear=80))
+    assert not alerts.near("cpu", 50)
+    assert alerts.near("cpu", 85)
+    assert not alerts.near("ram", 99)
+
+
+def test_load_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([
+        {"type": "threshold", "name": "Hot", "metric": "cpu", "above": 50, "severity": "critical"},
+        {"type": "rate", "name": "Jump", "metric": "ram", "per_second": 5},
+    ]))
+    hot, jump = load_rules(str(path))
+    assert isinstance(hot, Threshold) and hot.above == 50 and hot.severity == "critical"
+    assert isinstance(jump, RateOfChange) and jump.per_second == 5
+
+
+class Collector:
+    adaptive = None
+
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe_metrics(self, callback):
+        self.subscribers.append(callback)
+
+
+def test_attach_alerts_without_stdout(capsys, tmp_path):
+    cpu = {"cpu": 99.0}
+    printing, quiet, logged = Collector(), Collector(), Collector()
+    attach_alerts(printing)
+    attach_alerts(quiet, stdout=False)
+    attach_alerts(logged, log_path=str(tmp_path / "alerts.log"), stdout=False)
+    for collector in (printing, quiet, logged):
+        collector.subscribers[0](cpu, 0.0)
+        collector.subscribers[0](cpu, 120.0)
+    assert capsys.readouterr().out.count("FIRING") == 1
+    assert "FIRING" in (tmp_path / "alerts.log").read_text()
@@ -0,0 +1,196 @@
+import threading
+import time
+
+from collectors import AdaptiveSampling, Collector, DataCollector, Scheduler, parse_intervals
+
+
+class Counter(Collector):
+    name = "counter"
+
+    def __init__(self, interval, timeout=None):
+        super().__init__(interval, timeout)
+        self.calls = 0
+
+    def collect(self):
+        self.calls += 1
+        return {"value": self.calls}
+
+
+class Hang(Collector):
+    name = "hang"
+
+    def __init__(self, interval, timeout):
+        super().__init__(interval, timeout)
+        self.release = threading.Event()
+
+    def collect(self):
+        self.release.wait()
+        return {}
+
+
+def run_scheduler(*collectors, tick=0.01):
+    results = []
+    scheduler = Scheduler(lambda collector, result: results.append((collector.name, result)), tick=tick)
+    for collector in collectors:
+        scheduler.add(collector)
+    waits = [0]
+    wait = scheduler.wakeup.wait
+
+    def counted(timeout=None):
+        waits[0] += 1
+        return wait(timeout)
+
+    scheduler.wakeup.wait = counted
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    return scheduler, thread, results, waits
+
+
+def test_runs_each_collector_at_its_interval():
+    fast, slow = Counter(0.05), Counter(0.2)
+    scheduler, thread, _, _ = run_scheduler(fast, slow)
+    time.sleep(0.5)
+    scheduler.running = False
+    thread.join(1)
+    assert not thread.is_alive()
+    assert 7 <= fast.calls <= 12
+    assert 2 <= slow.calls <= 4
+
+
+def test_sleeps_until_the_next_due_collector():
+    collector = Counter(0.3)
+    scheduler, thread, _, waits = run_scheduler(collector)
+    time.sleep(1.0)
+    scheduler.running = False
+    thread.join(1)
+    # One wakeup per run (plus the stop), not one per 10ms tick
+    assert collector.calls >= 3
+    assert waits[0] <= collector.calls * 2 + 2
+
+
+def test_expedite_pulls_in_a_shortened_interval():
+    collector = Counter(10)
+    scheduler, thread, _, _ = run_scheduler(collector)
+    time.sleep(0.1)
+    assert collector.calls == 1
+    collector.interval = 0.05
+    scheduler.expedite()
+    time.sleep(0.3)
+    scheduler.running = False
+    thread.join(1)
+    assert collector.calls >= 3
+
+
+def test_hung_collector_times_out_and_misses():
+    hang = Hang(0.05, timeout=0.2)
+    counter = Counter(0.05)
+    scheduler, thread, _, _ = run_scheduler(hang, counter)
+    time.sleep(0.5)
+    assert hang.timed_out
+    assert hang.timeouts == 1
+    assert hang.misses > 0
+    # Other collectors keep running
+    assert counter.calls >= 5
+    hang.release.set()
+    scheduler.running = False
+    thread.join(1)
+
+
+def test_parse_intervals():
+    assert parse_intervals("cpu=0.5, gpu=5") == {"cpu": 0.5, "gpu": 5.0}
+    assert parse_intervals("") == {}
+
+
+class Alerts:
+    def near(self, metric, value, margin):
+        return metric == "ram" and value >= 81
+
+
+def collector(name, interval, boost=True):
+    c = Counter(interval)
+    c.name = name
+    c.boost = boost
+    return c
+
+
+def test_adaptive_base_and_background():
+    policy = AdaptiveSampling()
+    ram, disk = collector("ram", 1), collector("disk_space", 30, boost=False)
+    assert policy.interval(ram, 0) == 1
+    policy.background = True
+    assert policy.interval(ram, 0) == 5.0
+    assert policy.interval(disk, 0) == 120
+
+
+def test_adaptive_boost_on_fast_change_then_decay():
+    policy = AdaptiveSampling(hold=10)
+    net = collector("net_io", 1)
+    policy.observe(net, {"net_down": 1.0}, 0)
+    policy.observe(net, {"net_down": 2.0}, 1)
+    assert policy.interval(net, 1) == 1
+    policy.observe(net, {"net_down": 80.0}, 2)
+    assert policy.interval(net, 2) == 0.25
+    assert policy.interval(net, 11) == 0.25
+    assert policy.interval(net, 12.5) == 1
+    # Nobody is watching: a boost doesn't outrank the background cadence
+    policy.observe(net, {"net_down": 1.0}, 13)
+    policy.background = True
+    assert policy.interval(net, 13) == 5.0
+    policy.background = False
+    assert policy.interval(net, 13) == 0.25
+
+
+def test_adaptive_boost_near_alert_threshold():
+    policy = AdaptiveSampling()
+    policy.alerts = Alerts()
+    ram = collector("ram", 1)
+    policy.observe(ram, {"ram": 50.0}, 0)
+    assert policy.interval(ram, 0) == 1
+    policy.observe(ram, {"ram": 85.0}, 1)
+    assert policy.interval(ram, 1) == 0.25
+    # Staying near the level doesn't renew the boost
+    policy.observe(ram, {"ram": 86.0}, 5)
+    policy.observe(ram, {"ram": 85.0}, 12)
+    assert policy.interval(ram, 12) == 1
+    # Leaving the band and coming back does
+    policy.observe(ram, {"ram": 70.0}, 13)
+    policy.observe(ram, {"ram": 82.0}, 14)
+    assert policy.interval(ram, 14) == 0.25
+
+
+def test_adaptive_never_boosts_expensive_collectors():
+    policy = AdaptiveSampling()
+    processes = collector("processes", 1, boost=False)
+    policy.observe(processes, {"process_cost_ms": 1.0}, 0)
+    policy.observe(processes, {"process_cost_ms": 500.0}, 1)
+    assert policy.interval(processes, 1) == 1
+
+
+def test_adaptive_boost_is_capped_by_base_interval():
+    policy = AdaptiveSampling()
+    gpu, cpu = collector("gpu", 2), collector("cpu", 0.25)
+    policy.observe(gpu, {"gpu": 0.0}, 0)
+    policy.observe(gpu, {"gpu": 90.0}, 0)
+    policy.observe(cpu, {"cpu": 0.0}, 0)
+    policy.observe(cpu, {"cpu": 90.0}, 0)
+    assert policy.interval(gpu, 0) == 0.5
+    assert policy.interval(cpu, 0) == 0.25
+
+
+def test_subscribers_see_generations_in_order():
+    collector = DataCollector(adaptive=False)
+    seen = []
+
+    def subscriber(snapshot):
+        # Widen the window between building a snapshot and publishing it
+        time.sleep(0.001)
+        seen.append(snapshot.generation)
+
+    collector.subscribe(subscriber)
+    counter = Counter(1.0)
+    workers = [threading.Thread(target=lambda: [collector.on_result(counter, {"cpu": 1.0}) for _ in range(20)]) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert seen == list(range(1, 81))
@@ -0,0 +1,95 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from collectors import Snapshot
+from exporter import CONTENT_TYPE, MetricsExporter, render
+
+
+def lines(body):
+    return body.decode().splitlines()
+
+
+def gpu(index, power):
+    return {"index": index, "name": "Test GPU", "load": 50.0, "memoryUsed": 1.0, "memoryTotal": 2.0, "temperature": 60.0, "power": power, "processes": ()}
+
+
+def test_one_metadata_block_per_family():
+    text = lines(render(Snapshot(per_cpu=(10.0, 20.0, 30.0))))
+    assert text.count("# TYPE sysmon_cpu_core_usage_percent gauge") == 1
+    assert text.count("# UNIT sysmon_cpu_core_usage_percent percent") == 1
+    assert text.count("# HELP sysmon_cpu_core_usage_percent CPU utilisation of one logical core.") == 1
+    start = text.index("# TYPE sysmon_cpu_core_usage_percent gauge")
+    assert text[start + 3:start + 6] == [
+        'sysmon_cpu_core_usage_percent{core="0"} 10.0',
+        'sysmon_cpu_core_usage_percent{core="1"} 20.0',
+        'sysmon_cpu_core_usage_percent{core="2"} 30.0',
+    ]
+    # Families without a unit have no UNIT line
+    assert not any(line.startswith("# UNIT sysmon_processes ") for line in text)
+    assert text[-1] == "# EOF"
+
+
+def test_labels_are_escaped():
+    name = 'a "b" \\c\nd'
+    text = lines(render(Snapshot(processes=({"pid": 1, "name": name, "cpu": 1.0, "rss": 2, "io": 3.0},))))
+    assert 'sysmon_process_cpu_usage_percent{pid="1",name="a \\"b\\" \\\\c\\nd"} 1.0' in text
+
+
+def test_missing_values_are_skipped():
+    text = lines(render(Snapshot(gpus=(gpu(0, None), gpu(1, 75.0)))))
+    # The family is still described, but only the GPU with a reading has a sample
+    assert "# TYPE sysmon_gpu_power_watts gauge" in text
+    assert [line for line in text if line.startswith("sysmon_gpu_power_watts")] == ['sysmon_gpu_power_watts{gpu="1",name="Test GPU"} 75.0']
+
+
+def test_collector_status():
+    status = {"cpu": {"stale": True, "interval": 0.25, "last_ms": 1.5, "p50_ms": 1.0, "p99_ms": 2.0}}
+    text = lines(render(Snapshot(), status))
+    assert 'sysmon_collector_stale{collector="cpu"} 1.0' in text
+    assert 'sysmon_collector_interval_seconds{collector="cpu"} 0.25' in text
+
+
+class Collector:
+    def __init__(self):
+        self.snapshot = Snapshot(cpu=1.0)
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def collector_status(self):
+        return {}
+
+
+@pytest.fixture
+def exporter():
+    collector = Collector()
+    exporter = MetricsExporter(collector, 0, host="127.0.0.1")
+    exporter.start()
+    yield collector, exporter, f"http://127.0.0.1:{exporter.server.server_address[1]}"
+    exporter.close()
+
+
+def test_serves_cached_body(exporter):
+    collector, exporter, url = exporter
+    with urllib.request.urlopen(url + "/metrics") as response:
+        assert response.headers["Content-Type"] == CONTENT_TYPE
+        assert response.read() == exporter.body
+    assert "sysmon_cpu_usage_percent 1.0" in lines(exporter.body)
+
+    # Each new generation is encoded once by the subscriber; older ones are ignored
+    (publish,) = collector.subscribers
+    publish(collector.snapshot.replace(cpu=42.0))
+    with urllib.request.urlopen(url + "/metrics?x=1") as response:
+        assert "sysmon_cpu_usage_percent 42.0" in lines(response.read())
+    publish(collector.snapshot)
+    assert "sysmon_cpu_usage_percent 42.0" in lines(exporter.body)
+
+
+def test_other_paths_are_not_found(exporter):
+    _, _, url = exporter
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(url + "/")
+    assert error.value.code == 404
@@ -0,0 +1,217 @@
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from collectors import Snapshot
+from fleet import (DELTA, FIELD_INDEX, FIELDS, HELLO, HELLO_HEADER, KEYFRAME, LENGTH, MAGIC, SAMPLE_HEADER, VERSION,
+                   FleetAgent, FleetAggregator, FrameDecoder, FrameEncoder, parse_address)
+
+
+class FakeCollector:
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def publish(self, snapshot):
+        self.snapshot = snapshot
+        for callback in self.subscribers:
+            callback(snapshot)
+
+
+def snapshot(cpu, ram=50.0, process_count=100):
+    return Snapshot(cpu=cpu, ram={"percent": ram, "used": 0, "total": 0}, process_count=process_count)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError("timed out")
+
+
+def read_frame(sock):
+    header = recv_exactly(sock, LENGTH.size)
+    (length,) = LENGTH.unpack(header)
+    return header + recv_exactly(sock, length)
+
+
+def recv_exactly(sock, n):
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+def tcp_agent(collector, name):
+    agent = FleetAgent(collector, "127.0.0.1:0", name, interval=0)
+    return agent, f"127.0.0.1:{agent.server.getsockname()[1]}"
+
+
+@pytest.fixture
+def agents(tmp_path):
+    started = []
+
+    def start(address=None, name="host", cpu=10.0):
+        collector = FakeCollector(snapshot(cpu))
+        if address is None:
+            agent, address = tcp_agent(collector, name)
+        else:
+            agent = FleetAgent(collector, address, name, interval=0)
+        started.append(agent)
+        return collector, agent, address
+
+    yield start
+    for agent in started:
+        agent.close()
+
+
+def test_parse_address():
+    assert parse_address("unix:/tmp/a.sock") == (socket.AF_UNIX, "/tmp/a.sock")
+    assert parse_address("10.0.0.1:7101") == (socket.AF_INET, ("10.0.0.1", 7101))
+    assert parse_address("[::1]:7101") == (socket.AF_INET6, ("::1", 7101))
+
+
+def test_encoder_sends_only_changed_fields():
+    encoder = FrameEncoder()
+    values = np.arange(len(FIELDS), dtype=np.float32)
+    values[2] = np.nan
+    keyframe = encoder.sample(1.0, values)
+    assert keyframe[LENGTH.size] == KEYFRAME
+    assert len(keyframe) == LENGTH.size + SAMPLE_HEADER.size + 4 * len(FIELDS)
+
+    # NaN compares equal to NaN here, so an idle host sends an empty delta
+    idle = encoder.sample(2.0, values.copy())
+    assert idle[LENGTH.size] == DELTA
+    assert len(idle) == 17
+
+    changed = values.copy()
+    changed[0] = 99
+    delta = encoder.sample(3.0, changed)
+    _, timestamp, mask = SAMPLE_HEADER.unpack_from(delta, LENGTH.size)
+    assert (timestamp, mask) == (3.0, 1)
+    assert len(delta) == 17 + 4
+
+
+def test_decoder_maps_fields_by_name():
+    # An agent with a different field order and a field this viewer lacks
+    names = ["ram", "temperature", "cpu"]
+    hello = HELLO_HEADER.pack(HELLO, MAGIC, VERSION, 4) + b"peer" + "\n".join(names).encode()
+    sample = SAMPLE_HEADER.pack(KEYFRAME, 5.0, 0b111) + np.array([40, 70, 12], dtype=">f4").tobytes()
+    decoder = FrameDecoder()
+    assert decoder.decode(hello) is None
+    assert decoder.name == "peer"
+    assert decoder.decode(sample) == 5.0
+    assert decoder.values[FIELD_INDEX["cpu"]] == 12
+    assert decoder.values[FIELD_INDEX["ram"]] == 40
+    assert np.isnan(decoder.values[FIELD_INDEX["gpu"]])
+
+    # A delta touching only "cpu" (bit 2) leaves the rest alone
+    decoder.decode(SAMPLE_HEADER.pack(DELTA, 6.0, 0b100) + np.array([15], dtype=">f4").tobytes())
+    assert decoder.values[FIELD_INDEX["cpu"]] == 15
+    assert decoder.values[FIELD_INDEX["ram"]] == 40
+
+
+def test_decoder_rejects_bad_streams():
+    with pytest.raises(ValueError):
+        FrameDecoder().decode(HELLO_HEADER.pack(HELLO, b"NOPE", VERSION, 0))
+    with pytest.raises(ValueError):
+        FrameDecoder().decode(SAMPLE_HEADER.pack(KEYFRAME, 0.0, 0))
+    decoder = FrameDecoder()
+    decoder.decode(FrameEncoder().hello("a")[LENGTH.size:])
+    with pytest.raises(ValueError):
+        decoder.decode(SAMPLE_HEADER.pack(DELTA, 0.0, 0))
+
+
+def test_agent_stream_is_hello_keyframe_then_deltas(agents):
+    collector, agent, address = agents(name="build-1")
+    with socket.create_connection(parse_address(address)[1], timeout=5) as sock:
+        hello = read_frame(sock)
+        assert hello[LENGTH.size] == HELLO
+        decoder = FrameDecoder()
+        decoder.decode(hello[LENGTH.size:])
+        assert decoder.name == "build-1"
+
+        keyframe = read_frame(sock)
+        assert keyframe[LENGTH.size] == KEYFRAME
+        assert len(keyframe) == 49
+        decoder.decode(keyframe[LENGTH.size:])
+        assert decoder.values[FIELD_INDEX["cpu"]] == 10
+
+        wait_for(lambda: agent.clients)
+        collector.publish(snapshot(20.0))
+        delta = read_frame(sock)
+        assert delta[LENGTH.size] == DELTA
+        assert len(delta) == 21
+        decoder.decode(delta[LENGTH.size:])
+        assert decoder.values[FIELD_INDEX["cpu"]] == 20
+
+        collector.publish(snapshot(20.0))
+        idle = read_frame(sock)
+        assert idle[LENGTH.size] == DELTA
+        assert len(idle) == 17
+
+
+def test_aggregator_follows_tcp_and_unix_agents(agents, tmp_path):
+    first, _, first_address = agents(name="build-1", cpu=10.0)
+    second, _, second_address = agents(name="build-2", cpu=20.0)
+    third, _, third_address = agents(f"unix:{tmp_path / 'agent.sock'}", name="build-3", cpu=30.0)
+    aggregator = FleetAggregator([first_address, second_address, third_address], retry=0.1, stall=5)
+    aggregator.start()
+    try:
+        wait_for(lambda: all(host.connected and host.last_seen for host in aggregator.hosts))
+        assert [host.name for host in aggregator.hosts] == ["build-1", "build-2", "build-3"]
+        assert [float(host.values[FIELD_INDEX["cpu"]]) for host in aggregator.hosts] == [10, 20, 30]
+
+        generation = aggregator.generation
+        second.publish(snapshot(55.0, ram=60.0))
+        host = aggregator.hosts[1]
+        wait_for(lambda: host.values[FIELD_INDEX["cpu"]] == 55)
+        assert host.values[FIELD_INDEX["ram"]] == 60
+        assert aggregator.generation > generation
+        series = host.series()
+        assert series[FIELD_INDEX["cpu"], -1] == 55
+        assert series[FIELD_INDEX["cpu"], -2] == 20
+    finally:
+        aggregator.close()
+
+
+def test_aggregator_reconnects_after_drop(agents):
+    collector, agent, address = agents(name="build-1")
+    aggregator = FleetAggregator([address], retry=0.1, stall=5)
+    aggregator.start()
+    try:
+        host = aggregator.hosts[0]
+        wait_for(lambda: host.connected and agent.clients)
+        for client, _ in agent.clients:
+            client.shutdown(socket.SHUT_RDWR)
+        wait_for(lambda: not host.connected)
+        assert host.error
+        wait_for(lambda: host.connected and agent.clients)
+        collector.publish(snapshot(77.0))
+        wait_for(lambda: host.values[FIELD_INDEX["cpu"]] == 77)
+    finally:
+        aggregator.close()
+
+
+def test_unreachable_agent_is_reported(agents):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    aggregator = FleetAggregator([f"127.0.0.1:{port}"], retry=0.1, stall=1)
+    aggregator.start()
+    try:
+        host = aggregator.hosts[0]
+        wait_for(lambda: host.error is not None)
+        assert not host.connected
+    finally:
+        aggregator.close()
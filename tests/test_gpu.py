@@ -0,0 +1,94 @@
+import pytest
+
+import gpu
+from collectors import GpuCollector
+from gpu import FakeNvml, GPUtilBackend, NoGpuBackend, NvmlBackend, select_backend
+
+
+def collector(readings=None):
+    return GpuCollector(2, backend=NvmlBackend(FakeNvml(readings)))
+
+
+def test_aggregates_every_gpu():
+    result = collector().collect()
+    gpus = result["gpus"]
+    assert [g["name"] for g in gpus] == ["Fake GPU 0", "Fake GPU 1"]
+    assert [g["index"] for g in gpus] == [0, 1]
+    summary = result["gpu"]
+    assert summary["found"]
+    assert summary["load"] == pytest.approx((12 + 0) / 2)
+    assert summary["memoryUsed"] == pytest.approx(2048 + 256)
+    assert summary["memoryTotal"] == pytest.approx(8192 + 16384)
+    assert summary["temperature"] == 45
+
+
+def test_readings_advance_per_collect():
+    c = collector()
+    c.collect()
+    result = c.collect()
+    assert [g["load"] for g in result["gpus"]] == [55, 40]
+    assert result["gpu"]["temperature"] == 58
+
+
+def test_power_is_none_when_unsupported():
+    gpus = collector().collect()["gpus"]
+    assert gpus[0]["power"] == pytest.approx(60.5)
+    assert gpus[1]["power"] is None
+
+
+def test_processes_sorted_by_memory():
+    readings = {"GPU": [(50, 4096, 8192, 50, 100.0, {10: 256, 20: 2048, 30: 1024})]}
+    processes = collector(readings).collect()["gpus"][0]["processes"]
+    assert [p["pid"] for p in processes] == [20, 30, 10]
+    assert [p["memoryUsed"] for p in processes] == [2048, 1024, 256]
+
+
+def test_compute_and_graphics_memory_is_summed():
+    class BothNvml(FakeNvml):
+        def nvmlDeviceGetGraphicsRunningProcesses(self, device):
+            return self.nvmlDeviceGetComputeRunningProcesses(device)
+
+    backend = NvmlBackend(BothNvml({"GPU": [(1, 1024, 8192, 40, None, {7: 512})]}))
+    assert backend.devices()[0]["processes"] == ({"pid": 7, "memoryUsed": 1024},)
+
+
+def test_unreadable_fields_fall_back():
+    class BrokenNvml(FakeNvml):
+        def nvmlDeviceGetMemoryInfo(self, device):
+            raise self.NVMLError("Not Supported")
+
+    device = NvmlBackend(BrokenNvml()).devices()[0]
+    assert device["load"] == 12
+    assert device["memoryUsed"] == 0
+    assert device["memoryTotal"] == 0
+
+
+def test_no_gpus():
+    result = GpuCollector(2, backend=NoGpuBackend()).collect()
+    assert result["gpus"] == ()
+    assert not result["gpu"]["found"]
+
+
+def test_select_fake_backend():
+    backend = select_backend("fake")
+    assert isinstance(backend, NvmlBackend)
+    assert len(backend.devices()) == 2
+
+
+def test_select_backend_without_nvml_or_nvidia_smi(monkeypatch):
+    def missing(nvml=None):
+        raise ImportError("No module named 'pynvml'")
+
+    monkeypatch.setattr(NvmlBackend, "__init__", missing)
+    monkeypatch.setattr(gpu.shutil, "which", lambda name: None)
+    assert isinstance(select_backend(None), NoGpuBackend)
+
+
+def test_select_backend_falls_back_to_gputil_with_nvidia_smi(monkeypatch):
+    def missing(nvml=None):
+        raise ImportError("No module named 'pynvml'")
+
+    monkeypatch.setattr(NvmlBackend, "__init__", missing)
+    monkeypatch.setattr(gpu.shutil, "which", lambda name: "/usr/bin/nvidia-smi")
+    monkeypatch.setattr(GPUtilBackend, "__init__", lambda self: None)
+    assert isinstance(select_backend(None), GPUtilBackend)
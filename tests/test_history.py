@@ -0,0 +1,144 @@
+import math
+
+import numpy as np
+
+from history import MATRIX_CAPACITY, HistoryStore, Level, RingBuffer, RingMatrix, RunningExtrema
+
+
+def test_ring_buffer_latest_is_contiguous_and_ordered():
+    ring = RingBuffer(4)
+    for value in range(6):
+        ring.append(value)
+    assert ring.count == 4
+    latest = ring.latest(4)
+    assert latest.tolist() == [2, 3, 4, 5]
+    # A view into the mirrored storage, not a copy
+    assert latest.base is ring.data
+    assert ring.latest(2).tolist() == [4, 5]
+    assert ring.latest(10).tolist() == [2, 3, 4, 5]
+
+
+def test_ring_buffer_starts_as_nan():
+    ring = RingBuffer(3)
+    ring.append(1)
+    latest = ring.latest(3)
+    assert np.isnan(latest[:2]).all()
+    assert latest[2] == 1
+
+
+def test_ring_buffer_replace_last_updates_both_copies():
+    ring = RingBuffer(3)
+    for value in (1, 2, 3, 4):
+        ring.append(value)
+    ring.replace_last(9)
+    assert ring.latest(3).tolist() == [2, 3, 9]
+    ring.append(5)
+    assert ring.latest(3).tolist() == [3, 9, 5]
+
+
+def test_ring_matrix_columns():
+    matrix = RingMatrix(2, 3)
+    for i in range(4):
+        matrix.append((i, i * 10))
+    latest = matrix.latest(3)
+    assert latest.shape == (2, 3)
+    assert latest.tolist() == [[1, 2, 3], [10, 20, 30]]
+
+
+def test_running_extrema_expires_peaks_from_window():
+    extrema = RunningExtrema(3)
+    extrema.push(5, 100)
+    extrema.push(1, 10)
+    extrema.push(2, 20)
+    assert (extrema.min, extrema.max) == (1, 100)
+    # The 100 peak falls out of the 3-bucket window
+    extrema.push(3, 30)
+    assert (extrema.min, extrema.max) == (1, 30)
+    extrema.push(4, 5)
+    extrema.push(6, 6)
+    assert (extrema.min, extrema.max) == (3, 30)
+    extrema.push(7, 7)
+    assert (extrema.min, extrema.max) == (4, 7)
+
+
+def test_running_extrema_revise_newest_bucket():
+    extrema = RunningExtrema(3)
+    extrema.push(10, 20)
+    extrema.push(15, 15)
+    extrema.revise(5, 40)
+    assert (extrema.min, extrema.max) == (5, 40)
+
+
+def test_running_extrema_ignores_nan():
+    extrema = RunningExtrema(2)
+    assert math.isnan(extrema.max)
+    extrema.push(float("nan"), float("nan"))
+    assert math.isnan(extrema.min)
+    extrema.push(3, 4)
+    assert (extrema.min, extrema.max) == (3, 4)
+
+
+def test_level_folds_samples_in_one_bucket():
+    level = Level(10, 8, 4)
+    level.add(10, 100.0)
+    level.add(30, 105.0)
+    level.add(20, 109.9)
+    assert level.min.latest(1)[0] == 10
+    assert level.avg.latest(1)[0] == 20
+    assert level.max.latest(1)[0] == 30
+    assert level.min.count == 1
+    assert level.bounds.tolist() == [10, 30]
+
+
+def test_level_clock_stepping_back_folds_into_open_bucket():
+    level = Level(1, 8, 4)
+    level.add(1, 100.0)
+    level.add(2, 101.0)
+    level.add(50, 50.0)
+    assert level.avg.count == 2
+    assert level.max.latest(1)[0] == 50
+
+
+def test_level_pads_gaps_with_nan():
+    level = Level(1, 8, 8)
+    level.add(1, 100.0)
+    level.add(2, 103.0)
+    assert level.avg.latest(4)[0] == 1
+    assert np.isnan(level.avg.latest(4)[1:3]).all()
+    assert level.avg.latest(4)[3] == 2
+
+
+def test_level_gap_longer_than_capacity():
+    level = Level(1, 4, 4)
+    level.add(1, 100.0)
+    level.add(2, 10000.0)
+    latest = level.avg.latest(4)
+    assert np.isnan(latest[:3]).all()
+    assert latest[3] == 2
+    # The old value's extreme left the window with it
+    assert level.bounds.tolist() == [2, 2]
+
+
+def test_store_view_and_extrema():
+    store = HistoryStore(levels=((1, 10, 3), (10, 10, 3)))
+    for i, value in enumerate((5, 50, 7, 8)):
+        store.record({"cpu": value}, timestamp=1000.0 + i)
+    assert store.points("1m") == 3
+    low, avg, high = store.view("cpu")
+    assert avg.tolist() == [50, 7, 8]
+    # The 5 at t=1000 has left the 3-bucket window; the 50 hasn't
+    assert store.extrema("cpu") == (7, 50)
+    assert store.extrema("cpu", "1h") == (5, 50)
+
+
+def test_store_skips_none_and_records_matrices():
+    store = HistoryStore()
+    store.record({"gpu": None, "per_cpu": (1.0, 2.0)})
+    assert "gpu" not in store.series
+    matrix = store.matrix("per_cpu")
+    assert matrix.shape == (2, MATRIX_CAPACITY)
+    assert matrix[:, -1].tolist() == [1, 2]
+    # A changed row count (CPU hotplug) starts a new matrix
+    store.record({"per_cpu": (1.0, 2.0, 3.0)})
+    assert store.matrix("per_cpu").shape == (3, MATRIX_CAPACITY)
+    assert store.matrix("missing") is None
@@ -0,0 +1,60 @@
+from collections import namedtuple
+
+from iostats import WRAP, CounterDeltas
+
+Counters = namedtuple("Counters", "rx tx")
+
+
+def test_first_update_has_no_activity():
+    deltas = CounterDeltas(("rx", "tx"))
+    names, delta, seconds = deltas.update({"eth0": Counters(100, 50)}, 10.0)
+    assert names == ("eth0",)
+    assert delta.tolist() == [[0, 0]]
+    assert seconds == 1
+
+
+def test_delta_and_elapsed_time():
+    deltas = CounterDeltas(("rx", "tx"))
+    deltas.update({"eth0": Counters(100, 50)}, 10.0)
+    names, delta, seconds = deltas.update({"eth0": Counters(400, 80)}, 12.0)
+    assert delta.tolist() == [[300, 30]]
+    assert seconds == 2.0
+
+
+def test_32_bit_counter_wrap():
+    deltas = CounterDeltas(("rx", "tx"))
+    deltas.update({"eth0": Counters(WRAP - 100, 0)}, 0.0)
+    _, delta, _ = deltas.update({"eth0": Counters(50, 0)}, 1.0)
+    assert delta.tolist() == [[150, 0]]
+
+
+def test_reset_counts_as_no_activity():
+    deltas = CounterDeltas(("rx", "tx"))
+    # Low 32-bit value going backwards, and a 64-bit counter going backwards
+    deltas.update({"eth0": Counters(1000, WRAP * 4)}, 0.0)
+    _, delta, _ = deltas.update({"eth0": Counters(10, 5)}, 1.0)
+    assert delta.tolist() == [[0, 0]]
+
+
+def test_devices_matched_by_name():
+    deltas = CounterDeltas(("rx", "tx"))
+    deltas.update({"eth0": Counters(100, 0), "eth1": Counters(1000, 0)}, 0.0)
+    # eth1 moved, eth0 went away and wlan0 appeared
+    names, delta, _ = deltas.update({"wlan0": Counters(5000, 0), "eth1": Counters(1500, 0)}, 1.0)
+    assert names == ("wlan0", "eth1")
+    assert delta.tolist() == [[0, 0], [500, 0]]
+
+
+def test_missing_fields_read_as_zero():
+    Partial = namedtuple("Partial", "rx")
+    deltas = CounterDeltas(("rx", "tx"))
+    deltas.update({"sda": Partial(10)}, 0.0)
+    _, delta, _ = deltas.update({"sda": Partial(30)}, 1.0)
+    assert delta.tolist() == [[20, 0]]
+
+
+def test_no_devices():
+    deltas = CounterDeltas(("rx", "tx"))
+    names, delta, _ = deltas.update({}, 0.0)
+    assert names == ()
+    assert delta.shape == (0, 2)
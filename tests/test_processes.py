@@ -0,0 +1,154 @@
+import pytest
+
+import processes
+from processes import ProcessTable
+
+pytestmark = pytest.mark.skipif(not processes.LINUX, reason="reads a /proc layout")
+
+
+class FakeProc:
+    # A /proc directory with canned stat (and optionally io) files
+    def __init__(self, root):
+        self.root = root
+
+    def write(self, pid, comm, utime=0, stime=0, start=1000, rss=0, io=None):
+        directory = self.root / str(pid)
+        directory.mkdir(exist_ok=True)
+        # Fields 3..24 of /proc/<pid>/stat after "pid (comm) "; utime,
+        # stime, starttime and rss are fields 14, 15, 22 and 24
+        fields = ["S"] + ["0"] * 21
+        fields[11], fields[12], fields[19], fields[21] = str(utime), str(stime), str(start), str(rss)
+        (directory / "stat").write_bytes(f"{pid} ({comm}) {' '.join(fields)} 0 0 0\n".encode())
+        if io is not None:
+            (directory / "io").write_bytes(f"rchar: 1\nread_bytes: {io[0]}\nwrite_bytes: {io[1]}\n".encode())
+
+    def remove(self, pid):
+        for path in (self.root / str(pid)).iterdir():
+            path.unlink()
+        (self.root / str(pid)).rmdir()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(processes, "PROC", str(tmp_path))
+    (tmp_path / "self").mkdir()
+    return FakeProc(tmp_path)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(processes.time, "monotonic", clock)
+    return clock
+
+
+def entry(table, pid):
+    return table.by_pid[pid]
+
+
+def test_parses_stat_fields(proc, clock):
+    proc.write(1, "init", utime=5, stime=3, start=42, rss=10)
+    table = ProcessTable(cpu_count=1)
+    table.update()
+    e = entry(table, 1)
+    assert e.name == "init"
+    assert e.create_time == 42
+    assert e.cpu_time == 8
+    assert e.rss == 10 * processes.PAGE_SIZE
+    assert len(table) == 1
+
+
+def test_comm_with_spaces_and_parens(proc, clock):
+    proc.write(7, "evil) (name x", utime=1, start=50, rss=3)
+    table = ProcessTable(cpu_count=1)
+    table.update()
+    e = entry(table, 7)
+    assert e.name == "evil) (name x"
+    assert e.create_time == 50
+    assert e.rss == 3 * processes.PAGE_SIZE
+
+
+def test_cpu_percent_from_tick_deltas(proc, clock):
+    ticks = processes.CLOCK_TICKS
+    proc.write(1, "busy", utime=0, start=1)
+    table = ProcessTable(cpu_count=2)
+    table.update()
+    # Half a second of CPU in one second of wall time, on two cores
+    proc.write(1, "busy", utime=ticks // 2, start=1)
+    clock.now += 1.0
+    table.update()
+    assert entry(table, 1).cpu == pytest.approx(25.0)
+
+
+def test_pid_reuse_is_a_new_process(proc, clock):
+    proc.write(5, "old", utime=1000, start=10)
+    table = ProcessTable(cpu_count=1)
+    table.update()
+    old = entry(table, 5)
+    proc.write(5, "new", utime=1, start=20)
+    clock.now += 1.0
+    table.update()
+    new = entry(table, 5)
+    assert new is not old
+    assert new.name == "new"
+    assert (5, 10) not in table.entries
+    assert (5, 20) in table.entries
+    assert (table.births, table.deaths) == (1, 1)
+    # A new process starts at 0% instead of a negative delta
+    assert new.cpu == 0.0
+
+
+def test_exited_processes_are_dropped(proc, clock):
+    proc.write(1, "a", start=1)
+    proc.write(2, "b", start=2)
+    table = ProcessTable(cpu_count=1)
+    table.update()
+    proc.remove(2)
+    table.update()
+    assert list(table.by_pid) == [1]
+    assert table.deaths == 1
+
+
+def test_top_orders_by_sort_key(proc, clock):
+    ticks = processes.CLOCK_TICKS
+    for pid, rss in ((1, 30), (2, 10), (3, 20)):
+        proc.write(pid, f"p{pid}", start=pid, rss=rss)
+    table = ProcessTable(cpu_count=1)
+    table.update()
+    for pid, utime in ((1, 0), (2, ticks), (3, ticks // 2)):
+        proc.write(pid, f"p{pid}", utime=utime, start=pid, rss=(30, 10, 20)[pid - 1])
+    clock.now += 1.0
+    table.update()
+    assert [p["pid"] for p in table.top(3, "cpu")] == [2, 3, 1]
+    assert [p["pid"] for p in table.top(2, "memory")] == [1, 3]
+
+
+def test_io_rates_when_sorting_by_io(proc, clock):
+    proc.write(1, "reader", start=1, io=(0, 0))
+    proc.write(2, "idle", start=2, io=(0, 0))
+    table = ProcessTable(cpu_count=1)
+    table.update(with_io=True)
+    proc.write(1, "reader", start=1, io=(3000, 1000))
+    clock.now += 2.0
+    table.update(with_io=True)
+    top = table.top(2, "io")
+    assert [p["pid"] for p in top] == [1, 2]
+    assert top[0]["io"] == pytest.approx(2000.0)
+
+
+def test_table_has_every_process(proc, clock):
+    for pid in (1, 2, 3):
+        proc.write(pid, f"p{pid}", start=pid, rss=pid)
+    table = ProcessTable(cpu_count=1)
+    table.update()
+    rows = table.table()
+    assert sorted(rows["pid"].tolist()) == [1, 2, 3]
+    assert sorted(rows["name"].tolist()) == ["p1", "p2", "p3"]
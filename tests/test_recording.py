@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from recording import RecordingFile
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "rec.bin")
+
+
+def test_append_and_range(path):
+    f = RecordingFile(path, ("cpu", "ram"), capacity=8, writable=True)
+    for i in range(5):
+        f.append({"cpu": i, "ram": i * 10}, 100.0 + i)
+    timestamps, values = f.range(101, 104)
+    assert timestamps.tolist() == [101, 102, 103]
+    assert values["cpu"].tolist() == [1, 2, 3]
+    assert values["ram"].tolist() == [10, 20, 30]
+    timestamps, _ = f.range()
+    assert len(timestamps) == 5
+    f.close()
+
+
+def test_missing_value_is_nan(path):
+    f = RecordingFile(path, ("cpu", "ram"), capacity=4, writable=True)
+    f.append({"cpu": 1.0}, 1.0)
+    _, values = f.range()
+    assert values["cpu"][0] == 1.0
+    assert np.isnan(values["ram"][0])
+    f.close()
+
+
+def test_timestamps_stay_sorted_when_clock_steps_back(path):
+    f = RecordingFile(path, ("cpu",), capacity=4, writable=True)
+    f.append({"cpu": 1}, 10.0)
+    f.append({"cpu": 2}, 5.0)
+    timestamps, _ = f.range()
+    assert timestamps.tolist() == [10.0, 10.0]
+    f.close()
+
+
+def test_grow_doubles_capacity_and_keeps_rows(path):
+    f = RecordingFile(path, ("cpu",), capacity=4, writable=True)
+    for i in range(9):
+        f.append({"cpu": i}, float(i))
+    assert f.capacity == 16
+    assert len(f) == 9
+    timestamps, values = f.range()
+    assert timestamps.tolist() == list(range(9))
+    assert values["cpu"].tolist() == list(range(9))
+    f.close()
+
+    reopened = RecordingFile(path)
+    assert reopened.capacity == 16
+    assert reopened.range(3, 6)[1]["cpu"].tolist() == [3, 4, 5]
+    reopened.close()
+
+
+def test_reader_follows_grow(path):
+    writer = RecordingFile(path, ("cpu",), capacity=2, writable=True)
+    writer.append({"cpu": 0}, 0.0)
+    reader = RecordingFile(path)
+    assert len(reader.range()[0]) == 1
+    for i in range(1, 4):
+        writer.append({"cpu": i}, float(i))
+    # The reader maps the old file until range() notices the rename
+    timestamps, values = reader.range()
+    assert reader.capacity == 4
+    assert timestamps.tolist() == [0, 1, 2, 3]
+    assert values["cpu"].tolist() == [0, 1, 2, 3]
+    writer.close()
+    reader.close()
+
+
+def test_rejects_other_files(path):
+    with open(path, "wb") as f:
+        f.write(b"\0" * 4096)
+    with pytest.raises(ValueError):
+        RecordingFile(path)
@@ -0,0 +1,122 @@
+import os
+import time
+from multiprocessing import resource_tracker
+
+import numpy as np
+import pytest
+
+from alerts import AlertEngine, Threshold
+from collectors import Snapshot
+from history import MATRIX_CAPACITY
+from shared_snapshot import SharedSnapshotClient, SharedSnapshotWriter
+
+
+@pytest.fixture
+def segment(request):
+    writer = SharedSnapshotWriter(f"sysmon-test-{os.getpid()}-{request.node.name}"[:30], cores=4)
+    client = SharedSnapshotClient(writer.shm.name)
+    # The client unregistered the segment from this process's tracker; the
+    # writer still owns it and unlinks it on close
+    resource_tracker.register(writer.shm._name, "shared_memory")
+    yield writer, client
+    writer.close()
+
+
+def test_snapshot_round_trip(segment):
+    writer, client = segment
+    writer.publish(Snapshot(cpu=12.5, per_cpu=(10.0, 20.0, 5.0, 15.0), ram={"percent": 40.0, "used": 4, "total": 10}), {})
+    snapshot = client.snapshot
+    assert snapshot.generation == 1
+    assert snapshot.cpu == 12.5
+    assert snapshot.per_cpu == (10.0, 20.0, 5.0, 15.0)
+    assert snapshot.ram == {"percent": 40.0, "used": 4, "total": 10}
+    # Unchanged segment: the cached snapshot comes back
+    assert client.snapshot is snapshot
+
+
+def test_per_core_history_is_shared(segment):
+    writer, client = segment
+    writer.history.record({"per_cpu": (1.0, 2.0, 3.0, 4.0)})
+    writer.history.record({"per_cpu": (5.0, 6.0, 7.0, 8.0)})
+    matrix = client.history.matrix("per_cpu")
+    assert matrix.shape == (4, MATRIX_CAPACITY)
+    np.testing.assert_array_equal(matrix[:, -2:], [[1, 5], [2, 6], [3, 7], [4, 8]])
+    assert np.isnan(matrix[:, 0]).all()
+
+
+def test_series_history_is_shared(segment):
+    writer, client = segment
+    writer.history.record({"cpu": 42.0}, timestamp=1000.5)
+    assert client.history.view("cpu")[1][-1] == 42.0
+
+
+def test_device_rows_round_trip(segment):
+    writer, client = segment
+    disks = ({"device": "/dev/sda1", "mountpoint": "/", "used": 30, "total": 100, "stale": False},
+             {"device": "nas:/export", "mountpoint": "/mnt/nas", "used": 1, "total": 2, "stale": True})
+    devices = ({"name": "sda", "read": 1.5, "write": 2.5, "read_iops": 10.0, "write_iops": 20.0, "await_ms": 0.5, "util": 12.0, "partition": False},
+               {"name": "sda1", "read": 1.5, "write": 2.5, "read_iops": 10.0, "write_iops": 20.0, "await_ms": 0.5, "util": 12.0, "partition": True})
+    interfaces = ({"name": "eth0", "sent": 100.0, "recv": 200.0, "packets_sent": 1.0, "packets_recv": 2.0, "errors": 0.0, "drops": 3.0},)
+    writer.publish(Snapshot(disks=disks, disk_devices=devices, net_interfaces=interfaces), {})
+    snapshot = client.snapshot
+    assert snapshot.disks == disks
+    assert snapshot.disk_devices == devices
+    assert snapshot.net_interfaces == interfaces
+
+
+def test_active_alerts_are_published(segment):
+    writer, client = segment
+    engine = AlertEngine([Threshold("High CPU", "cpu", above=90, clear=80, severity="critical")])
+    writer.publish(Snapshot(), {}, engine)
+    assert client.alerts.firing() == []
+    generation = client.alerts.generation
+
+    engine.evaluate({"cpu": 95.0}, 100.0)
+    writer.publish(Snapshot(), {}, engine)
+    assert client.alerts.generation != generation
+    (alert,) = client.alerts.firing()
+    assert alert.rule.name == "High CPU"
+    assert alert.rule.severity == "critical"
+    assert alert.metric == "cpu"
+    assert alert.value == 95.0
+    assert alert.since == 100.0
+    assert alert.message == "High CPU: cpu = 95.00"
+
+    engine.evaluate({"cpu": 50.0}, 101.0)
+    writer.publish(Snapshot(), {}, engine)
+    assert client.alerts.firing() == []
+
+
+def status(interval, *names):
+    return {name: {"interval": interval, "base_interval": interval, "last_ms": 1.0, "runs": 1, "misses": 0, "timeouts": 0,
+                   "errors": 0, "stale": False, "p50_ms": 1.0, "p99_ms": 1.0} for name in names}
+
+
+def test_write_that_never_finishes(segment):
+    writer, client = segment
+    engine = AlertEngine([Threshold("High CPU", "cpu", above=90, clear=80)])
+    engine.evaluate({"cpu": 95.0}, 100.0)
+    writer.publish(Snapshot(cpu=12.5), status(1.0, "cpu"), engine)
+    snapshot = client.snapshot
+    assert not any(s["stale"] for s in client.collector_status().values())
+    generation = client.alerts.generation
+    (alert,) = client.alerts.firing()
+
+    # The daemon died between the two seq increments of a publish
+    writer.header["seq"] += 1
+    assert client.read() == (None, None)
+    assert client.snapshot is snapshot
+    assert all(s["stale"] for s in client.collector_status().values())
+    assert client.alerts.generation == generation
+    assert client.alerts.firing()[0].rule.name == alert.rule.name
+
+
+def test_silent_daemon_is_stale(segment, monkeypatch):
+    writer, client = segment
+    writer.publish(Snapshot(), status(2.0, "cpu", "ram"))
+    assert not any(s["stale"] for s in client.collector_status().values())
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 5.5)
+    assert not any(s["stale"] for s in client.collector_status().values())
+    monkeypatch.setattr(time, "time", lambda: now + 6.5)
+    assert all(s["stale"] for s in client.collector_status().values())
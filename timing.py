@@ -0,0 +1,91 @@
+import math
+import threading
+import time
+
+# Histogram range in milliseconds: 1 µs up to ~100 s, four buckets per
+# doubling (each bucket spans ~19%)
+MIN_MS = 0.001
+MAX_MS = 100000.0
+STEPS_PER_DOUBLING = 4
+BUCKETS = math.ceil(math.log2(MAX_MS / MIN_MS) * STEPS_PER_DOUBLING) + 2
+
+
+class LatencyHistogram:
+    # Fixed-size log-scale histogram: add() is one log and one increment, and
+    # memory doesn't grow with the number of samples. Quantiles come back as
+    # the geometric middle of their bucket.
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, ms):
+        if ms <= MIN_MS:
+            index = 0
+        else:
+            index = min(int(math.log2(ms / MIN_MS) * STEPS_PER_DOUBLING) + 1, BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                break
+        if index == 0:
+            return MIN_MS
+        value = MIN_MS * 2 ** ((index - 0.5) / STEPS_PER_DOUBLING)
+        return min(value, self.max)
+
+    def reset(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.max = 0.0
+
+
+class StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.add((time.perf_counter() - self.start) * 1000)
+
+
+class StageTimers:
+    # Named histograms, e.g. one per UI stage. `with timers.stage(name):`
+    # times a block; add() records a duration measured elsewhere.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def add(self, name, ms):
+        self.histogram(name).add(ms)
+
+    def stage(self, name):
+        return StageTimer(self.histogram(name))
+
+    def summary(self):
+        # [(name, count, p50 ms, p99 ms, max ms)]
+        return [(name, h.count, h.quantile(0.5), h.quantile(0.99), h.max) for name, h in list(self.histograms.items())]
+
+    def reset(self):
+        for histogram in list(self.histograms.values()):
+            histogram.reset()